@@ -1,13 +1,13 @@
-from fastapi import FastAPI, File, UploadFile
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi import FastAPI
+from fastapi.responses import HTMLResponse
 import uvicorn
-import os
-import shutil
-from Deep_learning_projects.utils import log
-import ultralytics
-from Deep_learning_projects.pipeline.prediction_pipeline import PredictionPipeline
+from Deep_learning_projects.pipeline.serving import router as prediction_router, lifespan, UploadSizeLimitMiddleware
 
-app = FastAPI()
+# The model is loaded once, in the background after startup (see serving.lifespan),
+# and shared by every request; / and /health answer before it is ready
+app = FastAPI(lifespan=lifespan)
+app.include_router(prediction_router)
+app.add_middleware(UploadSizeLimitMiddleware)
 
 @app.get("/", response_class=HTMLResponse)
 async def home():
@@ -20,35 +20,17 @@ async def home():
             <h1>Welcome to YOLO Prediction API</h1>
             <p>Use <a href="/docs">/docs</a> to test the endpoints.</p>
             <ul>
-                <li>POST /predict : Upload an image to get object detection results.</li>
+                <li>POST /predict : Upload an image to get object detection results (?model=name picks a configured model).</li>
+                <li>GET /models : Configured models, which are loaded and their memory use.</li>
+                <li>POST /predict/batch : Upload many images or a zip; results stream back as NDJSON.</li>
+                <li>GET /model/info : Load time and memory of the served model.</li>
+                <li>GET /metrics : Prometheus latency, memory and load metrics.</li>
+                <li>GET /health, /ready : Liveness, and whether the model has finished loading.</li>
+                <li>POST /admin/reload : Load and swap in new weights without downtime (also automatic when watch_path changes); needs ADMIN_TOKEN and the X-Admin-Token header.</li>
             </ul>
         </body>
     </html>
     """
 
-@app.post("/predict")
-async def predict_route(file: UploadFile = File(...)):
-    try:
-        # Create uploads directory if not exists
-        os.makedirs("uploads", exist_ok=True)
-        
-        file_path = os.path.join("uploads", file.filename)
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        pipeline = PredictionPipeline()
-        predictions = pipeline.predict(file_path)
-        
-        # Clean up
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            
-        return JSONResponse(content={"filename": file.filename, "predictions": predictions})
-        
-    except Exception as e:
-        log.exception(e)
-        return JSONResponse(content={"error": str(e)}, status_code=500)
-
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8080)
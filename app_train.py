@@ -1,19 +1,35 @@
-from fastapi import FastAPI, BackgroundTasks, HTTPException, File, UploadFile
-from fastapi.responses import JSONResponse, HTMLResponse
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse, HTMLResponse, PlainTextResponse
 import uvicorn
 import yaml
 import os
-import shutil
 from typing import Dict, Any, Optional
 from pydantic import BaseModel
 
 from Deep_learning_projects.utils import log
-from Deep_learning_projects.pipeline.prediction_pipeline import PredictionPipeline
-from Deep_learning_projects.pipeline.stage01_data_ingestion_pipeline import DataIngestionTrainingPipeline
-from Deep_learning_projects.pipeline.stage02_prepare_base_model import PrepareBaseModelTrainingPipeline
-from Deep_learning_projects.pipeline.stage03_model_training_pipeline import ModelTrainingPipeline
+from Deep_learning_projects.config.configuration import ConfigurationManager
+from Deep_learning_projects.components.training_jobs import TrainingJobManager, JobQueueFull, UnknownJob
+from Deep_learning_projects.pipeline.serving import router as prediction_router, lifespan, UploadSizeLimitMiddleware
 
-app = FastAPI()
+
+@asynccontextmanager
+async def train_lifespan(app: FastAPI):
+    # Training runs as jobs in separate processes; serving starts as in app.py
+    jobs = TrainingJobManager(ConfigurationManager().get_training_jobs_config())
+    await jobs.start()
+    app.state.training_jobs = jobs
+    try:
+        async with lifespan(app):
+            yield
+    finally:
+        await jobs.stop()
+
+
+# Same warm, shared model as app.py; /predict comes from the shared router
+app = FastAPI(lifespan=train_lifespan)
+app.include_router(prediction_router)
+app.add_middleware(UploadSizeLimitMiddleware)
 
 PARAMS_PATH = "params.yaml"
 CONFIG_PATH = "config/config.yaml"
@@ -38,26 +54,6 @@ def write_yaml(path: str, content: Dict[str, Any]):
     with open(path, 'w') as f:
         yaml.safe_dump(content, f, default_flow_style=False)
 
-def run_training_pipeline():
-    try:
-        log.info(">>> Training Pipeline Triggered by API <<<")
-        
-        # 1. Data Ingestion (Optional if data already exists, but safer to run)
-        log.info(">> Stage 1: Data Ingestion")
-        DataIngestionTrainingPipeline().main()
-        
-        # 2. Prepare Base Model (Crucial if model_name changed)
-        log.info(">> Stage 2: Prepare Base Model")
-        PrepareBaseModelTrainingPipeline().main()
-        
-        # 3. Training
-        log.info(">> Stage 3: Training")
-        ModelTrainingPipeline().main()
-        
-        log.info(">>> Training Pipeline Completed Successfully <<<")
-    except Exception as e:
-        log.exception(f"Training Pipeline Failed: {e}")
-
 # --- Endpoints ---
 
 @app.get("/", response_class=HTMLResponse)
@@ -68,36 +64,25 @@ async def home():
         <body>
             <h1>YOLO Training API</h1>
             <ul>
-                <li>POST /predict : Inference</li>
+                <li>POST /predict : Inference (?model=name for another configured model)</li>
+                <li>GET /models : Configured models and their memory use</li>
+                <li>POST /predict/batch : Batch inference (files or zip, NDJSON)</li>
+                <li>GET /model/info : Served model load time and memory</li>
+                <li>GET /metrics : Prometheus metrics</li>
+                <li>GET /health, /ready : Liveness / model loaded</li>
+                <li>POST /admin/reload : Hot-swap the served weights (needs ADMIN_TOKEN)</li>
                 <li>GET /train/config : Get current config</li>
                 <li>POST /train/config : Update config</li>
-                <li>POST /train/start : Start training</li>
+                <li>POST /train/start : Queue a training job (runs in its own process)</li>
+                <li>GET /train/jobs : Training jobs, newest first</li>
+                <li>GET /train/jobs/{job_id} : Job status (error tail when it failed)</li>
+                <li>GET /train/jobs/{job_id}/log : Job log tail</li>
+                <li>POST /train/jobs/{job_id}/cancel : Cancel a queued or running job</li>
             </ul>
         </body>
     </html>
     """
 
-@app.post("/predict")
-async def predict_route(file: UploadFile = File(...)):
-    # Reuse logic from app.py
-    try:
-        os.makedirs("uploads", exist_ok=True)
-        file_path = os.path.join("uploads", file.filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        pipeline = PredictionPipeline()
-        predictions = pipeline.predict(file_path)
-        
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            
-        return JSONResponse(content={"filename": file.filename, "predictions": predictions})
-        
-    except Exception as e:
-        log.exception(e)
-        return JSONResponse(content={"error": str(e)}, status_code=500)
-
 @app.get("/train/config")
 async def get_config():
     try:
@@ -160,11 +145,43 @@ async def update_config(cfg: TrainingConfig):
         log.exception(e)
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
-@app.post("/train/start")
-async def start_training(background_tasks: BackgroundTasks):
-    # Verify we can modify files? pipeline does that.
-    background_tasks.add_task(run_training_pipeline)
-    return {"message": "Training started in background. Check logs for progress."}
+@app.post("/train/start", status_code=202)
+async def start_training():
+    # A job of its own: another process, lower priority and pinned away from serving's cores
+    try:
+        job = app.state.training_jobs.submit()
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "60"})
+    return {"message": "Training job queued", **job}
+
+
+@app.get("/train/jobs")
+async def list_training_jobs():
+    return {"jobs": app.state.training_jobs.info()}
+
+
+@app.get("/train/jobs/{job_id}")
+async def training_job_status(job_id: str):
+    try:
+        return app.state.training_jobs.get(job_id)
+    except UnknownJob:
+        raise HTTPException(status_code=404, detail=f"Unknown training job '{job_id}'")
+
+
+@app.get("/train/jobs/{job_id}/log", response_class=PlainTextResponse)
+async def training_job_log(job_id: str, lines: int = Query(200, ge=1, le=5000)):
+    try:
+        return app.state.training_jobs.log_text(job_id, lines)
+    except UnknownJob:
+        raise HTTPException(status_code=404, detail=f"Unknown training job '{job_id}'")
+
+
+@app.post("/train/jobs/{job_id}/cancel")
+async def cancel_training_job(job_id: str):
+    try:
+        return app.state.training_jobs.cancel(job_id)
+    except UnknownJob:
+        raise HTTPException(status_code=404, detail=f"Unknown training job '{job_id}'")
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8080)
@@ -1,15 +1,16 @@
 import os
 import sys
-import dagshub
-import mlflow
 from urllib.parse import urlparse
 from dotenv import load_dotenv, find_dotenv
 
 from Deep_learning_projects.utils import log
+from Deep_learning_projects.utils.startup import lazy_import, startup_report
 from Deep_learning_projects.pipeline.stage01_data_ingestion_pipeline import DataIngestionTrainingPipeline
 from Deep_learning_projects.pipeline.stage02_prepare_base_model import PrepareBaseModelTrainingPipeline
 from Deep_learning_projects.pipeline.stage03_model_training_pipeline import ModelTrainingPipeline
 from Deep_learning_projects.pipeline.stage04_evalution_pipeline import EvaluationPipeline
+from Deep_learning_projects.pipeline.stage05_model_export_pipeline import ModelExportPipeline
+from Deep_learning_projects.pipeline.stage06_model_quantization_pipeline import ModelQuantizationPipeline
 
 # -------------------------------------------------------------------------
 # 1. ROBUST INITIALIZATION FUNCTION
@@ -18,6 +19,7 @@ def init_dagshub_mlflow():
     """
     Dynamically initializes DagsHub and MLflow using the .env file.
     This removes the need to hardcode repo_owner and repo_name.
+    dagshub and mlflow are only imported once a tracking URI is configured.
     """
     # Force load .env
     load_dotenv(find_dotenv(), override=True)
@@ -41,8 +43,8 @@ def init_dagshub_mlflow():
             
             log.info(f"Initializing DagsHub for Owner: {owner}, Repo: {repo}")
             
-            dagshub.init(repo_owner=owner, repo_name=repo, mlflow=True)
-            mlflow.set_tracking_uri(uri)
+            lazy_import("dagshub").init(repo_owner=owner, repo_name=repo, mlflow=True)
+            lazy_import("mlflow").set_tracking_uri(uri)
             
             # REMOVED EMOJI TO PREVENT WINDOWS CRASH
             log.info("[OK] DagsHub & MLflow initialized successfully.")
@@ -55,14 +57,10 @@ def init_dagshub_mlflow():
         pass
 
 # -------------------------------------------------------------------------
-# 2. RUN INITIALIZATION
-# -------------------------------------------------------------------------
-init_dagshub_mlflow()
-
-
-# -------------------------------------------------------------------------
-# 3. PIPELINE STAGES
+# 2. PIPELINE STAGES
 # -------------------------------------------------------------------------
+# DagsHub/MLflow are initialised just before the first stage that tracks
+# runs (Training), so data ingestion and base-model preparation start fast.
 
 STAGE_NAME = "Data Ingestion stage"
 try:
@@ -91,6 +89,7 @@ STAGE_NAME = "Training"
 try: 
    log.info(f"*******************")
    log.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+   init_dagshub_mlflow()
    model_trainer = ModelTrainingPipeline()
    model_trainer.main()
    log.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
@@ -109,4 +108,34 @@ try:
 
 except Exception as e:
         log.exception(e)
-        raise e
\ No newline at end of file
+        raise e
+
+
+STAGE_NAME = "Model export stage"
+try:
+   log.info("*******************")
+   log.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+   model_export = ModelExportPipeline()
+   model_export.main()
+   log.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+
+except Exception as e:
+        log.exception(e)
+        raise e
+
+
+STAGE_NAME = "Model quantization stage"
+try:
+   log.info("*******************")
+   log.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+   model_quantization = ModelQuantizationPipeline()
+   model_quantization.main()
+   log.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+
+except Exception as e:
+        log.exception(e)
+        raise e
+
+
+# Per-module cost of the lazily imported heavy dependencies (utils.startup)
+log.info(f"Import times (s): {startup_report()['imports']}")
@@ -52,10 +52,16 @@ setup(
             "isort>=5.9.3",
             "mypy>=0.910",
         ],
+        # Binary /predict?format=msgpack responses
+        "msgpack": [
+            "msgpack>=1.0.0",
+        ],
     },
     entry_points={
         "console_scripts": [
             "deep-learning-train=Deep_learning_projects.pipeline.training_pipeline:main",
+            "deep-learning-loadtest=Deep_learning_projects.pipeline.load_test_pipeline:main",
+            "deep-learning-sweep=Deep_learning_projects.pipeline.hyperparameter_search_pipeline:main",
         ],
     },
     include_package_data=True,
@@ -0,0 +1,89 @@
+from ultralytics.data import YOLODataset
+from ultralytics.models.yolo.detect import DetectionTrainer, DetectionValidator
+from Deep_learning_projects.utils import log
+from Deep_learning_projects.components.dataset_cache import ImageCache
+
+# One mapping per cache directory and process
+_caches = {}
+
+
+def open_image_cache(directory: str) -> ImageCache:
+    if directory not in _caches:
+        _caches[directory] = ImageCache(directory)
+    return _caches[directory]
+
+
+class CachedYOLODataset(YOLODataset):
+    """
+    YOLODataset whose load_image reads pre-resized images from an ImageCache
+    (views into the memory map) instead of decoding the files again.
+    Images missing from the cache are loaded the usual way.
+    """
+    image_cache = None
+
+    def load_image(self, i, rect_mode=True, **kwargs):
+        # Other ultralytics resize modes (resize_short, square) are not what the cache holds
+        if self.image_cache is None or not rect_mode or kwargs.get("resize_short") or self.ims[i] is not None:
+            return super().load_image(i, rect_mode, **kwargs)
+        hit = self.image_cache.lookup(self.im_files[i])
+        if hit is None:
+            return super().load_image(i, rect_mode, **kwargs)
+
+        image, orig_shape = hit
+        if self.augment:
+            # Same buffer bookkeeping as BaseDataset.load_image: Mosaic and MixUp
+            # draw their extra images from dataset.buffer
+            self.ims[i], self.im_hw0[i], self.im_hw[i] = image, orig_shape, image.shape[:2]
+            self.buffer.append(i)
+            if 1 < len(self.buffer) >= self.max_buffer_length:
+                j = self.buffer.pop(0)
+                if self.cache != "ram":
+                    self.ims[j], self.im_hw0[j], self.im_hw[j] = None, None, None
+        return image, orig_shape, image.shape[:2]
+
+
+def with_image_cache(dataset, directory):
+    """
+    Makes an ultralytics-built YOLODataset read from the cache in `directory`.
+    The class is switched rather than load_image patched on the instance, so
+    the dataset still pickles for dataloader workers (the cache pickles as its path).
+    """
+    if directory is None or type(dataset) is not YOLODataset:
+        return dataset
+    cache = open_image_cache(str(directory))
+    if cache.image_size != dataset.imgsz:
+        log.warning(f"Dataset cache {directory} holds {cache.image_size}px images, "
+                    f"not {dataset.imgsz}px; reading the image files")
+        return dataset
+    dataset.__class__ = CachedYOLODataset
+    dataset.image_cache = cache
+    return dataset
+
+
+class CachedDetectionTrainer(DetectionTrainer):
+    """
+    DetectionTrainer whose train and val datasets read from `image_cache_dir`.
+    Use trainer_with_cache(), since ultralytics instantiates the trainer itself.
+    """
+    image_cache_dir = None
+
+    def build_dataset(self, img_path, mode="train", batch=None):
+        return with_image_cache(super().build_dataset(img_path, mode, batch), self.image_cache_dir)
+
+
+class CachedDetectionValidator(DetectionValidator):
+    """
+    DetectionValidator reading from `image_cache_dir`, for YOLO.val().
+    """
+    image_cache_dir = None
+
+    def build_dataset(self, img_path, mode="val", batch=None):
+        return with_image_cache(super().build_dataset(img_path, mode, batch), self.image_cache_dir)
+
+
+def trainer_with_cache(directory) -> type:
+    return type("CachedDetectionTrainer", (CachedDetectionTrainer,), {"image_cache_dir": str(directory)})
+
+
+def validator_with_cache(directory) -> type:
+    return type("CachedDetectionValidator", (CachedDetectionValidator,), {"image_cache_dir": str(directory)})
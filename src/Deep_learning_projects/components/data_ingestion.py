@@ -1,73 +1,257 @@
 import os
+import json
+import math
+import time
 import zipfile
-import gdown
-import yaml
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
 from Deep_learning_projects.utils import log
-from Deep_learning_projects.utils.common import get_size
+from Deep_learning_projects.utils.common import get_size, get_file_hash
 from Deep_learning_projects.entity.config_entity import (DataIngestionConfig)
+from Deep_learning_projects.components.data_sources import (DataSource, RemoteFile, RemoteInfo,
+                                                            manifest_name, parse_manifest, source_for)
+from Deep_learning_projects.components.zip_extraction import ZipExtractor
 
+# Failed segment reads are retried from where they stopped
+SEGMENT_RETRIES = 3
 
 
 class DataIngestion:
-    def __init__(self, config: DataIngestionConfig):
+    def __init__(self, config: DataIngestionConfig, source: Optional[DataSource] = None):
         self.config = config
+        # Pluggable: tests (or other storage) pass their own DataSource,
+        # otherwise it follows from the URL (Google Drive, http(s), local path)
+        self.source = source
+        self.state_path = Path(self.config.root_dir) / "ingestion_state.json"
+        self._progress_lock = threading.Lock()
+
+    def _source(self, url: str) -> DataSource:
+        return self.source or source_for(url)
+
+    def _load_state(self) -> dict:
+        if self.state_path.exists():
+            with open(self.state_path, "r") as f:
+                return json.load(f)
+        return {"files": {}}
+
+    def _save_state(self, state: dict):
+        with open(self.state_path, "w") as f:
+            json.dump(state, f, indent=4)
+
+    def remote_files(self) -> list:
+        """
+        Files to fetch: the entries of `checksum_manifest`, or just `source_URL`
+        (verified against `sha256` when that is set).
+        """
+        manifest_url = self.config.checksum_manifest
+        if manifest_url:
+            source = self._source(manifest_url)
+            return parse_manifest(source.read_text(manifest_url), manifest_url, source)
+        return [RemoteFile(
+            name=Path(self.config.local_data_file).name,
+            url=self.config.source_URL,
+            sha256=(self.config.sha256 or "").lower()
+        )]
+
+    def _destination(self, file: RemoteFile) -> Path:
+        if not self.config.checksum_manifest:
+            return Path(self.config.local_data_file)
+        root = Path(self.config.root_dir)
+        destination = root / manifest_name(file.name)
+        if root.resolve() not in destination.resolve().parents:
+            raise ValueError(f"{file.name} resolves outside {root}")
+        return destination
 
-    
     def download_file(self)-> str:
         '''
         Fetch data from the url
+        Only files that changed since the last run are downloaded (by checksum
+        manifest, or by the server's ETag/Last-Modified), interrupted downloads
+        resume, and archives are extracted again only when they changed.
         '''
 
-        try: 
-            dataset_url = self.config.source_URL
-            zip_download_path = Path(self.config.local_data_file)
+        try:
             unzip_path = Path(self.config.unzip_dir)
+            state = self._load_state()
+            files = self.remote_files()
+            changed = []
 
-            # If extracted data already exists (checking key file 'data.yaml'), skip download and extraction
-            if (unzip_path / "data.yaml").exists():
-                log.info(f"Data already present at {unzip_path}. Skipping download.")
-                return str(unzip_path)
-
-            # Ensure parent dir for zip exists
-            zip_download_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # If zip already downloaded, just extract
-            if zip_download_path.exists():
-                log.info(f"Zip file already exists at {zip_download_path}. Extracting.")
-                self.extract_zip_file()
-                return str(unzip_path)
+            for file in files:
+                destination = self._destination(file)
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    info = self._source(file.url).probe(file)
+                except Exception as e:
+                    # Offline re-runs keep working with what was fetched before
+                    if destination.exists() and file.name in state["files"]:
+                        log.warning(f"Could not reach the source of {file.name} ({e}); using the local copy")
+                        continue
+                    raise
 
-            log.info(f"Downloading data from {dataset_url} into file {zip_download_path}")
+                if self._is_current(file, info, destination, state["files"].get(file.name)):
+                    log.info(f"{destination} is up to date. Skipping download.")
+                    continue
 
-            file_id = dataset_url.split("/")[-2]
-            prefix = 'https://drive.google.com/uc?/export=download&id='
-            gdown.download(prefix + file_id, str(zip_download_path))
+                log.info(f"Downloading {file.name} from {file.url} into file {destination}")
+                digest = self._download(file, info, destination)
+                state["files"][file.name] = {
+                    "sha256": digest,
+                    "size": os.path.getsize(destination),
+                    "validator": info.validator,
+                }
+                self._save_state(state)
+                changed.append(destination)
+                log.info(f"Downloaded {file.name} ({get_size(destination)})")
 
-            log.info(f"Downloaded data from {dataset_url} into file {zip_download_path}")
-            self.extract_zip_file()
+            # Extract what changed, or everything when the extracted data is missing
+            if not (unzip_path / "data.yaml").exists():
+                changed = [self._destination(file) for file in files]
+            for archive in changed:
+                if zipfile.is_zipfile(archive):
+                    self.extract_zip_file(archive)
             return str(unzip_path)
 
         except Exception as e:
             raise e
-        
-    
 
-    def extract_zip_file(self):
+    def _is_current(self, file: RemoteFile, info: RemoteInfo, destination: Path, recorded: Optional[dict]) -> bool:
+        if recorded is None or not destination.exists() or os.path.getsize(destination) != recorded["size"]:
+            return False
+        if file.sha256:
+            return recorded["sha256"] == file.sha256
+        # No manifest: trust the server's validator, and the size when it has nothing better
+        return recorded["validator"] == info.validator and info.size in (-1, recorded["size"])
+
+    def _download(self, file: RemoteFile, info: RemoteInfo, destination: Path) -> str:
         """
-        zip_file_path: str
-        Extracts the zip file into the data directory
-        Function returns None
+        Downloads into `<destination>.part`, verifies it and moves it into place.
+        With range support the file is fetched as parallel segments whose
+        progress is kept in `<destination>.part.json`, so a rerun after a crash
+        only fetches what is missing.
         """
-        unzip_path = Path(self.config.unzip_dir)
-        unzip_path.mkdir(parents=True, exist_ok=True)
-        with zipfile.ZipFile(self.config.local_data_file, 'r') as zip_ref:
-            zip_ref.extractall(unzip_path)
-        log.info(f"Extracted zip file to {unzip_path}")
+        part = destination.with_name(destination.name + ".part")
+        if info.accepts_ranges and info.size > 0:
+            self._download_segments(file, info, part)
+        else:
+            # No ranges: a partial file is useless, start over in one stream
+            log.info(f"{file.name}: server does not support ranges; downloading in one stream")
+            with open(part, "wb") as f:
+                for chunk in self._source(file.url).read_range(file, 0, chunk_size=self._chunk_bytes()):
+                    f.write(chunk)
+
+        expected_size = file.size if file.size >= 0 else info.size
+        if expected_size >= 0 and os.path.getsize(part) != expected_size:
+            raise IOError(f"{file.name}: got {os.path.getsize(part)} bytes, expected {expected_size}")
+        digest = get_file_hash(part)
+        if file.sha256 and digest != file.sha256:
+            # Do not resume from corrupt data next time
+            part.unlink()
+            Path(str(part) + ".json").unlink(missing_ok=True)
+            raise IOError(f"Checksum mismatch for {file.name}: expected {file.sha256}, got {digest}")
+
+        os.replace(part, destination)
+        Path(str(part) + ".json").unlink(missing_ok=True)
+        return digest
+
+    def _chunk_bytes(self) -> int:
+        return max(64 * 1024, int(self.config.chunk_mb * 1024 * 1024))
+
+    def _download_segments(self, file: RemoteFile, info: RemoteInfo, part: Path):
+        meta_path = Path(str(part) + ".json")
+        meta = None
+        if part.exists() and meta_path.exists():
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            if meta.get("validator") != info.validator or meta.get("size") != info.size:
+                log.info(f"{file.name} changed on the server; restarting its download")
+                meta = None
+
+        if meta is None:
+            parallel = info.size >= self.config.min_parallel_mb * 1024 * 1024
+            count = max(1, self.config.download_workers) if parallel else 1
+            step = math.ceil(info.size / count)
+            meta = {
+                "validator": info.validator,
+                "size": info.size,
+                # [start, end, bytes done]
+                "segments": [[start, min(start + step, info.size), 0] for start in range(0, info.size, step)],
+            }
+            with open(part, "wb") as f:
+                f.truncate(info.size)
+        else:
+            done = sum(segment[2] for segment in meta["segments"])
+            log.info(f"Resuming {file.name} at {done / info.size:.0%}")
 
+        def save_meta():
+            with open(meta_path, "w") as f:
+                json.dump(meta, f)
 
+        save_meta()
+        progress = {"bytes": 0, "start": time.perf_counter(), "logged": time.perf_counter()}
+        source = self._source(file.url)
 
+        def fetch(segment):
+            for attempt in range(1, SEGMENT_RETRIES + 1):
+                start, end, done = segment
+                if start + done >= end:
+                    return
+                try:
+                    # Each thread writes its own byte range through its own handle
+                    with open(part, "r+b") as f:
+                        f.seek(start + done)
+                        for chunk in source.read_range(file, start + done, end, chunk_size=self._chunk_bytes()):
+                            chunk = chunk[:end - start - segment[2]]
+                            f.write(chunk)
+                            # In the OS before it is counted, so saved progress never runs ahead
+                            f.flush()
+                            with self._progress_lock:
+                                segment[2] += len(chunk)
+                                progress["bytes"] += len(chunk)
+                                self._log_progress(file, meta, progress, save_meta)
+                    if segment[2] < end - start:
+                        raise IOError(f"connection closed {end - start - segment[2]} bytes early")
+                    return
+                except Exception as e:
+                    if attempt == SEGMENT_RETRIES:
+                        raise
+                    log.warning(f"{file.name}: segment at byte {start} failed ({e}); retry {attempt}")
+                    time.sleep(attempt)
 
+        try:
+            with ThreadPoolExecutor(max_workers=len(meta["segments"])) as executor:
+                list(executor.map(fetch, meta["segments"]))
+        finally:
+            with self._progress_lock:
+                save_meta()
 
+    def _log_progress(self, file: RemoteFile, meta: dict, progress: dict, save_meta):
+        now = time.perf_counter()
+        if now - progress["logged"] < 5:
+            return
+        progress["logged"] = now
+        # Persisted now and then, so a crash loses at most a few seconds of data
+        save_meta()
+        done = sum(segment[2] for segment in meta["segments"])
+        rate = progress["bytes"] / max(now - progress["start"], 1e-9) / 1024 ** 2
+        log.info(f"{file.name}: {done / meta['size']:.0%} ({rate:.1f} MB/s)")
+
+    def extract_zip_file(self, zip_file_path: Optional[Path] = None):
+        """
+        zip_file_path: archive to extract (default: local_data_file)
+        Extracts the zip file into the data directory, in parallel processes;
+        members already extracted unchanged by an earlier run are skipped
+        Function returns the extraction stats
+        """
+        zip_file_path = Path(zip_file_path or self.config.local_data_file)
+        unzip_path = Path(self.config.unzip_dir)
+        unzip_path.mkdir(parents=True, exist_ok=True)
+        extractor = ZipExtractor(
+            zip_path=zip_file_path,
+            destination=unzip_path,
+            index_path=Path(self.config.root_dir) / f"{zip_file_path.name}.extract_index.json",
+            workers=self.config.extract_workers
+        )
+        return extractor.extract()
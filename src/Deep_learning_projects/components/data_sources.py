@@ -0,0 +1,214 @@
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import parse_qs, urljoin, urlparse
+from Deep_learning_projects.utils.startup import lazy_import
+
+
+@dataclass(frozen=True)
+class RemoteFile:
+    name: str                 # Path relative to the ingestion directory, e.g. data.zip
+    url: str                  # Where the source fetches it from
+    sha256: str = ""          # Expected digest from the checksum manifest ("" = unknown)
+    size: int = -1            # Expected size in bytes (-1 = unknown)
+
+
+@dataclass(frozen=True)
+class RemoteInfo:
+    size: int                 # Content length (-1 when the server does not say)
+    accepts_ranges: bool      # Partial reads possible: resume and parallel segments
+    validator: str            # ETag / Last-Modified / size: changes when the file does
+
+
+class DataSource:
+    """
+    Where ingestion fetches files from. A source only has to answer probe()
+    and stream byte ranges; DataIngestion does the resuming, parallel
+    segments and checksum checks, so a new source (S3, a test stand-in, ...)
+    only implements these two methods, plus read_text() for manifests.
+    """
+    def probe(self, file: RemoteFile) -> RemoteInfo:
+        raise NotImplementedError
+
+    def read_range(self, file: RemoteFile, start: int, end: int = None, chunk_size: int = 1024 * 1024):
+        """
+        Yields the bytes [start, end) of `file` (to the end when `end` is None).
+        """
+        raise NotImplementedError
+
+    def read_text(self, url: str) -> str:
+        raise NotImplementedError
+
+    def resolve(self, base_url: str, name: str) -> str:
+        """
+        URL of a manifest entry `name` next to the manifest at `base_url`.
+        """
+        return urljoin(base_url, name)
+
+
+class HTTPSource(DataSource):
+    """
+    Plain HTTP(S) with Range requests. Servers that ignore Range (answering
+    200 with the whole body) still work, but only from byte 0 and serially.
+    """
+    def __init__(self, timeout_s: float = 60):
+        self.timeout_s = timeout_s
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        # One connection pool per download thread
+        if not hasattr(self._local, "session"):
+            self._local.session = lazy_import("requests").Session()
+        return self._local.session
+
+    def url_for(self, file: RemoteFile) -> str:
+        return file.url
+
+    def probe(self, file: RemoteFile) -> RemoteInfo:
+        # A one-byte ranged GET answers size, range support and validators in one go
+        # (HEAD is not supported everywhere, and redirects drop its headers)
+        with self.session.get(self.url_for(file), headers={"Range": "bytes=0-0"},
+                              stream=True, timeout=self.timeout_s, allow_redirects=True) as response:
+            response.raise_for_status()
+            headers = response.headers
+            size = -1
+            accepts_ranges = response.status_code == 206
+            if accepts_ranges and "/" in headers.get("Content-Range", ""):
+                total = headers["Content-Range"].rsplit("/", 1)[1]
+                size = int(total) if total.isdigit() else -1
+            elif headers.get("Content-Length", "").isdigit():
+                size = int(headers["Content-Length"])
+            validator = headers.get("ETag") or headers.get("Last-Modified") or f"size:{size}"
+            return RemoteInfo(size=size, accepts_ranges=accepts_ranges, validator=validator)
+
+    def read_range(self, file: RemoteFile, start: int, end: int = None, chunk_size: int = 1024 * 1024):
+        headers = {}
+        if start or end is not None:
+            headers["Range"] = f"bytes={start}-{'' if end is None else end - 1}"
+        with self.session.get(self.url_for(file), headers=headers, stream=True,
+                              timeout=self.timeout_s, allow_redirects=True) as response:
+            response.raise_for_status()
+            if headers and response.status_code != 206:
+                raise IOError(f"{self.url_for(file)} ignored the Range request; cannot resume at byte {start}")
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    yield chunk
+
+    def read_text(self, url: str) -> str:
+        response = self.session.get(url, timeout=self.timeout_s)
+        response.raise_for_status()
+        return response.text
+
+
+class GoogleDriveSource(HTTPSource):
+    """
+    Google Drive share links (…/file/d/<id>/view). The usercontent endpoint
+    with confirm=t skips the virus-scan page for large files and honours Range.
+    """
+    DOWNLOAD_URL = "https://drive.usercontent.google.com/download?id={}&export=download&confirm=t"
+
+    @staticmethod
+    def file_id(url: str) -> str:
+        parsed = urlparse(url)
+        if "/d/" in parsed.path:
+            return parsed.path.split("/d/", 1)[1].split("/")[0]
+        ids = parse_qs(parsed.query).get("id")
+        if not ids:
+            raise ValueError(f"No Google Drive file id in {url}")
+        return ids[0]
+
+    def url_for(self, file: RemoteFile) -> str:
+        return self.DOWNLOAD_URL.format(self.file_id(file.url))
+
+
+class LocalSource(DataSource):
+    """
+    Files on a local or mounted filesystem (plain paths or file:// URLs).
+    """
+    @staticmethod
+    def path_for(url: str) -> Path:
+        return Path(urlparse(url).path if url.startswith("file://") else url)
+
+    def probe(self, file: RemoteFile) -> RemoteInfo:
+        stat = os.stat(self.path_for(file.url))
+        return RemoteInfo(size=stat.st_size, accepts_ranges=True, validator=f"{stat.st_size}:{stat.st_mtime_ns}")
+
+    def read_range(self, file: RemoteFile, start: int, end: int = None, chunk_size: int = 1024 * 1024):
+        with open(self.path_for(file.url), "rb") as f:
+            f.seek(start)
+            remaining = None if end is None else end - start
+            while remaining is None or remaining > 0:
+                chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def read_text(self, url: str) -> str:
+        with open(self.path_for(url), "r") as f:
+            return f.read()
+
+    def resolve(self, base_url: str, name: str) -> str:
+        return str(self.path_for(base_url).parent / name)
+
+
+def source_for(url: str) -> DataSource:
+    """
+    The DataSource handling `url`: Google Drive links, other http(s) URLs,
+    or local paths / file:// URLs.
+    """
+    scheme = urlparse(url).scheme
+    if scheme in ("http", "https"):
+        if "drive.google.com" in urlparse(url).netloc:
+            return GoogleDriveSource()
+        return HTTPSource()
+    return LocalSource()
+
+
+def manifest_name(name: str) -> str:
+    """
+    A manifest entry's name as a path relative to the ingestion directory.
+    Absolute paths, drive letters and '..' are rejected rather than stripped
+    (as member_target does for zip members): such an entry is not trusted.
+    """
+    parts = name.replace("\\", "/").split("/")
+    # Drive letters are checked by hand: os.path.splitdrive only knows them on Windows
+    if name.startswith(("/", "\\")) or re.match(r"[A-Za-z]:", name) or ".." in parts:
+        raise ValueError(f"Manifest entry '{name}' is not a relative path inside the data directory")
+    name = "/".join(part for part in parts if part not in ("", "."))
+    if not name:
+        raise ValueError("Manifest entry without a file name")
+    return name
+
+
+def parse_manifest(text: str, manifest_url: str, source: DataSource) -> list:
+    """
+    RemoteFiles listed in a checksum manifest: either JSON
+    ({"files": [{"name", "sha256", "size"?, "url"?}, ...]}) or `sha256sum`
+    output ("<sha256>  <name>" per line). Entries without a url sit next to
+    the manifest. Raises ValueError for names that would leave the data directory.
+    """
+    text = text.strip()
+    if text.startswith("{"):
+        entries = json.loads(text)["files"]
+    else:
+        entries = []
+        for line in text.splitlines():
+            if line.strip() and not line.startswith("#"):
+                digest, name = line.split(None, 1)
+                entries.append({"name": name.strip().lstrip("*"), "sha256": digest})
+
+    return [
+        RemoteFile(
+            name=manifest_name(entry["name"]),
+            url=entry.get("url") or source.resolve(manifest_url, manifest_name(entry["name"])),
+            sha256=entry.get("sha256", "").lower(),
+            size=int(entry.get("size", -1))
+        )
+        for entry in entries
+    ]
@@ -0,0 +1,338 @@
+import hashlib
+import json
+import math
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import cv2
+import numpy as np
+import yaml
+from Deep_learning_projects.utils import log
+from Deep_learning_projects.utils.common import get_file_hash
+from Deep_learning_projects.entity.config_entity import DatasetCacheConfig
+
+# Bump when the on-disk layout changes, so old caches are rebuilt
+CACHE_FORMAT = 1
+
+IMAGE_EXTENSIONS = (".bmp", ".dng", ".jpeg", ".jpg", ".mpo", ".png", ".tif", ".tiff", ".webp")
+SPLITS = ("train", "val", "test")
+
+# Images decoded per step; bounds the memory held before it is written out
+DECODE_CHUNK = 256
+
+
+def _dataset_root(data_yaml: Path, data: dict) -> Path:
+    root = Path(data.get("path") or data_yaml.parent)
+    return root if root.is_absolute() else data_yaml.parent / root
+
+
+def split_images(data_yaml: Path) -> dict:
+    """
+    {split: sorted absolute image paths} for the splits listed in data.yaml.
+    A split can be a directory (searched recursively), a .txt list of images,
+    or a list of either, the same forms ultralytics accepts.
+    """
+    with open(data_yaml, "r") as f:
+        data = yaml.safe_load(f)
+    root = _dataset_root(Path(data_yaml), data)
+
+    splits = {}
+    for split in SPLITS:
+        entries = data.get(split)
+        if not entries:
+            continue
+        images = set()
+        for entry in entries if isinstance(entries, list) else [entries]:
+            path = Path(entry) if Path(entry).is_absolute() else root / entry
+            if path.is_dir():
+                images.update(
+                    str(file.resolve()) for file in path.rglob("*")
+                    if file.suffix.lower() in IMAGE_EXTENSIONS
+                )
+            elif path.suffix == ".txt" and path.exists():
+                with open(path, "r") as f:
+                    for line in f:
+                        line = line.strip()
+                        if line:
+                            image = Path(line) if Path(line).is_absolute() else path.parent / line
+                            images.add(str(image.resolve()))
+        splits[split] = sorted(images)
+    return splits
+
+
+def label_file(image_path: str) -> str:
+    """
+    YOLO label file of an image: .../images/x.jpg -> .../labels/x.txt
+    """
+    images_dir, labels_dir = f"{os.sep}images{os.sep}", f"{os.sep}labels{os.sep}"
+    head, sep, tail = image_path.rpartition(images_dir)
+    path = head + labels_dir + tail if sep else image_path
+    return os.path.splitext(path)[0] + ".txt"
+
+
+def read_labels(path: str) -> tuple:
+    """
+    (classes, boxes) of a YOLO label file: int16 (n,) and float32 (n, 4)
+    normalised xywh. Missing or empty files have no labels; polygon rows
+    are reduced to their bounding box.
+    """
+    classes, boxes = [], []
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            for line in f:
+                values = line.split()
+                if len(values) < 5:
+                    continue
+                numbers = np.asarray(values[1:], dtype=np.float32)
+                if len(numbers) > 4:
+                    xs, ys = numbers[0::2], numbers[1::2]
+                    numbers = np.array([(xs.min() + xs.max()) / 2, (ys.min() + ys.max()) / 2,
+                                        xs.max() - xs.min(), ys.max() - ys.min()], dtype=np.float32)
+                classes.append(int(float(values[0])))
+                boxes.append(numbers)
+    return (np.asarray(classes, dtype=np.int16).reshape(-1),
+            np.asarray(boxes, dtype=np.float32).reshape(-1, 4))
+
+
+def resize_long_side(image: np.ndarray, size: int) -> np.ndarray:
+    """
+    Resizes so the long side is `size`, keeping the aspect ratio: what
+    ultralytics' load_image does before its letterbox/mosaic transforms.
+    """
+    height, width = image.shape[:2]
+    ratio = size / max(height, width)
+    if ratio == 1:
+        return image
+    new_size = (min(math.ceil(width * ratio), size), min(math.ceil(height * ratio), size))
+    interpolation = cv2.INTER_AREA if ratio < 1 else cv2.INTER_LINEAR
+    return cv2.resize(image, new_size, interpolation=interpolation)
+
+
+class CachedSplit:
+    """
+    Read side of one cached split: the pixels of all its images in one
+    memory-mapped file, and an index of their offsets, shapes and labels.
+    image() returns a view into the map, so reading an image copies nothing.
+    """
+    def __init__(self, directory: Path, split: str):
+        index = np.load(directory / f"{split}.npz")
+        self.im_files = index["im_files"].tolist()
+        self.offsets = index["offsets"]
+        self.shapes = index["shapes"]
+        self.orig_shapes = index["orig_shapes"]
+        self.label_offsets = index["label_offsets"]
+        self.classes = index["classes"]
+        self.boxes = index["boxes"]
+
+        pixels_path = directory / f"{split}.pixels"
+        if os.path.getsize(pixels_path):
+            # Copy-on-write: a transform writing into an image never touches the file
+            self.pixels = np.memmap(pixels_path, dtype=np.uint8, mode="c")
+        else:
+            self.pixels = np.empty(0, dtype=np.uint8)
+        self.positions = {path: i for i, path in enumerate(self.im_files)}
+
+    def __len__(self) -> int:
+        return len(self.im_files)
+
+    def image(self, i: int) -> np.ndarray:
+        height, width = self.shapes[i]
+        start = self.offsets[i]
+        return self.pixels[start:start + height * width * 3].reshape(height, width, 3)
+
+    def labels(self, i: int) -> tuple:
+        start, end = self.label_offsets[i], self.label_offsets[i + 1]
+        return self.classes[start:end], self.boxes[start:end]
+
+
+class ImageCache:
+    """
+    All cached splits of one cache directory; lookup() finds an image by path.
+    Pickles as its directory, so dataloader workers map the files themselves.
+    """
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        with open(self.directory / "manifest.json", "r") as f:
+            self.manifest = json.load(f)
+        self.image_size = self.manifest["image_size"]
+        self.splits = {split: CachedSplit(self.directory, split) for split in self.manifest["splits"]}
+
+    def __reduce__(self):
+        return ImageCache, (self.directory,)
+
+    def lookup(self, path: str):
+        """
+        (image view, (orig_height, orig_width)) for a cached image, else None.
+        """
+        # ultralytics lists absolute paths already; resolving (symlinks, ..) is the fallback
+        for candidate in (path, str(Path(path).resolve())):
+            for cached in self.splits.values():
+                i = cached.positions.get(candidate)
+                if i is not None:
+                    return cached.image(i), tuple(int(v) for v in cached.orig_shapes[i])
+        return None
+
+
+class DatasetCache:
+    """
+    Decodes and resizes the train / val / test images of data.yaml once into
+    memory-mapped uint8 files, so training epochs, trials and evaluation runs
+    stop decoding JPEGs. A cache is keyed by data.yaml, the content of every
+    image and label file, and IMAGE_SIZE; any change builds a new one.
+    """
+    def __init__(self, config: DatasetCacheConfig):
+        self.config = config
+        self.image_size = int(config.params_image_size[0])
+        self.workers = config.num_workers or os.cpu_count()
+        self._digests_path = Path(config.root_dir) / "file_digests.json"
+
+    def _file_digests(self, paths: list) -> dict:
+        """
+        sha256 of every file, reusing earlier digests of files whose size and
+        mtime have not changed, so a re-run does not read the whole dataset again.
+        """
+        known = {}
+        if self._digests_path.exists():
+            with open(self._digests_path, "r") as f:
+                known = json.load(f)
+
+        digests, stale = {}, []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entry = known.get(path)
+            if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+                digests[path] = entry
+            else:
+                stale.append((path, stat))
+
+        # hashlib releases the GIL on large buffers, so threads hash in parallel
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            hashes = executor.map(lambda item: get_file_hash(Path(item[0])), stale)
+            for (path, stat), digest in zip(stale, hashes):
+                digests[path] = [stat.st_size, stat.st_mtime_ns, digest]
+
+        if stale:
+            self._digests_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._digests_path, "w") as f:
+                json.dump(digests, f)
+        return digests
+
+    def key(self, splits: dict) -> str:
+        files = sorted({path for images in splits.values() for path in images}
+                       | {label_file(path) for images in splits.values() for path in images})
+        digests = self._file_digests(files)
+
+        key = hashlib.sha256()
+        key.update(f"format={CACHE_FORMAT};size={self.image_size};".encode())
+        with open(self.config.training_data, "rb") as f:
+            key.update(f.read())
+        for split, images in splits.items():
+            key.update(f"[{split}]".encode())
+            for path in images:
+                label = label_file(path)
+                missing = [0, 0, "-"]
+                key.update(f"{path}:{digests.get(path, missing)[2]}:{digests.get(label, missing)[2]};".encode())
+        return key.hexdigest()[:16]
+
+    def _load(self, path: str) -> tuple:
+        image = cv2.imread(path, cv2.IMREAD_COLOR)
+        if image is None:
+            return None, (0, 0)
+        return resize_long_side(image, self.image_size), image.shape[:2]
+
+    def _write_split(self, directory: Path, split: str, images: list):
+        offsets, shapes, orig_shapes = [], [], []
+        label_offsets, classes, boxes = [0], [], []
+        kept, position = [], 0
+
+        with open(directory / f"{split}.pixels", "wb") as pixels, \
+                ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for start in range(0, len(images), DECODE_CHUNK):
+                chunk = images[start:start + DECODE_CHUNK]
+                # cv2 decodes and resizes without the GIL; writing stays sequential
+                for path, (image, orig_shape) in zip(chunk, executor.map(self._load, chunk)):
+                    if image is None:
+                        log.warning(f"Skipping unreadable image {path}")
+                        continue
+                    pixels.write(np.ascontiguousarray(image).data)
+                    offsets.append(position)
+                    shapes.append(image.shape[:2])
+                    orig_shapes.append(orig_shape)
+                    position += image.size
+
+                    image_classes, image_boxes = read_labels(label_file(path))
+                    classes.append(image_classes)
+                    boxes.append(image_boxes)
+                    label_offsets.append(label_offsets[-1] + len(image_classes))
+                    kept.append(path)
+                log.info(f"Cached {min(start + DECODE_CHUNK, len(images))}/{len(images)} {split} images")
+
+        np.savez(
+            directory / f"{split}.npz",
+            im_files=np.asarray(kept, dtype=str),
+            offsets=np.asarray(offsets, dtype=np.int64),
+            shapes=np.asarray(shapes, dtype=np.int32).reshape(-1, 2),
+            orig_shapes=np.asarray(orig_shapes, dtype=np.int32).reshape(-1, 2),
+            label_offsets=np.asarray(label_offsets, dtype=np.int64),
+            classes=np.concatenate(classes) if classes else np.zeros(0, dtype=np.int16),
+            boxes=np.concatenate(boxes) if boxes else np.zeros((0, 4), dtype=np.float32),
+        )
+        return len(kept), position
+
+    def build(self) -> Path:
+        """
+        Returns the directory of the cache for the current dataset, building
+        it first if needed. Older caches beyond `keep_caches` are removed.
+        """
+        root = Path(self.config.root_dir)
+        splits = split_images(Path(self.config.training_data))
+        # When a split reuses another's images (e.g. test falling back to val) it is cached once
+        unique, seen = {}, set()
+        for split, images in splits.items():
+            if tuple(images) not in seen:
+                seen.add(tuple(images))
+                unique[split] = images
+
+        key = self.key(unique)
+        directory = root / key
+        if (directory / "manifest.json").exists():
+            log.info(f"Dataset cache {directory} is up to date")
+            return directory
+
+        staging = root / f"{key}.tmp-{os.getpid()}"
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        summary = {}
+        for split, images in unique.items():
+            count, size = self._write_split(staging, split, images)
+            summary[split] = {"images": count, "bytes": size}
+            log.info(f"Cached {split}: {count} images, {size / 1024 ** 2:.1f} MB")
+
+        with open(staging / "manifest.json", "w") as f:
+            json.dump({"format": CACHE_FORMAT, "key": key, "image_size": self.image_size,
+                       "splits": summary}, f, indent=4)
+        # Readers only ever see a complete cache
+        shutil.rmtree(directory, ignore_errors=True)
+        try:
+            os.replace(staging, directory)
+        except OSError:
+            # Another process (e.g. a parallel trial) finished the same cache first
+            shutil.rmtree(staging, ignore_errors=True)
+            if not (directory / "manifest.json").exists():
+                raise
+        self._prune(root, keep=directory)
+        return directory
+
+    def _prune(self, root: Path, keep: Path):
+        caches = sorted(
+            (path for path in root.iterdir() if path.is_dir() and (path / "manifest.json").exists()),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True
+        )
+        for path in [cache for cache in caches if cache != keep][max(0, self.config.keep_caches - 1):]:
+            log.info(f"Removing old dataset cache {path}")
+            shutil.rmtree(path, ignore_errors=True)
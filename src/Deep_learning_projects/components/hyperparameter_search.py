@@ -0,0 +1,394 @@
+import csv
+import dataclasses
+import json
+import math
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+import yaml
+from Deep_learning_projects.utils import log
+from Deep_learning_projects.utils.common import save_json
+from Deep_learning_projects.utils.startup import lazy_import
+from Deep_learning_projects.entity.config_entity import HyperparameterSearchConfig, DatasetCacheConfig
+from Deep_learning_projects.components.dataset_cache import DatasetCache
+
+# Validation metric the trials are ranked by (a column of ultralytics' results.csv)
+METRIC = "metrics/mAP50-95(B)"
+
+# How often the scheduler checks on running trials
+POLL_S = 2
+
+# Environment variables that size the thread pools of a trial process
+THREAD_VARIABLES = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS trials (
+    trial_id INTEGER PRIMARY KEY,
+    params TEXT NOT NULL,           -- sampled configuration, JSON
+    status TEXT NOT NULL,           -- pending | running | paused | stopped | completed | failed
+    rung INTEGER NOT NULL,          -- highest finished rung, -1 before the first
+    epochs INTEGER NOT NULL,        -- epochs trained so far
+    metric REAL,                    -- METRIC at the highest finished rung
+    weights TEXT,                   -- last.pt of the highest finished rung (promotions continue from it)
+    best_weights TEXT,              -- best.pt of the highest finished rung
+    error TEXT,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    trial_id INTEGER NOT NULL,
+    rung INTEGER NOT NULL,
+    epochs INTEGER NOT NULL,
+    metric REAL NOT NULL,
+    seconds REAL NOT NULL,
+    PRIMARY KEY (trial_id, rung)
+);
+"""
+
+
+def asha_rungs(min_epochs: int, max_epochs: int, reduction_factor: int) -> list:
+    """
+    Cumulative epochs at each rung: min_epochs, times reduction_factor per
+    rung, ending at max_epochs (e.g. 3, 9, 27).
+    """
+    rungs, epochs = [], max(1, int(min_epochs))
+    while epochs < max_epochs:
+        rungs.append(epochs)
+        epochs *= reduction_factor
+    rungs.append(int(max_epochs))
+    return rungs
+
+
+def sample_params(space: dict, rng: random.Random) -> dict:
+    """
+    One configuration from the search space. A list is a set of choices;
+    {low, high} a range (log-uniform with log: true, integers when both bounds are).
+    EPOCHS is the budget the scheduler hands out, so it is not sampled.
+    """
+    params = {}
+    for name in sorted(space):
+        if name == "EPOCHS":
+            continue
+        values = space[name]
+        if isinstance(values, dict):
+            low, high = values["low"], values["high"]
+            if values.get("log"):
+                value = math.exp(rng.uniform(math.log(low), math.log(high)))
+            elif isinstance(low, int) and isinstance(high, int):
+                value = rng.randint(low, high)
+            else:
+                value = rng.uniform(low, high)
+        else:
+            value = rng.choice(list(values))
+        params[name] = value
+    return params
+
+
+def read_metric(results_csv: Path) -> float:
+    """
+    METRIC of the last epoch in an ultralytics results.csv.
+    """
+    with open(results_csv, "r") as f:
+        rows = list(csv.DictReader(f))
+    # Older ultralytics versions pad the column names with spaces
+    last = {key.strip(): value for key, value in rows[-1].items()}
+    return float(last[METRIC])
+
+
+def run_trial(spec: dict) -> dict:
+    """
+    Trains one trial for one rung (in the trial's own process) and returns
+    its metric and weights. A promoted trial continues from the weights of
+    its previous rung.
+    """
+    torch = lazy_import("torch")
+    torch.set_num_threads(spec["threads"])
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+
+    params = spec["params"]
+    run_dir = Path(spec["run_dir"])
+    trainer = None
+    if spec["cache_dir"]:
+        trainer = lazy_import("Deep_learning_projects.components.cached_dataset").trainer_with_cache(spec["cache_dir"])
+    extra = {}
+    if spec["rung"] > 0:
+        # Continuing from trained weights: no second warmup
+        extra["warmup_epochs"] = 0
+
+    start = time.perf_counter()
+    model = lazy_import("ultralytics").YOLO(spec["weights"])
+    model.train(
+        data=spec["training_data"],
+        epochs=spec["epochs"],
+        batch=params["BATCH_SIZE"],
+        imgsz=params["IMAGE_SIZE"],
+        lr0=params["LEARNING_RATE"],
+        augment=params["AUGMENTATION"],
+        project=str(run_dir.parent),
+        name=run_dir.name,
+        exist_ok=True,
+        workers=spec["threads"],
+        plots=False,
+        trainer=trainer,
+        **extra
+    )
+    return {
+        "metric": read_metric(run_dir / "results.csv"),
+        "weights": str(run_dir / "weights" / "last.pt"),
+        "best_weights": str(run_dir / "weights" / "best.pt"),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+class HyperparameterSearch:
+    """
+    Asynchronous successive halving (ASHA) over the search space. Trials run
+    as separate processes, `parallel_trials` at a time, each pinned to its own
+    share of the CPU cores. A trial trains to the first rung's epochs; once
+    it ranks in the top 1/reduction_factor of the trials that reached a rung,
+    it is promoted and trains on to the next rung. Every trial and rung
+    result is recorded in a SQLite table as soon as it is known, so a rerun
+    after a crash picks up where the sweep stopped.
+    """
+    def __init__(self, config: HyperparameterSearchConfig, cache_config: DatasetCacheConfig = None):
+        self.config = config
+        self.cache_config = cache_config
+        self.rungs = asha_rungs(config.min_epochs, config.max_epochs, config.reduction_factor)
+        self.root = Path(config.root_dir)
+
+        cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count()))
+        if config.cpu_cores:
+            cores = cores[:config.cpu_cores]
+        self.parallel = max(1, min(config.parallel_trials, len(cores)))
+        per_trial = len(cores) // self.parallel
+        # Slot i always gets the same cores
+        self.slot_cores = [cores[i * per_trial:(i + 1) * per_trial] for i in range(self.parallel)]
+
+    def _connect(self) -> sqlite3.Connection:
+        path = Path(self.config.db_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(path, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        db.executescript(SCHEMA)
+        return db
+
+    def _open(self) -> sqlite3.Connection:
+        db = self._connect()
+        fingerprint = json.dumps({"space": self.config.search_space, "rungs": self.rungs,
+                                  "reduction_factor": self.config.reduction_factor,
+                                  "seed": self.config.seed}, sort_keys=True)
+        stored = db.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        if stored is None:
+            db.execute("INSERT INTO meta VALUES ('fingerprint', ?)", (fingerprint,))
+        elif stored["value"] != fingerprint:
+            db.close()
+            raise ValueError(f"{self.config.db_path} belongs to a sweep with a different search space; "
+                             f"delete it or point db_path elsewhere")
+
+        # Trials that were running when the last sweep died restart from their last finished rung
+        resumed = db.execute(
+            "UPDATE trials SET status = CASE WHEN rung < 0 THEN 'pending' ELSE 'paused' END, updated = ? "
+            "WHERE status = 'running'", (time.time(),)
+        ).rowcount
+        if resumed:
+            log.info(f"Resuming sweep from {self.config.db_path}: {resumed} interrupted trials requeued")
+        return db
+
+    def prepare_caches(self) -> dict:
+        """
+        Builds the dataset cache for every IMAGE_SIZE in the search space up
+        front, so trials never build (or prune) one concurrently.
+        """
+        if self.cache_config is None or not self.cache_config.enabled:
+            return {}
+        space = self.config.search_space["IMAGE_SIZE"]
+        sizes = sorted(set(space)) if isinstance(space, list) else []
+        if not sizes:
+            log.warning("IMAGE_SIZE is a range; trials read the image files instead of a cache")
+            return {}
+        caches = {}
+        for size in sizes:
+            config = dataclasses.replace(self.cache_config, params_image_size=[size, size, 3],
+                                         keep_caches=max(self.cache_config.keep_caches, len(sizes) + 1))
+            caches[size] = str(DatasetCache(config=config).build())
+        return caches
+
+    def _next_job(self, db: sqlite3.Connection) -> Optional[dict]:
+        # 1. Promotions first, from the highest rung down
+        for rung in reversed(range(len(self.rungs) - 1)):
+            ranked = db.execute("SELECT trial_id FROM results WHERE rung = ? ORDER BY metric DESC",
+                                (rung,)).fetchall()
+            top = [row["trial_id"] for row in ranked[:len(ranked) // self.config.reduction_factor]]
+            for trial_id in top:
+                trial = db.execute("SELECT * FROM trials WHERE trial_id = ?", (trial_id,)).fetchone()
+                if trial["status"] == "paused" and trial["rung"] == rung:
+                    return self._job(trial, rung + 1)
+
+        # 2. Then trials that never finished their first rung, then new ones
+        trial = db.execute("SELECT * FROM trials WHERE status = 'pending' ORDER BY trial_id LIMIT 1").fetchone()
+        if trial is not None:
+            return self._job(trial, 0)
+        count = db.execute("SELECT COUNT(*) FROM trials").fetchone()[0]
+        if count < self.config.num_trials:
+            # Seeded per trial: trial n gets the same configuration in every rerun
+            params = sample_params(self.config.search_space, random.Random(f"{self.config.seed}:{count}"))
+            db.execute("INSERT INTO trials (trial_id, params, status, rung, epochs, updated) "
+                       "VALUES (?, ?, 'pending', -1, 0, ?)", (count, json.dumps(params), time.time()))
+            trial = db.execute("SELECT * FROM trials WHERE trial_id = ?", (count,)).fetchone()
+            return self._job(trial, 0)
+        return None
+
+    def _job(self, trial: sqlite3.Row, rung: int) -> dict:
+        trained = self.rungs[rung - 1] if rung else 0
+        trial_dir = self.root / f"trial_{trial['trial_id']:04d}"
+        return {
+            "trial_id": trial["trial_id"],
+            "rung": rung,
+            "params": json.loads(trial["params"]),
+            "epochs": self.rungs[rung] - trained,
+            "weights": trial["weights"] if rung else str(self.config.base_model_path),
+            "training_data": str(self.config.training_data),
+            "run_dir": str(trial_dir / f"rung_{rung}"),
+            "spec_path": str(trial_dir / f"rung_{rung}.json"),
+            "result_path": str(trial_dir / f"rung_{rung}.result.json"),
+            "log_path": str(trial_dir / f"rung_{rung}.log"),
+        }
+
+    def _launch(self, db: sqlite3.Connection, job: dict, slot: int, caches: dict) -> dict:
+        cores = self.slot_cores[slot]
+        job["threads"] = len(cores)
+        job["cache_dir"] = caches.get(job["params"]["IMAGE_SIZE"], "")
+        Path(job["spec_path"]).parent.mkdir(parents=True, exist_ok=True)
+        Path(job["result_path"]).unlink(missing_ok=True)
+        with open(job["spec_path"], "w") as f:
+            json.dump(job, f, indent=4)
+
+        env = dict(os.environ)
+        for name in THREAD_VARIABLES:
+            env[name] = str(len(cores))
+        log_file = open(job["log_path"], "a")
+        process = subprocess.Popen(
+            [sys.executable, "-m", "Deep_learning_projects.pipeline.hyperparameter_search_pipeline",
+             "--run-trial", job["spec_path"]],
+            stdout=log_file, stderr=subprocess.STDOUT, env=env
+        )
+        if hasattr(os, "sched_setaffinity"):
+            # Set from here, not in a preexec_fn; the child is still starting its
+            # interpreter, so the threads it creates later inherit the mask
+            try:
+                os.sched_setaffinity(process.pid, cores)
+            except OSError as e:
+                log.warning(f"Could not pin trial {job['trial_id']} to cores {cores}: {e}")
+        db.execute("UPDATE trials SET status = 'running', updated = ? WHERE trial_id = ?",
+                   (time.time(), job["trial_id"]))
+        log.info(f"Trial {job['trial_id']} rung {job['rung']}: {job['epochs']} epochs of {job['params']} "
+                 f"on cores {cores[0]}-{cores[-1]}")
+        return {"job": job, "process": process, "log_file": log_file}
+
+    def _finish(self, db: sqlite3.Connection, running: dict):
+        job, process = running["job"], running["process"]
+        running["log_file"].close()
+        result = None
+        if process.returncode == 0 and os.path.exists(job["result_path"]):
+            with open(job["result_path"], "r") as f:
+                result = json.load(f)
+
+        if result is None:
+            with open(job["log_path"], "r", errors="replace") as f:
+                tail = f.read()[-2000:]
+            db.execute("UPDATE trials SET status = 'failed', error = ?, updated = ? WHERE trial_id = ?",
+                       (tail, time.time(), job["trial_id"]))
+            log.error(f"Trial {job['trial_id']} failed at rung {job['rung']} (exit {process.returncode}); "
+                      f"see {job['log_path']}")
+            return
+
+        final = job["rung"] == len(self.rungs) - 1
+        db.execute("BEGIN")
+        db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                   (job["trial_id"], job["rung"], self.rungs[job["rung"]], result["metric"], result["seconds"]))
+        db.execute("UPDATE trials SET status = ?, rung = ?, epochs = ?, metric = ?, weights = ?, best_weights = ?, "
+                   "updated = ? WHERE trial_id = ?",
+                   ("completed" if final else "paused", job["rung"], self.rungs[job["rung"]], result["metric"],
+                    result["weights"], result["best_weights"], time.time(), job["trial_id"]))
+        db.execute("COMMIT")
+        log.info(f"Trial {job['trial_id']} rung {job['rung']} ({self.rungs[job['rung']]} epochs): "
+                 f"{METRIC} = {result['metric']:.4f} in {result['seconds']:.0f} s")
+
+    def run(self) -> dict:
+        """
+        Runs (or resumes) the sweep to the end and returns its summary, which
+        is also written to root_dir/summary.json, with the best configuration
+        as params.yaml keys in root_dir/best_params.yaml.
+        """
+        caches = self.prepare_caches()
+        db = self._open()
+        log.info(f"Sweep of {self.config.num_trials} trials, {self.parallel} at a time "
+                 f"({len(self.slot_cores[0])} cores each), rungs at {self.rungs} epochs")
+        running = {}
+        try:
+            while True:
+                for slot, entry in list(running.items()):
+                    if entry["process"].poll() is not None:
+                        self._finish(db, entry)
+                        del running[slot]
+                free = [slot for slot in range(self.parallel) if slot not in running]
+                for slot in free:
+                    job = self._next_job(db)
+                    if job is None:
+                        break
+                    running[slot] = self._launch(db, job, slot, caches)
+                if not running:
+                    break
+                time.sleep(POLL_S)
+        finally:
+            # Interrupted: stop the trials; their rows stay 'running' and are requeued on resume
+            for entry in running.values():
+                entry["process"].terminate()
+            for entry in running.values():
+                entry["process"].wait()
+                entry["log_file"].close()
+
+        # Nothing left to promote them into
+        db.execute("UPDATE trials SET status = 'stopped', updated = ? WHERE status = 'paused'", (time.time(),))
+        summary = self.summary(db)
+        db.close()
+        return summary
+
+    def summary(self, db: sqlite3.Connection) -> dict:
+        trials = [dict(row) for row in db.execute("SELECT * FROM trials ORDER BY trial_id")]
+        for trial in trials:
+            trial["params"] = json.loads(trial["params"])
+        ranked = sorted((trial for trial in trials if trial["metric"] is not None),
+                        key=lambda trial: (trial["rung"], trial["metric"]), reverse=True)
+        best = ranked[0] if ranked else None
+        summary = {
+            "metric": METRIC,
+            "rungs": self.rungs,
+            "statuses": {status: sum(trial["status"] == status for trial in trials)
+                         for status in sorted({trial["status"] for trial in trials})},
+            "best": best,
+            "trials": trials,
+        }
+        self.root.mkdir(parents=True, exist_ok=True)
+        save_json(path=self.root / "summary.json", data=summary)
+
+        if best is not None:
+            params = dict(best["params"])
+            params["EPOCHS"] = best["epochs"]
+            params["IMAGE_SIZE"] = [params["IMAGE_SIZE"], params["IMAGE_SIZE"], 3]
+            with open(self.root / "best_params.yaml", "w") as f:
+                yaml.safe_dump(params, f, default_flow_style=False)
+            log.info(f"Best trial {best['trial_id']}: {METRIC} = {best['metric']:.4f} after {best['epochs']} "
+                     f"epochs with {best['params']} (weights: {best['best_weights']})")
+        return summary
@@ -0,0 +1,233 @@
+import asyncio
+import math
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List
+from Deep_learning_projects.utils import log
+
+
+def _percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class InferenceQueueFull(Exception):
+    """
+    Raised by InferenceBatcher.submit when the admission queue is full.
+    `retry_after` is a hint (seconds) for the Retry-After header.
+    """
+    def __init__(self, retry_after: int):
+        super().__init__(f"Inference queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class InferenceStopped(RuntimeError):
+    """
+    Set on requests that were still waiting when their batcher stopped (a hot
+    reload that gave up draining, an unload, shutdown); a retry reaches the
+    model's current version.
+    """
+    def __init__(self):
+        super().__init__("The model version serving this request was stopped; retry")
+
+
+class InferenceBatcher:
+    """
+    Gathers concurrent /predict requests into micro-batches.
+    A batch is closed when it reaches `max_batch_size` or when its first request
+    has waited `max_wait_ms`; it then runs as one forward pass and every caller
+    gets its own slice of the results back.
+    At most `concurrency` batches run at once and at most `max_queue_size`
+    requests may wait; beyond that submit() fails fast with InferenceQueueFull
+    instead of letting latency grow without bound.
+    """
+    def __init__(self, predict_batch: Callable[[List[Any]], list], max_batch_size: int, max_wait_ms: float,
+                 concurrency: int = 1, max_queue_size: int = 0):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_s = max(0.0, float(max_wait_ms)) / 1000
+        # In-process mode runs one batch at a time; a worker pool can take one per worker
+        self.concurrency = max(1, int(concurrency))
+        self.max_queue_size = max(0, int(max_queue_size))  # 0 = unbounded
+
+        self._queue = None
+        self._task = None
+        self._slots = None
+        self._running = set()
+        self._collecting = []
+        self._stopped = False
+        # Inference threads keep the event loop free while a batch runs
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="inference")
+
+        # Tuning figures: how full batches get and how long requests wait to join one
+        self.batch_sizes = Counter()
+        self.queue_waits_ms = deque(maxlen=10000)
+        self.batches_run = 0
+        self.rejected = 0
+        self.inflight_batches = 0
+        self.batch_latency_s = deque(maxlen=100)
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._task = asyncio.create_task(self._run())
+        log.info(f"Inference batcher started (max_batch_size={self.max_batch_size}, "
+                 f"max_wait_ms={self.max_wait_s * 1000:g}, concurrency={self.concurrency})")
+
+    async def stop(self):
+        self._stopped = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        # Requests that never reached a forward pass would otherwise wait forever
+        pending, self._collecting = self._collecting, []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future, _ in pending:
+            if not future.done():
+                future.set_exception(InferenceStopped())
+        # Not waiting for running forward passes: that would block the event loop.
+        # Queued executor work is cancelled and its callers get InferenceStopped.
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def submit(self, source: Any) -> list:
+        """
+        Queues one image (path or array) and waits for its predictions.
+        """
+        if self._stopped:
+            raise InferenceStopped()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((source, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise InferenceQueueFull(retry_after=self._retry_after())
+        return await future
+
+    def _retry_after(self) -> int:
+        # Time to drain the current queue at the recent batch latency
+        if not self.batch_latency_s:
+            return 1
+        avg_latency = sum(self.batch_latency_s) / len(self.batch_latency_s)
+        batches_ahead = self._queue.qsize() / (self.max_batch_size * self.concurrency)
+        return max(1, math.ceil(batches_ahead * avg_latency))
+
+    async def run_batch(self, sources: List[Any]) -> list:
+        """
+        Runs an already-assembled batch (e.g. from /predict/batch) on the same
+        inference thread, taking turns with the micro-batches.
+        """
+        if self._stopped:
+            raise InferenceStopped()
+        async with self._slots:
+            self.batch_sizes[len(sources)] += 1
+            self.batches_run += 1
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self._executor, self.predict_batch, sources)
+            except asyncio.CancelledError:
+                # The executor dropped this batch because the batcher stopped
+                if self._stopped:
+                    raise InferenceStopped() from None
+                raise
+
+    async def _collect(self) -> list:
+        # Block for the first request, then give others up to max_wait to join
+        # Kept on self until handed to _execute, so stop() can fail them
+        batch = self._collecting = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_s
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        self._collecting = []
+        return batch
+
+    async def _run(self):
+        while True:
+            # Wait for a free slot first, so requests keep piling into the
+            # next batch while every slot is busy
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except asyncio.CancelledError:
+                self._slots.release()
+                raise
+            # Keep a reference so the running batch is not garbage-collected
+            task = asyncio.create_task(self._execute(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _execute(self, batch: list):
+        loop = asyncio.get_running_loop()
+        self.inflight_batches += 1
+        try:
+            started = time.perf_counter()
+            self.batch_sizes[len(batch)] += 1
+            self.batches_run += 1
+            for _, _, enqueued in batch:
+                self.queue_waits_ms.append((started - enqueued) * 1000)
+
+            sources = [source for source, _, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._executor, self.predict_batch, sources)
+                self.batch_latency_s.append(time.perf_counter() - started)
+            except asyncio.CancelledError:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(InferenceStopped())
+                raise
+            except Exception as e:
+                log.exception(f"Batched inference failed for {len(batch)} request(s): {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            for (_, future, _), result in zip(batch, results):
+                # The caller may have gone away (client disconnect) while we were busy
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self.inflight_batches -= 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        """
+        Batch-size histogram and queue-wait percentiles, for tuning
+        max_batch_size / max_wait_ms against p99 latency.
+        """
+        waits = list(self.queue_waits_ms)
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_s * 1000,
+            "concurrency": self.concurrency,
+            "batches_run": self.batches_run,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_size": self.max_queue_size,
+            "inflight_batches": self.inflight_batches,
+            "rejected": self.rejected,
+            "batch_size_histogram": {str(size): count for size, count in sorted(self.batch_sizes.items())},
+            "queue_wait_ms": {
+                "p50": round(_percentile(waits, 50), 3),
+                "p95": round(_percentile(waits, 95), 3),
+                "p99": round(_percentile(waits, 99), 3),
+                "max": round(max(waits), 3) if waits else 0.0,
+                "samples": len(waits),
+            },
+        }
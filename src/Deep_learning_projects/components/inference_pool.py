@@ -0,0 +1,214 @@
+import itertools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import torch
+import torch.multiprocessing as mp
+from Deep_learning_projects.utils import log
+from Deep_learning_projects.utils.metrics import observe_phases
+from Deep_learning_projects.components.inference_batcher import InferenceStopped
+
+# A job that keeps killing its worker is failed after this many attempts
+MAX_JOB_ATTEMPTS = 2
+
+
+def _worker_main(worker_id: int, pipeline, task_queue, result_queue, num_threads: int):
+    """
+    Inference process loop. `pipeline` arrives with its weights in shared memory,
+    so every worker maps the same pages instead of holding a private copy.
+    """
+    # Split the cores between workers instead of every process grabbing all of them
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+    try:
+        import cv2
+        cv2.setNumThreads(1)
+    except ImportError:
+        pass
+
+    while True:
+        job = task_queue.get()
+        if job is None:
+            break
+        job_id, sources = job
+        try:
+            # Phase timings travel back with the result: metrics live in the API process
+            result_queue.put((job_id, worker_id, pipeline.predict_batch_timed(sources), None))
+        except Exception as e:
+            result_queue.put((job_id, worker_id, None, f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    def __init__(self, worker_id: int):
+        self.worker_id = worker_id
+        self.process = None
+        self.task_queue = None
+        self.inflight = set()
+        self.restarts = 0
+
+
+class InferencePool:
+    """
+    N inference processes sharing one copy of the model weights.
+    Batches go to the least-loaded worker; a crashed worker is restarted and its
+    in-flight batches are re-dispatched, so the API process itself never goes down.
+    """
+    def __init__(self, pipeline, num_workers: int, threads_per_worker: int = 0):
+        self.num_workers = max(1, int(num_workers))
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // self.num_workers)
+
+        # Move parameters/buffers into shared memory once; the spawned workers
+        # receive handles to these pages when the pipeline is pickled to them.
+        if isinstance(pipeline.model.model, torch.nn.Module):
+            pipeline.model.model.share_memory()
+        else:
+            # Exported backends (ONNX, OpenVINO, ...) are loaded by each worker from disk
+            log.info("Non-PyTorch backend: inference workers load their own runtime session")
+        # Ship a clean copy: the warmed-up predictor is not picklable and the
+        # raw checkpoint would only add a second set of tensors
+        self._shared_pipeline = pipeline.clone()
+        self._shared_pipeline.model.ckpt = {}
+
+        self._ctx = mp.get_context("spawn")
+        self._result_queue = self._ctx.Queue()
+        self._workers = [_Worker(i) for i in range(self.num_workers)]
+        self._jobs = {}  # job_id -> [future, sources, worker_id, attempts]
+        self._job_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._running = False
+
+    def start(self):
+        self._running = True
+        for worker in self._workers:
+            worker.task_queue, worker.process = self._spawn(worker.worker_id)
+        threading.Thread(target=self._collect_results, name="pool-results", daemon=True).start()
+        threading.Thread(target=self._monitor, name="pool-monitor", daemon=True).start()
+        log.info(f"Inference pool started: {self.num_workers} worker(s) x {self.threads_per_worker} thread(s)")
+
+    def stop(self):
+        self._running = False
+        # Threads blocked in predict_batch() must not wait for results that never come
+        with self._lock:
+            jobs, self._jobs = self._jobs, {}
+            for worker in self._workers:
+                worker.inflight.clear()
+        for job in jobs.values():
+            if not job[0].done():
+                job[0].set_exception(InferenceStopped())
+        for worker in self._workers:
+            try:
+                worker.task_queue.put(None)
+            except Exception:
+                pass
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+
+    def _spawn(self, worker_id: int) -> tuple:
+        task_queue = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self._shared_pipeline, task_queue, self._result_queue, self.threads_per_worker),
+            name=f"inference-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        return task_queue, process
+
+    def _dispatch(self, job_id: int):
+        # Caller holds self._lock
+        worker = min(self._workers, key=lambda w: len(w.inflight))
+        job = self._jobs[job_id]
+        job[2] = worker.worker_id
+        job[3] += 1
+        worker.inflight.add(job_id)
+        worker.task_queue.put((job_id, job[1]))
+
+    def submit(self, sources: list) -> Future:
+        future = Future()
+        with self._lock:
+            if not self._running:
+                raise InferenceStopped()
+            job_id = next(self._job_ids)
+            self._jobs[job_id] = [future, sources, None, 0]
+            self._dispatch(job_id)
+        return future
+
+    def predict_batch(self, sources: list) -> list:
+        """
+        Blocking drop-in for PredictionPipeline.predict_batch.
+        """
+        return self.submit(sources).result()
+
+    def _collect_results(self):
+        while self._running:
+            try:
+                job_id, worker_id, result, error = self._result_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                self._workers[worker_id].inflight.discard(job_id)
+                job = self._jobs.pop(job_id, None)
+            if job is None:
+                continue
+            if error is not None:
+                job[0].set_exception(RuntimeError(error))
+            else:
+                detections, timings = result
+                observe_phases(timings)
+                job[0].set_result(detections)
+
+    def _monitor(self):
+        while self._running:
+            time.sleep(0.5)
+            for worker in self._workers:
+                if worker.process.is_alive() or not self._running:
+                    continue
+                # Started outside the lock: a spawn takes a while and submit() must not wait for it.
+                # Batches dispatched to the dead worker meanwhile are re-dispatched below.
+                task_queue, process = self._spawn(worker.worker_id)
+                with self._lock:
+                    if not self._running:
+                        process.terminate()
+                        return
+                    exitcode = worker.process.exitcode
+                    worker.task_queue, worker.process = task_queue, process
+                    orphaned = list(worker.inflight)
+                    worker.inflight.clear()
+                    worker.restarts += 1
+                    log.error(f"Inference worker {worker.worker_id} died (exit code {exitcode}); "
+                              f"restarted, re-dispatching {len(orphaned)} batch(es)")
+                    for job_id in orphaned:
+                        job = self._jobs.get(job_id)
+                        if job is None:
+                            continue
+                        if job[3] >= MAX_JOB_ATTEMPTS:
+                            self._jobs.pop(job_id)
+                            job[0].set_exception(RuntimeError("Inference worker crashed while running this batch"))
+                        else:
+                            self._dispatch(job_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "num_workers": self.num_workers,
+                "threads_per_worker": self.threads_per_worker,
+                "workers": [
+                    {
+                        "worker_id": w.worker_id,
+                        "pid": w.process.pid if w.process else None,
+                        "alive": bool(w.process and w.process.is_alive()),
+                        "inflight": len(w.inflight),
+                        "restarts": w.restarts,
+                    }
+                    for w in self._workers
+                ],
+            }
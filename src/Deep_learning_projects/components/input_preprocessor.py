@@ -0,0 +1,145 @@
+import threading
+from collections import OrderedDict
+import cv2
+import numpy as np
+from Deep_learning_projects.utils.startup import lazy_import
+
+# Letterbox grey used by YOLO
+PAD_VALUE = 114
+
+
+class InputPreprocessor:
+    """
+    Letterboxes, converts (BGR -> RGB, HWC -> CHW) and normalises decoded images
+    straight into reusable float32 input tensors, so the model receives a finished
+    batch and ultralytics skips its own per-call preprocessing and allocations.
+    Tensors are pooled per batch size (pinned when the model runs on a GPU, for
+    faster host-to-device copies), resize outputs per resized shape.
+    """
+    def __init__(self, image_size: int, device: str = "cpu", max_buffer_shapes: int = 8):
+        self.image_size = int(image_size)
+        self.device = str(device)
+        self.pin_memory = self.device.startswith("cuda") and lazy_import("torch").cuda.is_available()
+        self.max_buffer_shapes = max_buffer_shapes
+
+        # batch size -> free (n, 3, size, size) float32 tensors
+        self._tensors = OrderedDict()
+        # (h, w) -> free resize outputs
+        self._scratch = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.allocations = 0
+        self.reuses = 0
+
+    def fresh(self) -> "InputPreprocessor":
+        """
+        Same settings, empty pools: for another thread or worker process.
+        """
+        return InputPreprocessor(self.image_size, self.device, self.max_buffer_shapes)
+
+    def __reduce__(self):
+        # Pickled to inference-pool workers without its buffers and lock
+        return InputPreprocessor, (self.image_size, self.device, self.max_buffer_shapes)
+
+    @staticmethod
+    def supports(sources: list) -> bool:
+        """
+        Only decoded 3-channel images are handled here; paths, URLs and other
+        inputs are left to ultralytics.
+        """
+        return bool(sources) and all(
+            isinstance(source, np.ndarray) and source.ndim == 3 and source.shape[2] == 3
+            and source.dtype == np.uint8
+            for source in sources
+        )
+
+    def _take(self, pool: OrderedDict, key, allocate):
+        with self._lock:
+            free = pool.get(key)
+            if free:
+                pool.move_to_end(key)
+                self.reuses += 1
+                return free.pop()
+            self.allocations += 1
+        return allocate()
+
+    def _give(self, pool: OrderedDict, key, buffer):
+        with self._lock:
+            free = pool.setdefault(key, [])
+            pool.move_to_end(key)
+            if len(free) < 2:
+                free.append(buffer)
+            # Forget the least recently used shapes (other batch sizes / aspect ratios)
+            while len(pool) > self.max_buffer_shapes:
+                pool.popitem(last=False)
+
+    def _allocate_batch(self, count: int):
+        torch = lazy_import("torch")
+        size = self.image_size
+        return torch.empty((count, 3, size, size), dtype=torch.float32, pin_memory=self.pin_memory)
+
+    def prepare(self, images: list) -> tuple:
+        """
+        Fills a pooled tensor with the letterboxed batch.
+        Returns (tensor, transforms): transforms is an n x 3 array of
+        (gain, pad_x, pad_y) for scale_back(); give the tensor back with release().
+        """
+        torch = lazy_import("torch")
+        size = self.image_size
+        batch = self._take(self._tensors, len(images), lambda: self._allocate_batch(len(images)))
+        transforms = np.empty((len(images), 3), dtype=np.float32)
+
+        batch.fill_(PAD_VALUE)
+        scratch_used = []
+        for i, image in enumerate(images):
+            height, width = image.shape[:2]
+            gain = min(size / height, size / width)
+            h, w = max(1, round(height * gain)), max(1, round(width * gain))
+            # Same rounding as ultralytics' LetterBox, so boxes match its output
+            top = int(round((size - h) / 2 - 0.1))
+            left = int(round((size - w) / 2 - 0.1))
+
+            if (h, w) == (height, width):
+                resized = np.ascontiguousarray(image)
+            else:
+                resized = self._take(self._scratch, (h, w), lambda: np.empty((h, w, 3), dtype=np.uint8))
+                cv2.resize(image, (w, h), dst=resized, interpolation=cv2.INTER_LINEAR)
+                scratch_used.append(resized)
+
+            # BGR -> RGB and HWC -> CHW as one strided copy per channel,
+            # converting uint8 -> float32 on the way
+            pixels = torch.from_numpy(resized)
+            for channel in range(3):
+                batch[i, channel, top:top + h, left:left + w].copy_(pixels[:, :, 2 - channel])
+            transforms[i] = (gain, left, top)
+
+        batch.div_(255.0)
+        for resized in scratch_used:
+            self._give(self._scratch, resized.shape[:2], resized)
+        return batch, transforms
+
+    def release(self, batch):
+        self._give(self._tensors, len(batch), batch)
+
+    def scale_back(self, detections: dict, transform: np.ndarray, shape: tuple) -> dict:
+        """
+        Maps boxes from the letterboxed input back to the original image of `shape`.
+        """
+        boxes = detections["boxes"]
+        if len(boxes):
+            gain, pad_x, pad_y = transform
+            boxes -= np.array([pad_x, pad_y, pad_x, pad_y], dtype=np.float32)
+            boxes /= gain
+            np.clip(boxes[:, 0::2], 0, shape[1], out=boxes[:, 0::2])
+            np.clip(boxes[:, 1::2], 0, shape[0], out=boxes[:, 1::2])
+        return detections
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "image_size": self.image_size,
+                "pinned": self.pin_memory,
+                "allocations": self.allocations,
+                "reuses": self.reuses,
+                "batch_shapes": list(self._tensors),
+            }
@@ -0,0 +1,239 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import yaml
+from Deep_learning_projects.utils import log
+from Deep_learning_projects.utils.common import save_json
+from Deep_learning_projects.entity.config_entity import LabelIndexConfig
+from Deep_learning_projects.components.dataset_cache import SPLITS, label_file, read_labels, split_images
+
+# Label files parsed per worker task
+PARSE_CHUNK = 2048
+
+# COCO object-size buckets, in pixels at the training image size
+SMALL_AREA, MEDIUM_AREA = 32 ** 2, 96 ** 2
+
+# Malformed label files named in the validation error
+REPORTED_FILES = 5
+
+
+def _parse_label_file(path: str) -> tuple:
+    # Plain detection rows (class x y w h) are parsed in one vectorised step;
+    # files with polygon rows or stray tokens take the line-by-line reader.
+    # Returns (classes, boxes, error): a file that cannot be parsed has no
+    # labels and its error is kept, so it is reported with its path.
+    empty = np.zeros(0, dtype=np.int16), np.zeros((0, 4), dtype=np.float32)
+    try:
+        with open(path, "r") as f:
+            text = f.read()
+    except OSError:
+        return (*empty, "")
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not lines:
+        return (*empty, "")
+    try:
+        if all(len(line.split()) == 5 for line in lines):
+            values = np.array(" ".join(lines).split(), dtype=np.float32).reshape(-1, 5)
+            return values[:, 0].astype(np.int16), values[:, 1:], ""
+        return (*read_labels(path), "")
+    except ValueError as e:
+        return (*empty, str(e))
+
+
+def _parse_label_files(paths: list) -> list:
+    return [_parse_label_file(path) for path in paths]
+
+
+class LabelIndex:
+    """
+    Every YOLO label of every split in a few contiguous arrays: one row per
+    box (image id, class, normalised xywh), with per-image offsets into them.
+    Stored as one .npz; a later build only re-parses label files whose size or
+    mtime changed. Dataset statistics and the check against CLASSES are
+    array operations over the index.
+    """
+    def __init__(self, config: LabelIndexConfig):
+        self.config = config
+        self.workers = config.num_workers or os.cpu_count()
+        self.index = None
+
+    def _load_previous(self) -> dict:
+        path = Path(self.config.index_path)
+        if not path.exists():
+            return {}
+        with np.load(path) as stored:
+            previous = {name: stored[name] for name in stored.files}
+        if "parse_errors" not in previous:
+            # Written before parse errors were recorded: rebuilt from scratch
+            return {}
+        return {
+            "rows": {label: i for i, label in enumerate(previous["label_files"].tolist())},
+            **previous,
+        }
+
+    def build(self) -> dict:
+        """
+        Parses new and changed label files (in parallel) and reuses the rows of
+        unchanged ones from the stored index. Returns the index arrays.
+        """
+        splits = split_images(Path(self.config.training_data))
+        images, split_ids = [], []
+        for split_id, split in enumerate(SPLITS):
+            for image in splits.get(split, []):
+                images.append(image)
+                split_ids.append(split_id)
+        label_files = [label_file(image) for image in images]
+
+        stats = []
+        for path in label_files:
+            try:
+                stat = os.stat(path)
+                stats.append((stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                stats.append((-1, 0))
+        stats = np.asarray(stats, dtype=np.int64).reshape(-1, 2)
+
+        previous = self._load_previous()
+        parsed = [None] * len(label_files)
+        errors = [""] * len(label_files)
+        stale = []
+        for i, path in enumerate(label_files):
+            row = previous.get("rows", {}).get(path)
+            if row is not None and (previous["stats"][row] == stats[i]).all():
+                start, end = previous["offsets"][row], previous["offsets"][row + 1]
+                parsed[i] = (previous["classes"][start:end], previous["boxes"][start:end])
+                errors[i] = str(previous["parse_errors"][row])
+            else:
+                stale.append(i)
+
+        if stale:
+            log.info(f"Parsing {len(stale)} label files ({len(label_files) - len(stale)} unchanged)")
+            chunks = [stale[i:i + PARSE_CHUNK] for i in range(0, len(stale), PARSE_CHUNK)]
+            if len(chunks) > 1 and self.workers > 1:
+                with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks))) as executor:
+                    results = executor.map(_parse_label_files, [[label_files[i] for i in chunk] for chunk in chunks])
+                    for chunk, labels in zip(chunks, results):
+                        for i, (classes, boxes, error) in zip(chunk, labels):
+                            parsed[i], errors[i] = (classes, boxes), error
+            else:
+                for i in stale:
+                    classes, boxes, errors[i] = _parse_label_file(label_files[i])
+                    parsed[i] = (classes, boxes)
+
+        counts = np.fromiter((len(classes) for classes, _ in parsed), dtype=np.int64, count=len(parsed))
+        offsets = np.zeros(len(parsed) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        self.index = {
+            "images": np.asarray(images, dtype=str),
+            "label_files": np.asarray(label_files, dtype=str),
+            "splits": np.asarray(split_ids, dtype=np.int8),
+            "stats": stats,
+            "parse_errors": np.asarray(errors, dtype=str),
+            "offsets": offsets,
+            "image_ids": np.repeat(np.arange(len(parsed), dtype=np.int32), counts),
+            "classes": np.concatenate([c for c, _ in parsed]).astype(np.int16) if parsed else np.zeros(0, np.int16),
+            "boxes": np.concatenate([b for _, b in parsed]).astype(np.float32) if parsed else np.zeros((0, 4), np.float32),
+        }
+
+        if stale or len(previous.get("rows", {})) != len(label_files):
+            path = Path(self.config.index_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Written under a temporary name so a crash never leaves half an index
+            temporary = path.with_name(path.stem + ".tmp.npz")
+            np.savez(temporary, **self.index)
+            os.replace(temporary, path)
+        return self.index
+
+    def statistics(self) -> dict:
+        """
+        Class counts, images per class, box-size distribution and label
+        problems, per split and overall.
+        """
+        index = self.index if self.index is not None else self.build()
+        size = self.config.params_image_size[0]
+        num_classes = self.config.params_classes
+        classes, boxes = index["classes"].astype(np.int64), index["boxes"]
+        box_splits = index["splits"][index["image_ids"]]
+        malformed = index["parse_errors"] != ""
+
+        # Only valid ids go into bincount; the others are reported as errors
+        valid = (classes >= 0) & (classes < num_classes)
+        width_px, height_px = boxes[:, 2] * size, boxes[:, 3] * size
+        area = width_px * height_px
+        out_of_range = ((boxes[:, :2] < 0) | (boxes[:, :2] > 1)).any(axis=1) | (boxes[:, 2:] <= 0).any(axis=1) \
+            | (boxes[:, 2:] > 1).any(axis=1)
+
+        def summary(mask: np.ndarray, image_mask: np.ndarray) -> dict:
+            per_image = np.diff(index["offsets"])[image_mask]
+            pairs = np.unique(index["image_ids"][mask & valid] * num_classes + classes[mask & valid])
+            quantiles = [0.05, 0.25, 0.5, 0.75, 0.95]
+            return {
+                "images": int(image_mask.sum()),
+                "images_without_labels": int((per_image == 0).sum()),
+                "boxes": int(mask.sum()),
+                "class_counts": np.bincount(classes[mask & valid], minlength=num_classes).tolist(),
+                "images_per_class": np.bincount(pairs % num_classes, minlength=num_classes).tolist(),
+                "box_width_px": dict(zip(map(str, quantiles), np.quantile(width_px[mask], quantiles).round(1).tolist()))
+                if mask.any() else {},
+                "box_height_px": dict(zip(map(str, quantiles), np.quantile(height_px[mask], quantiles).round(1).tolist()))
+                if mask.any() else {},
+                "box_sizes": {
+                    "small": int((area[mask] < SMALL_AREA).sum()),
+                    "medium": int(((area[mask] >= SMALL_AREA) & (area[mask] < MEDIUM_AREA)).sum()),
+                    "large": int((area[mask] >= MEDIUM_AREA).sum()),
+                },
+                "invalid_class_boxes": int((mask & ~valid).sum()),
+                "out_of_range_boxes": int((mask & out_of_range).sum()),
+                "malformed_label_files": int((malformed & image_mask).sum()),
+            }
+
+        stats = {"all": summary(np.ones(len(classes), dtype=bool), np.ones(len(index["images"]), dtype=bool))}
+        for split_id, split in enumerate(SPLITS):
+            image_mask = index["splits"] == split_id
+            if image_mask.any():
+                stats[split] = summary(box_splits == split_id, image_mask)
+        invalid_ids = np.unique(classes[~valid]).tolist()
+        stats["invalid_class_ids"] = invalid_ids
+        stats["malformed_label_files"] = {
+            str(path): str(error) for path, error in zip(index["label_files"][malformed], index["parse_errors"][malformed])
+        }
+        return stats
+
+    def validate(self) -> dict:
+        """
+        Builds the index, writes the statistics and raises ValueError when the
+        labels or data.yaml do not match CLASSES in params.yaml, or when label
+        files cannot be parsed.
+        """
+        stats = self.statistics()
+        path = Path(self.config.stats_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        save_json(path=path, data=stats)
+
+        problems = []
+        num_classes = self.config.params_classes
+        with open(self.config.training_data, "r") as f:
+            data = yaml.safe_load(f)
+        names = data.get("names")
+        declared = data.get("nc", len(names) if names is not None else None)
+        if declared is not None and int(declared) != num_classes:
+            problems.append(f"data.yaml declares {declared} classes but params.yaml CLASSES is {num_classes}")
+        if stats["invalid_class_ids"]:
+            problems.append(f"{stats['all']['invalid_class_boxes']} boxes use class ids outside 0..{num_classes - 1}: "
+                            f"{stats['invalid_class_ids']}")
+        if stats["malformed_label_files"]:
+            reported = [f"{path} ({error})" for path, error in stats["malformed_label_files"].items()][:REPORTED_FILES]
+            problems.append(f"{len(stats['malformed_label_files'])} label files could not be parsed: "
+                            + ", ".join(reported))
+        if problems:
+            raise ValueError("Dataset does not match params.yaml: " + "; ".join(problems))
+
+        unused = [i for i, count in enumerate(stats["all"]["class_counts"]) if count == 0]
+        if unused:
+            log.warning(f"Classes without any labels: {unused}")
+        if stats["all"]["out_of_range_boxes"]:
+            log.warning(f"{stats['all']['out_of_range_boxes']} boxes lie outside the image or have no area")
+        log.info(f"Label index: {stats['all']['images']} images, {stats['all']['boxes']} boxes, "
+                 f"class counts {stats['all']['class_counts']}")
+        return stats
@@ -0,0 +1,289 @@
+import asyncio
+import importlib
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+import cv2
+import httpx
+import numpy as np
+from Deep_learning_projects.utils import log
+from Deep_learning_projects.utils.common import get_peak_rss_mb, save_json
+from Deep_learning_projects.entity.config_entity import LoadTestConfig
+
+# How often the server's RSS is read from /metrics during a run
+MEMORY_SAMPLE_INTERVAL_S = 0.5
+
+
+def make_images(num_images: int, sizes: list, seed: int = 0) -> list:
+    """
+    Synthetic JPEGs with a few filled shapes on a noisy background, cycling through `sizes`.
+    """
+    rng = np.random.default_rng(seed)
+    images = []
+    for i in range(num_images):
+        width, height = sizes[i % len(sizes)]
+        image = rng.integers(0, 64, size=(height, width, 3), dtype=np.uint8)
+        for _ in range(5):
+            x1, y1 = int(rng.integers(0, width - 1)), int(rng.integers(0, height - 1))
+            x2 = min(width - 1, x1 + int(rng.integers(width // 20 + 1, width // 4 + 2)))
+            y2 = min(height - 1, y1 + int(rng.integers(height // 20 + 1, height // 4 + 2)))
+            color = tuple(int(c) for c in rng.integers(64, 256, size=3))
+            cv2.rectangle(image, (x1, y1), (x2, y2), color, thickness=-1)
+        ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        if not ok:
+            raise RuntimeError("Could not encode synthetic benchmark image")
+        images.append(encoded.tobytes())
+    return images
+
+
+def make_unique(jpeg: bytes, index: int) -> bytes:
+    """
+    Inserts a JPEG comment segment right after the SOI marker: the pixels decode
+    identically but the bytes (and so the prediction-cache key) differ per request.
+    """
+    comment = f"load-test {index}".encode()
+    segment = b"\xff\xfe" + (len(comment) + 2).to_bytes(2, "big") + comment
+    return jpeg[:2] + segment + jpeg[2:]
+
+
+def summarize(latencies: list, statuses: dict, errors: int, elapsed: float) -> dict:
+    total = sum(statuses.values()) + errors
+    failed = errors + sum(count for status, count in statuses.items() if status >= 400)
+    ms = np.asarray(latencies, dtype=np.float64) * 1000
+    latency = {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0, "max": 0.0}
+    if len(ms):
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        latency = {"p50": p50, "p95": p95, "p99": p99, "mean": ms.mean(), "max": ms.max()}
+    return {
+        "requests": total,
+        "ok": total - failed,
+        "failed": failed,
+        "error_rate": round(failed / total, 4) if total else 0.0,
+        "status_counts": {str(status): count for status, count in sorted(statuses.items())},
+        "client_errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round((total - failed) / elapsed, 3) if elapsed else 0.0,
+        "latency_ms": {k: round(float(v), 3) for k, v in latency.items()},
+    }
+
+
+def compare_reports(baseline: dict, current: dict, max_latency_regression: float,
+                    max_throughput_regression: float, max_error_rate: float) -> list:
+    """
+    Gate for review: returns the reasons `current` is worse than `baseline`
+    beyond the allowed margins (empty when it passes).
+    """
+    failures = []
+    base_p95 = baseline["latency_ms"]["p95"]
+    p95 = current["latency_ms"]["p95"]
+    if base_p95 and p95 > base_p95 * (1 + max_latency_regression):
+        failures.append(f"p95 latency {p95} ms is more than {max_latency_regression:.0%} above baseline {base_p95} ms")
+
+    base_rps = baseline["throughput_rps"]
+    rps = current["throughput_rps"]
+    if base_rps and rps < base_rps * (1 - max_throughput_regression):
+        failures.append(f"throughput {rps} req/s is more than {max_throughput_regression:.0%} below baseline {base_rps} req/s")
+
+    if current["error_rate"] > max_error_rate:
+        failures.append(f"error rate {current['error_rate']} exceeds {max_error_rate}")
+    return failures
+
+
+def _server_rss_mb(metrics_text: str) -> float:
+    for line in metrics_text.splitlines():
+        if line.startswith("process_resident_memory_bytes "):
+            return float(line.split()[1]) / (1024 * 1024)
+    return 0.0
+
+
+class LoadTest:
+    """
+    Drives /predict with synthetic images and records throughput, latency
+    percentiles, error rate and peak server memory.
+    The app runs in this process (mode=inprocess), is started with uvicorn on
+    localhost (mode=localhost), or is an already running server (mode=url).
+    """
+    def __init__(self, config: LoadTestConfig, label: str = ""):
+        self.config = config
+        self.label = label
+        self.report = {}
+
+    async def _request(self, client: httpx.AsyncClient, index: int, images: list) -> int:
+        jpeg = images[index % len(images)]
+        if self.config.unique_requests:
+            jpeg = make_unique(jpeg, index)
+        response = await client.post(
+            "/predict",
+            params={"format": self.config.response_format},
+            files={"file": (f"load_test_{index}.jpg", jpeg, "image/jpeg")}
+        )
+        await response.aread()
+        return response.status_code
+
+    async def _sample_memory(self, client: httpx.AsyncClient, stop: asyncio.Event) -> float:
+        peak = 0.0
+        while not stop.is_set():
+            try:
+                response = await client.get("/metrics")
+                peak = max(peak, _server_rss_mb(response.text))
+            except httpx.HTTPError:
+                pass
+            try:
+                await asyncio.wait_for(stop.wait(), MEMORY_SAMPLE_INTERVAL_S)
+            except asyncio.TimeoutError:
+                pass
+        return peak
+
+    async def _wait_ready(self, client: httpx.AsyncClient, timeout_s: float = 300):
+        # The app accepts connections before its model has loaded
+        deadline = time.perf_counter() + timeout_s
+        while time.perf_counter() < deadline:
+            try:
+                if (await client.get("/ready")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+        raise TimeoutError(f"Model was not ready within {timeout_s} s")
+
+    async def _drive(self, client: httpx.AsyncClient, images: list) -> dict:
+        config = self.config
+        await self._wait_ready(client)
+
+        for index in range(config.warmup_requests):
+            await self._request(client, index, images)
+
+        latencies, statuses, errors = [], {}, 0
+        counter = iter(range(config.warmup_requests, sys.maxsize))
+        slots = asyncio.Semaphore(max(1, config.concurrency))
+        start = time.perf_counter()
+        deadline = start + config.duration_s
+
+        async def one(scheduled: float):
+            nonlocal errors
+            async with slots:
+                try:
+                    status = await self._request(client, next(counter), images)
+                    statuses[status] = statuses.get(status, 0) + 1
+                except httpx.HTTPError as e:
+                    errors += 1
+                    log.debug(f"Load test request failed: {e}")
+                    return
+            # From the scheduled send time, so a backed-up client does not hide queueing
+            latencies.append(time.perf_counter() - scheduled)
+
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(self._sample_memory(client, stop))
+
+        if config.rate > 0:
+            # Open loop: requests are sent on a fixed schedule whatever the latency
+            tasks, sent = [], 0
+            while True:
+                scheduled = start + sent / config.rate
+                if scheduled >= deadline:
+                    break
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                tasks.append(asyncio.create_task(one(scheduled)))
+                sent += 1
+            await asyncio.gather(*tasks)
+        else:
+            # Closed loop: `concurrency` clients, each sending as soon as its last answer arrives
+            async def client_loop():
+                while time.perf_counter() < deadline:
+                    await one(time.perf_counter())
+            await asyncio.gather(*(client_loop() for _ in range(max(1, config.concurrency))))
+
+        elapsed = time.perf_counter() - start
+        stop.set()
+        results = summarize(latencies, statuses, errors, elapsed)
+        results["server_peak_rss_mb"] = round(await sampler, 2)
+
+        # What was being measured: backend, batching and worker settings
+        results["server"] = {}
+        for name, path in (("model", "/model/info"), ("batching", "/stats/batching"), ("workers", "/stats/workers")):
+            try:
+                results["server"][name] = (await client.get(path)).json()
+            except (httpx.HTTPError, ValueError):
+                pass
+        return results
+
+    async def _run_inprocess(self, images: list) -> dict:
+        module_name, _, attribute = self.config.app.partition(":")
+        if os.getcwd() not in sys.path:
+            sys.path.insert(0, os.getcwd())
+        app = getattr(importlib.import_module(module_name), attribute or "app")
+
+        # ASGITransport does not run the lifespan, so start it here
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+                return await self._drive(client, images)
+
+    async def _run_remote(self, base_url: str, images: list) -> dict:
+        limits = httpx.Limits(max_connections=max(1, self.config.concurrency) + 1)
+        async with httpx.AsyncClient(base_url=base_url, timeout=None, limits=limits) as client:
+            return await self._drive(client, images)
+
+    def _start_server(self) -> tuple:
+        base_url = f"http://{self.config.host}:{self.config.port}"
+        process = subprocess.Popen([
+            sys.executable, "-m", "uvicorn", self.config.app,
+            "--host", self.config.host, "--port", str(self.config.port), "--log-level", "warning"
+        ])
+        # Only wait for the port here; _drive waits for the model via /ready
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {process.returncode} before the server came up")
+            try:
+                httpx.get(f"{base_url}/health", timeout=2)
+                return process, base_url
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.5)
+        process.terminate()
+        raise TimeoutError(f"Server at {base_url} did not come up within 60 s")
+
+    def run(self) -> dict:
+        config = self.config
+        images = make_images(config.num_images, config.image_sizes)
+        log.info(f"Load test ({config.mode}): concurrency {config.concurrency}, "
+                 f"rate {config.rate or 'unbounded'} req/s, {config.duration_s} s")
+
+        if config.mode == "inprocess":
+            results = asyncio.run(self._run_inprocess(images))
+        elif config.mode == "localhost":
+            process, base_url = self._start_server()
+            try:
+                results = asyncio.run(self._run_remote(base_url, images))
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+        elif config.mode == "url":
+            results = asyncio.run(self._run_remote(config.url, images))
+        else:
+            raise ValueError(f"Unknown load_test mode '{config.mode}' (inprocess, localhost or url)")
+
+        self.report = {
+            "label": self.label,
+            "mode": config.mode,
+            "concurrency": config.concurrency,
+            "rate": config.rate,
+            "duration_s": config.duration_s,
+            "image_sizes": config.image_sizes,
+            "unique_requests": config.unique_requests,
+            "response_format": config.response_format,
+            **results,
+            # In-process this includes the client as well as the app
+            "client_peak_rss_mb": round(get_peak_rss_mb(), 2),
+        }
+        Path(config.report_path).parent.mkdir(parents=True, exist_ok=True)
+        save_json(path=Path(config.report_path), data=self.report)
+
+        latency = self.report["latency_ms"]
+        log.info(f"{self.report['throughput_rps']} req/s, p50 {latency['p50']} ms, p95 {latency['p95']} ms, "
+                 f"p99 {latency['p99']} ms, error rate {self.report['error_rate']}, "
+                 f"server peak RSS {self.report['server_peak_rss_mb']} MB")
+        return self.report
@@ -1,45 +1,61 @@
 import os
-import mlflow
-import mlflow.pytorch # Changed from mlflow.keras to pytorch for YOLO
 from pathlib import Path
 from urllib.parse import urlparse
-from ultralytics import YOLO
 from Deep_learning_projects.utils.common import save_json
-from Deep_learning_projects.entity.config_entity import EvaluationConfig
+from Deep_learning_projects.utils.startup import lazy_import
+from Deep_learning_projects.entity.config_entity import EvaluationConfig, DatasetCacheConfig
+from Deep_learning_projects.components.dataset_cache import DatasetCache
 from Deep_learning_projects.utils import log
 class Evaluation:
-    def __init__(self, config: EvaluationConfig):
+    def __init__(self, config: EvaluationConfig, cache_config: DatasetCacheConfig = None):
         self.config = config
+        self.cache_config = cache_config
 
     def evaluation(self):
         """
         Loads the YOLO model and runs validation on the test/val set defined in data.yaml.
         """
         # 1. Load the model (best.pt)
+        YOLO = lazy_import("ultralytics").YOLO
         self.model = YOLO(self.config.path_of_model)
         
-        # 2. Run Validation
+        # 2. Read the split from the dataset cache built for training, if enabled
+        validator = None
+        if self.cache_config is not None and self.cache_config.enabled:
+            cache_dir = DatasetCache(config=self.cache_config).build()
+            validator = lazy_import("Deep_learning_projects.components.cached_dataset").validator_with_cache(cache_dir)
+
+        # 3. Run Validation
         # YOLO's val() method automatically handles data loading using the 'data.yaml' file.
         # We don't need ImageDataGenerator anymore.
         self.results = self.model.val(
             data=self.config.training_data,
             imgsz=self.config.params_image_size[0],
             batch=self.config.params_batch_size,
-            split='test' # Validates on the 'val' split defined in data.yaml
+            split='test', # Validates on the 'val' split defined in data.yaml
+            validator=validator
         )
 
-        # 3. Extract Metrics
-        # Unlike Keras (loss, acc), YOLO Object Detection uses Mean Average Precision (mAP)
-        self.score = {
-            "mAP_50": self.results.box.map50,       # mAP at IoU=0.50
-            "mAP_50_95": self.results.box.map,      # mAP at IoU=0.50:0.95
-            "precision": self.results.box.mp,       # Mean Precision
-            "recall": self.results.box.mr           # Mean Recall
-        }
+        # 4. Extract Metrics
+        self.score = self.metrics_from_results(self.results)
         
-        # 4. Save to local JSON
+        # 5. Save to local JSON
         self.save_score()
 
+    @staticmethod
+    def metrics_from_results(results) -> dict:
+        """
+        The metrics written to scores.json, from the output of YOLO.val().
+        Shared with the quantisation stage so both score models the same way.
+        """
+        # Unlike Keras (loss, acc), YOLO Object Detection uses Mean Average Precision (mAP)
+        return {
+            "mAP_50": results.box.map50,       # mAP at IoU=0.50
+            "mAP_50_95": results.box.map,      # mAP at IoU=0.50:0.95
+            "precision": results.box.mp,       # Mean Precision
+            "recall": results.box.mr           # Mean Recall
+        }
+
     def save_score(self):
         """
         Saves the metrics dictionary to scores.json
@@ -50,6 +66,9 @@ class Evaluation:
         """
         Logs parameters, metrics, and the model to MLflow.
         """
+        mlflow = lazy_import("mlflow")
+        lazy_import("mlflow.pytorch") # Changed from mlflow.keras to pytorch for YOLO
+
         # Set the URI (DagsHub or Local)
         mlflow.set_registry_uri(self.config.mlflow_uri)
         tracking_url_type_store = urlparse(mlflow.get_tracking_uri()).scheme
@@ -0,0 +1,233 @@
+import shutil
+import statistics
+import time
+import yaml
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from Deep_learning_projects.utils import log
+from Deep_learning_projects.utils.common import save_json
+from Deep_learning_projects.utils.startup import lazy_import
+from Deep_learning_projects.utils.box_ops import box_iou
+from Deep_learning_projects.entity.config_entity import ModelExportConfig
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+# Extra export arguments per format; dynamic axes let the backend take batches
+EXPORT_KWARGS = {
+    "onnx": {"dynamic": True, "simplify": True},
+    "openvino": {"dynamic": True},
+    "torchscript": {},
+}
+
+
+def sample_images(data_yaml: Path, split: str, limit: int) -> list:
+    """
+    Up to `limit` image paths from a split ('train', 'val', 'test') of data.yaml.
+    """
+    with open(data_yaml, "r") as f:
+        data = yaml.safe_load(f)
+
+    split_path = data.get(split) or data.get("val")
+    if not split_path:
+        return []
+    split_path = Path(split_path)
+    if not split_path.is_absolute():
+        split_path = Path(data_yaml).parent / split_path
+
+    images = sorted(
+        str(p) for p in split_path.rglob("*")
+        if p.suffix.lower() in IMAGE_EXTENSIONS
+    )
+    return images[:limit]
+
+
+def _run_backend(model_path: str, images: list, imgsz: int, batch_size: int = 1) -> dict:
+    """
+    Runs in a fresh process so load time and peak RSS belong to this backend alone.
+    With batch_size > 1 the images are also run the way the API serves them:
+    decoded, letterboxed by InputPreprocessor into BCHW batches of batch_size.
+    """
+    from Deep_learning_projects.utils.common import get_peak_rss_mb
+    from Deep_learning_projects.utils.prediction_format import detections_from_result
+
+    YOLO = lazy_import("ultralytics").YOLO
+    start = time.perf_counter()
+    model = YOLO(model_path, task="detect")
+    # The first call builds the predictor; count it as part of loading
+    model(images[0], imgsz=imgsz, verbose=False)
+    load_time = time.perf_counter() - start
+
+    latencies, detections = [], []
+    for image in images:
+        start = time.perf_counter()
+        result = model(image, imgsz=imgsz, verbose=False)[0]
+        latencies.append(time.perf_counter() - start)
+        detections.append(detections_from_result(result))
+
+    report = {
+        "load_time_s": round(load_time, 4),
+        "latency_ms_p50": round(statistics.median(latencies) * 1000, 3),
+        "latency_ms_mean": round(statistics.fmean(latencies) * 1000, 3),
+        "detections": detections,
+    }
+    if batch_size > 1:
+        report.update(_run_batches(model, images, imgsz, batch_size))
+    report["peak_rss_mb"] = round(get_peak_rss_mb(), 2)
+    return report
+
+
+def _run_batches(model, images: list, imgsz: int, batch_size: int) -> dict:
+    # Imported here: the batched path needs torch and the serving pipeline
+    from Deep_learning_projects.components.input_preprocessor import InputPreprocessor
+    from Deep_learning_projects.pipeline.prediction_pipeline import PredictionPipeline
+
+    cv2 = lazy_import("cv2")
+    pipeline = PredictionPipeline(model=model, preprocessor=InputPreprocessor(imgsz))
+    # Unreadable files are skipped alike by every backend, so the lists still line up
+    decoded = [image for image in (cv2.imread(path, cv2.IMREAD_COLOR) for path in images) if image is not None]
+    if not decoded:
+        raise ValueError("None of the benchmark images could be decoded for the batched run")
+    chunks = [decoded[i:i + batch_size] for i in range(0, len(decoded), batch_size)]
+
+    # First batch of this shape sets up the dynamic-axes backend; not timed
+    pipeline.predict_batch_timed(chunks[0])
+    latencies, detections = [], []
+    for chunk in chunks:
+        start = time.perf_counter()
+        batch_detections, _ = pipeline.predict_batch_timed(chunk)
+        latencies.append(time.perf_counter() - start)
+        detections.extend(batch_detections)
+
+    return {
+        "batch_size": batch_size,
+        "batch_latency_ms_p50": round(statistics.median(latencies) * 1000, 3),
+        "batch_images_per_s": round(len(decoded) / sum(latencies), 2),
+        "batch_detections": detections,
+    }
+
+
+def benchmark_backend(model_path: str, images: list, imgsz: int, batch_size: int = 1) -> dict:
+    if not images:
+        raise ValueError(f"No images to benchmark {model_path} on")
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        return executor.submit(_run_backend, str(model_path), images, imgsz, batch_size).result()
+
+
+def detection_match_rate(reference: list, candidate: list, iou_threshold: float, conf_tolerance: float) -> float:
+    """
+    Share of reference detections that the candidate reproduces: same class,
+    IoU >= iou_threshold and confidence within conf_tolerance.
+    Extra candidate detections count against it as well.
+    """
+    matched, total = 0, 0
+    for ref, cand in zip(reference, candidate):
+        total += max(len(ref["conf"]), len(cand["conf"]))
+        if len(ref["conf"]) == 0 or len(cand["conf"]) == 0:
+            continue
+        iou = box_iou(ref["boxes"], cand["boxes"])
+        same_class = ref["cls"][:, None] == cand["cls"][None, :]
+        close_conf = np.abs(ref["conf"][:, None] - cand["conf"][None, :]) <= conf_tolerance
+        candidates = (iou >= iou_threshold) & same_class & close_conf
+        # Greedy one-to-one matching, best IoU first
+        used = set()
+        for i in np.argsort(-ref["conf"]):
+            for j in np.argsort(-iou[i]):
+                if candidates[i, j] and j not in used:
+                    used.add(j)
+                    matched += 1
+                    break
+    return matched / total if total else 1.0
+
+
+class ModelExport:
+    def __init__(self, config: ModelExportConfig):
+        self.config = config
+        self.report = {}
+
+    def export(self) -> dict:
+        """
+        Exports best.pt to every configured CPU format.
+        Returns {format: path of the exported artifact}.
+        """
+        exported = {}
+        imgsz = self.config.params_image_size[0]
+        root_dir = Path(self.config.root_dir)
+
+        for fmt in self.config.formats:
+            try:
+                log.info(f"Exporting {self.config.path_of_model} to {fmt}")
+                model = lazy_import("ultralytics").YOLO(str(self.config.path_of_model))
+                output = model.export(format=fmt, imgsz=imgsz, **EXPORT_KWARGS.get(fmt, {}))
+
+                # Ultralytics writes next to the weights; keep every artifact under root_dir
+                destination = root_dir / Path(output).name
+                if destination.is_dir():
+                    shutil.rmtree(destination)
+                elif destination.exists():
+                    destination.unlink()
+                shutil.move(str(output), str(destination))
+                exported[fmt] = str(destination)
+                log.info(f"Exported {fmt} model saved at: {destination}")
+            except Exception as e:
+                log.exception(f"Export to {fmt} failed: {e}")
+
+        return exported
+
+    def validate_and_benchmark(self, exported: dict):
+        """
+        Checks each backend's detections against PyTorch and records load time,
+        per-image latency and peak RSS; the fastest backend that matches is selected.
+        Parity is checked on file paths and, with benchmark_batch_size > 1, on
+        preprocessed BCHW batches, the input the dynamic-axes exports get when served.
+        """
+        images = sample_images(self.config.training_data, "val", self.config.benchmark_images)
+        if not images:
+            raise FileNotFoundError(f"No validation images found through {self.config.training_data}")
+        imgsz = self.config.params_image_size[0]
+        batch_size = self.config.benchmark_batch_size
+
+        backends = {"pytorch": str(self.config.path_of_model), **exported}
+        results = {}
+        for name, path in backends.items():
+            log.info(f"Benchmarking {name} backend on {len(images)} image(s)")
+            try:
+                results[name] = benchmark_backend(path, images, imgsz, batch_size)
+            except Exception as e:
+                log.exception(f"Benchmark of {name} failed: {e}")
+
+        if "pytorch" not in results:
+            raise RuntimeError("PyTorch reference run failed; cannot validate exported backends")
+
+        reference = results["pytorch"]["detections"]
+        batch_reference = results["pytorch"].get("batch_detections")
+        report = {}
+        for name, result in results.items():
+            match_rate = detection_match_rate(
+                reference, result.pop("detections"),
+                self.config.parity_iou_threshold, self.config.parity_conf_tolerance
+            )
+            report[name] = {
+                "path": backends[name],
+                **result,
+                "match_rate": round(match_rate, 4),
+                "parity_ok": match_rate >= self.config.parity_min_match_rate,
+            }
+            if batch_reference is not None:
+                batch_match_rate = detection_match_rate(
+                    batch_reference, report[name].pop("batch_detections"),
+                    self.config.parity_iou_threshold, self.config.parity_conf_tolerance
+                )
+                report[name]["batch_match_rate"] = round(batch_match_rate, 4)
+                report[name]["parity_ok"] &= batch_match_rate >= self.config.parity_min_match_rate
+            log.info(f"{name}: p50 {report[name]['latency_ms_p50']} ms, "
+                     f"match rate {match_rate:.3f}, peak RSS {report[name]['peak_rss_mb']} MB")
+
+        passing = [name for name, entry in report.items() if entry["parity_ok"]]
+        selected = min(passing, key=lambda name: report[name]["latency_ms_p50"])
+
+        self.report = {"selected": selected, "images": len(images), "imgsz": imgsz,
+                       "batch_size": batch_size, "backends": report}
+        save_json(path=Path(self.config.report_path), data=self.report)
+        log.info(f"Fastest backend within tolerance: {selected}")
@@ -0,0 +1,187 @@
+import asyncio
+import dataclasses
+import time
+from Deep_learning_projects.utils import log
+from Deep_learning_projects.entity.config_entity import PredictionConfig
+from Deep_learning_projects.components.model_reloader import ModelReloader
+
+
+class UnknownModel(KeyError):
+    """
+    Raised by ModelFleet.get for a name not declared under `prediction.models`.
+    """
+
+
+class ModelCapacityError(Exception):
+    """
+    Raised when a model cannot be loaded within `memory_budget_mb` because the
+    models that would have to be unloaded are still serving requests.
+    `retry_after` is a hint (seconds) for the Retry-After header.
+    """
+    def __init__(self, message: str, retry_after: int = 5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ModelFleet:
+    """
+    Several models served side by side, declared in config.yaml:
+    `prediction` itself describes the default model, and every entry of
+    `prediction.models` overrides some of its fields (model_path, backend,
+    num_workers, max_memory_mb, ...). Each model has its own ModelReloader, so
+    its own batcher / worker pool and hot reload.
+
+    The default model stays loaded. Others are loaded on first request and
+    unloaded again when idle for `model_idle_unload_s`, or least recently used
+    first when loading another one would exceed `memory_budget_mb`.
+    """
+    def __init__(self, config: PredictionConfig):
+        self.config = config
+        self.default = config.default_model
+        self.specs = {self.default: config}
+        fields = {field.name for field in dataclasses.fields(config)}
+        for name, overrides in (config.models or {}).items():
+            if name == self.default:
+                continue
+            unknown = sorted(set(overrides or {}) - fields)
+            if unknown:
+                raise ValueError(f"prediction.models.{name}: unknown setting(s) {', '.join(unknown)}; "
+                                 f"use fields of the prediction section")
+            # Only the default model watches for promoted weights unless told otherwise
+            overrides = {"reload_poll_s": 0, **(overrides or {})}
+            self.specs[name] = dataclasses.replace(config, **overrides)
+
+        self.reloaders = {}  # name -> ModelReloader, for loaded models
+        self.last_used = {}
+        self.loads = {name: 0 for name in self.specs}
+        self.unloads = {name: 0 for name in self.specs}
+        self._load_lock = asyncio.Lock()
+        self._sweeper = None
+
+    async def start(self):
+        await self._load(self.default)
+        if self.config.model_idle_unload_s > 0 and len(self.specs) > 1:
+            self._sweeper = asyncio.create_task(self._sweep_idle())
+
+    async def stop(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+        for reloader in list(self.reloaders.values()):
+            await reloader.stop()
+        self.reloaders.clear()
+
+    async def get(self, name: str = None) -> ModelReloader:
+        """
+        The reloader of model `name` (default model when None), loading it if needed.
+        """
+        name = name or self.default
+        if name not in self.specs:
+            raise UnknownModel(f"Unknown model '{name}'; available: {', '.join(self.specs)}")
+        reloader = self.reloaders.get(name)
+        if reloader is None:
+            # One load at a time: keeps the budget check and RSS measurements honest
+            async with self._load_lock:
+                reloader = self.reloaders.get(name) or await self._load(name)
+        self.last_used[name] = time.monotonic()
+        return reloader
+
+    def memory_mb(self, name: str) -> float:
+        reloader = self.reloaders.get(name)
+        if reloader is None or reloader.active is None:
+            return 0.0
+        return reloader.active.registry.memory_mb()
+
+    def _expected_mb(self, name: str) -> float:
+        return self.specs[name].max_memory_mb
+
+    async def _load(self, name: str) -> ModelReloader:
+        if name != self.default:
+            await self._make_room(name)
+        spec = self.specs[name]
+        log.info(f"Loading model '{name}' from {spec.model_path}")
+        reloader = ModelReloader(config=spec, name=name)
+        try:
+            await reloader.start()
+        except Exception:
+            await reloader.stop()
+            raise
+        self.reloaders[name] = reloader
+        self.last_used[name] = time.monotonic()
+        self.loads[name] += 1
+
+        used = self.memory_mb(name)
+        if spec.max_memory_mb and used > spec.max_memory_mb:
+            log.warning(f"Model '{name}' uses {used:.0f} MB, over its {spec.max_memory_mb:.0f} MB budget")
+        return reloader
+
+    async def _make_room(self, name: str):
+        budget = self.config.memory_budget_mb
+        if budget <= 0:
+            return
+        needed = self._expected_mb(name)
+        # Least recently used first; the default model and busy models stay
+        candidates = sorted(
+            (n for n in self.reloaders if n != self.default),
+            key=lambda n: self.last_used.get(n, 0)
+        )
+        while sum(self.memory_mb(n) for n in self.reloaders) + needed > budget:
+            idle = [n for n in candidates if n in self.reloaders and not self.reloaders[n].busy()]
+            if not idle:
+                raise ModelCapacityError(
+                    f"Not enough memory budget for model '{name}' ({needed:.0f} MB needed, "
+                    f"{budget:.0f} MB total); loaded models are busy"
+                )
+            await self._unload(idle[0], reason="memory budget")
+
+    async def unload(self, name: str, reason: str = "request"):
+        """
+        Stops routing requests to `name`, lets the running ones finish (up to
+        its drain_timeout_s) and frees it. Loads wait until it is gone.
+        """
+        async with self._load_lock:
+            await self._unload(name, reason)
+
+    async def _unload(self, name: str, reason: str):
+        # Caller holds _load_lock
+        reloader = self.reloaders.pop(name, None)
+        if reloader is None:
+            return
+        freed = reloader.active.registry.memory_mb() if reloader.active is not None else 0.0
+        await reloader.drain_and_stop(self.specs[name].drain_timeout_s)
+        self.unloads[name] += 1
+        log.info(f"Unloaded model '{name}' ({reason}), ~{freed:.0f} MB freed")
+
+    async def _sweep_idle(self):
+        idle_s = self.config.model_idle_unload_s
+        while True:
+            await asyncio.sleep(min(60.0, max(1.0, idle_s / 2)))
+            for name in list(self.reloaders):
+                if name == self.default:
+                    continue
+                async with self._load_lock:
+                    reloader = self.reloaders.get(name)
+                    now = time.monotonic()
+                    if reloader is not None and not reloader.busy() and now - self.last_used.get(name, now) >= idle_s:
+                        await self._unload(name, reason=f"idle for {idle_s:g}s")
+
+    def info(self) -> dict:
+        now = time.monotonic()
+        return {
+            "default": self.default,
+            "memory_budget_mb": self.config.memory_budget_mb,
+            "memory_used_mb": round(sum(self.memory_mb(n) for n in self.reloaders), 2),
+            "models": {
+                name: {
+                    "loaded": name in self.reloaders,
+                    "model_path": str(spec.model_path),
+                    "backend": spec.backend,
+                    "max_memory_mb": spec.max_memory_mb,
+                    "memory_mb": round(self.memory_mb(name), 2),
+                    "idle_s": round(now - self.last_used[name], 1) if name in self.last_used else None,
+                    "version": self.reloaders[name].active.version if name in self.reloaders else None,
+                    "loads": self.loads[name],
+                    "unloads": self.unloads[name],
+                }
+                for name, spec in self.specs.items()
+            },
+        }
@@ -0,0 +1,123 @@
+import shutil
+from pathlib import Path
+from Deep_learning_projects.utils import log
+from Deep_learning_projects.utils.common import save_json
+from Deep_learning_projects.utils.startup import lazy_import
+from Deep_learning_projects.entity.config_entity import ModelQuantizationConfig, DatasetCacheConfig
+from Deep_learning_projects.components.dataset_cache import DatasetCache
+from Deep_learning_projects.components.model_evalution_mlflow import Evaluation
+from Deep_learning_projects.components.model_export import benchmark_backend, sample_images
+
+
+def _size_mb(path: Path) -> float:
+    path = Path(path)
+    if path.is_dir():
+        size = sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+    else:
+        size = path.stat().st_size
+    return size / (1024 * 1024)
+
+
+class ModelQuantization:
+    def __init__(self, config: ModelQuantizationConfig, cache_config: DatasetCacheConfig = None):
+        self.config = config
+        self.cache_config = cache_config
+        self.quantized_path = None
+        self.score = {}
+
+    def quantize(self):
+        """
+        Post-training INT8 quantisation, calibrated on a fraction of the
+        data.yaml validation split.
+        """
+        log.info(f"Quantising {self.config.path_of_model} to INT8 ({self.config.format}), "
+                 f"calibrating on {self.config.params_calibration_fraction:.0%} of the val split")
+        model = lazy_import("ultralytics").YOLO(str(self.config.path_of_model))
+        output = model.export(
+            format=self.config.format,
+            int8=True,
+            data=str(self.config.training_data),
+            fraction=self.config.params_calibration_fraction,
+            imgsz=self.config.params_image_size[0]
+        )
+
+        # Ultralytics writes next to the weights; keep the artifact under root_dir
+        destination = Path(self.config.root_dir) / Path(output).name
+        if destination.is_dir():
+            shutil.rmtree(destination)
+        elif destination.exists():
+            destination.unlink()
+        shutil.move(str(output), str(destination))
+        self.quantized_path = destination
+        log.info(f"INT8 model saved at: {destination}")
+
+    def _validator(self):
+        # The dataset cache validator Evaluation.evaluation uses, so both models read the same pixels
+        if self.cache_config is None or not self.cache_config.enabled:
+            return None
+        cache_dir = DatasetCache(config=self.cache_config).build()
+        return lazy_import("Deep_learning_projects.components.cached_dataset").validator_with_cache(cache_dir)
+
+    def evaluate(self, model_path: Path, validator=None) -> dict:
+        """
+        Same validation run and metrics as Evaluation.evaluation, on `model_path`.
+        """
+        model = lazy_import("ultralytics").YOLO(str(model_path), task="detect")
+        results = model.val(
+            data=str(self.config.training_data),
+            imgsz=self.config.params_image_size[0],
+            batch=self.config.params_batch_size,
+            split='test',
+            validator=validator
+        )
+        return Evaluation.metrics_from_results(results)
+
+    def gate_and_save(self):
+        """
+        Promotes the INT8 model only if its mAP drop against the FP32 model
+        stays within QUANT_MAX_MAP_DROP, and records speedup and size reduction.
+        Both models are validated here, through the same validator.
+        """
+        images = sample_images(self.config.training_data, "val", self.config.benchmark_images)
+        if not images:
+            raise FileNotFoundError(f"No validation images found through {self.config.training_data}")
+
+        validator = self._validator()
+        baseline = self.evaluate(self.config.path_of_model, validator)
+        quantized = self.evaluate(self.quantized_path, validator)
+
+        map_drop = float(baseline["mAP_50_95"]) - float(quantized["mAP_50_95"])
+        map50_drop = float(baseline["mAP_50"]) - float(quantized["mAP_50"])
+        promoted = map_drop <= self.config.params_max_map_drop
+
+        # Speed on identical images, each backend measured in its own process
+        imgsz = self.config.params_image_size[0]
+        fp32 = benchmark_backend(str(self.config.path_of_model), images, imgsz)
+        int8 = benchmark_backend(str(self.quantized_path), images, imgsz)
+
+        fp32_size = _size_mb(self.config.path_of_model)
+        int8_size = _size_mb(self.quantized_path)
+
+        self.score = {
+            **{f"fp32_{k}": float(v) for k, v in baseline.items()},
+            **{f"int8_{k}": float(v) for k, v in quantized.items()},
+            "mAP_50_95_drop": map_drop,
+            "mAP_50_drop": map50_drop,
+            "max_map_drop": self.config.params_max_map_drop,
+            "promoted": promoted,
+            "path": str(self.quantized_path),
+            "format": self.config.format,
+            "fp32_latency_ms_p50": fp32["latency_ms_p50"],
+            "latency_ms_p50": int8["latency_ms_p50"],
+            "speedup": round(fp32["latency_ms_p50"] / int8["latency_ms_p50"], 3) if int8["latency_ms_p50"] else 0.0,
+            "fp32_size_mb": round(fp32_size, 3),
+            "int8_size_mb": round(int8_size, 3),
+            "size_reduction": round(1 - int8_size / fp32_size, 4) if fp32_size else 0.0,
+        }
+        save_json(path=Path(self.config.scores_path), data=self.score)
+
+        if promoted:
+            log.info(f"INT8 model promoted: mAP50-95 drop {map_drop:.4f} <= {self.config.params_max_map_drop}, "
+                     f"speedup x{self.score['speedup']}, size -{self.score['size_reduction']:.0%}")
+        else:
+            log.warning(f"INT8 model NOT promoted: mAP50-95 drop {map_drop:.4f} > {self.config.params_max_map_drop}")
@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import numpy as np
+from pathlib import Path
+from typing import TYPE_CHECKING
+from Deep_learning_projects.utils import log
+from Deep_learning_projects.utils.startup import lazy_import
+from Deep_learning_projects.utils.common import get_rss_mb, get_file_hash
+from Deep_learning_projects.entity.config_entity import PredictionConfig
+
+if TYPE_CHECKING:
+    from ultralytics import YOLO
+
+
+def _weights_hash(model_path: str) -> str:
+    # Exported models can be directories (e.g. OpenVINO xml + bin)
+    path = Path(model_path)
+    if path.is_dir():
+        digest = hashlib.sha256()
+        for file in sorted(p for p in path.rglob("*") if p.is_file()):
+            digest.update(get_file_hash(file).encode())
+        return digest.hexdigest()
+    if path.exists():
+        return get_file_hash(path)
+    return model_path
+
+
+def _tensor_mb(model) -> float:
+    # Parameters + buffers of a PyTorch model; 0 for exported runtimes
+    module = getattr(model, "model", None)
+    if not hasattr(module, "parameters"):
+        return 0.0
+    tensors = list(module.parameters()) + list(module.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors) / (1024 * 1024)
+
+
+class ModelRegistry:
+    """
+    Process-level holder for the served YOLO model.
+    The model is loaded (and fused) once, warmed up, and the same instance is
+    handed to every request instead of re-reading the weights per call.
+    """
+    def __init__(self, config: PredictionConfig):
+        self.config = config
+        self.model = None
+        self.weights_hash = None
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> "YOLO":
+        """
+        Loads the weights once. Concurrent callers wait for the first load.
+        """
+        with self._lock:
+            if self.model is not None:
+                return self.model
+
+            backend, model_path = self.resolve_backend()
+            if not os.path.exists(model_path):
+                log.warning(f"Model not found at {model_path}. Please ensure 'best.pt' is in the 'model' folder.")
+
+            # Imported here rather than at module level so the API starts without it;
+            # the import is reported separately (utils.startup) from the load time
+            YOLO = lazy_import("ultralytics").YOLO
+
+            rss_before = get_rss_mb()
+            start = time.perf_counter()
+
+            # 1. Load the weights and fold Conv+BN once,
+            #    which saves work on every forward pass afterwards
+            model = YOLO(model_path, task="detect")
+            if backend == "pytorch":
+                try:
+                    model.fuse()
+                except Exception as e:
+                    log.warning(f"Could not fuse model layers: {e}")
+
+            load_time = time.perf_counter() - start
+
+            # 2. Warm up so the first real request does not pay for lazy init
+            start = time.perf_counter()
+            self._warmup(model)
+            warmup_time = time.perf_counter() - start
+
+            rss_after = get_rss_mb()
+            # Identifies the served weights, e.g. for the prediction cache key
+            self.weights_hash = _weights_hash(model_path)
+            self.model = model
+            self.stats = {
+                "backend": backend,
+                "model_path": model_path,
+                "weights_hash": self.weights_hash,
+                "load_time_s": round(load_time, 4),
+                "warmup_time_s": round(warmup_time, 4),
+                "rss_before_load_mb": round(rss_before, 2),
+                "rss_after_load_mb": round(rss_after, 2),
+                "model_rss_mb": round(rss_after - rss_before, 2),
+                "tensor_mb": round(_tensor_mb(model), 2),
+                "loaded_at": time.time(),
+            }
+            log.info(f"Model loaded from {model_path} in {load_time:.3f}s "
+                     f"(+{rss_after - rss_before:.1f} MB RSS)")
+            return self.model
+
+    def _export_report(self) -> dict:
+        report_path = Path(self.config.export_report_path)
+        if not report_path.exists():
+            return {}
+        with open(report_path) as f:
+            return json.load(f)
+
+    def _available_backends(self, report: dict) -> dict:
+        """
+        Validated alternatives to PyTorch: export formats that passed the parity
+        check, plus the INT8 model when the quantisation stage promoted it.
+        """
+        backends = {}
+        for name, entry in report.get("backends", {}).items():
+            if name != "pytorch" and entry.get("parity_ok"):
+                backends[name] = entry
+
+        scores_path = Path(self.config.quantization_scores_path)
+        if scores_path.exists():
+            with open(scores_path) as f:
+                scores = json.load(f)
+            if scores.get("promoted"):
+                backends["int8"] = scores
+
+        return {name: entry for name, entry in backends.items() if os.path.exists(entry["path"])}
+
+    def resolve_backend(self) -> tuple:
+        """
+        Picks the runtime from `prediction.backend`: 'pytorch' serves model_path,
+        an export format (or 'int8') serves that validated artifact, and 'auto'
+        serves the backend the export stage selected (the fastest that passed
+        parity, PyTorch included). Falls back to PyTorch when nothing suitable
+        is available.
+        """
+        backend = self.config.backend
+        model_path = str(self.config.model_path)
+        if backend == "pytorch":
+            return backend, model_path
+
+        report = self._export_report()
+        available = self._available_backends(report)
+        if backend == "auto":
+            selected = report.get("selected")
+            if selected is None:
+                log.info(f"No export report at {self.config.export_report_path}; using PyTorch")
+                return "pytorch", model_path
+            if selected == "pytorch":
+                return "pytorch", model_path
+            backend = selected
+
+        entry = available.get(backend)
+        if entry is None:
+            log.warning(f"Backend '{backend}' is not available or failed validation; using PyTorch")
+            return "pytorch", model_path
+        return backend, entry["path"]
+
+    def _warmup(self, model: "YOLO"):
+        height, width = self.config.params_image_size[:2]
+        dummy = np.zeros((height, width, 3), dtype=np.uint8)
+        for _ in range(self.config.warmup_runs):
+            model(dummy, verbose=False)
+
+    def get(self) -> "YOLO":
+        if self.model is None:
+            return self.load()
+        return self.model
+
+    def memory_mb(self) -> float:
+        """
+        Memory attributed to this model: the RSS growth while it loaded, but at
+        least its tensor size (the RSS delta undercounts when pages were reused).
+        """
+        return max(self.stats.get("model_rss_mb", 0.0), self.stats.get("tensor_mb", 0.0))
+
+    def info(self) -> dict:
+        """
+        Load-time and memory figures for the currently served model.
+        """
+        return {**self.stats, "loaded": self.model is not None, "rss_now_mb": round(get_rss_mb(), 2)}
@@ -0,0 +1,325 @@
+import asyncio
+import dataclasses
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+import numpy as np
+from Deep_learning_projects.utils import log
+from Deep_learning_projects.entity.config_entity import PredictionConfig
+from Deep_learning_projects.components.model_registry import ModelRegistry
+from Deep_learning_projects.components.inference_batcher import InferenceBatcher
+from Deep_learning_projects.components.input_preprocessor import InputPreprocessor
+from Deep_learning_projects.pipeline.prediction_pipeline import PredictionPipeline
+
+
+def _thread_local_predict(pipeline: PredictionPipeline):
+    """
+    predict_batch for several inference threads: each thread gets its own
+    pipeline clone (own predictor state, same weights).
+    """
+    local = threading.local()
+
+    def predict_batch(sources: list) -> list:
+        if not hasattr(local, "pipeline"):
+            local.pipeline = pipeline.clone()
+        return local.pipeline.predict_batch(sources)
+
+    return predict_batch
+
+
+def _file_signature(path: Path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ServedModel:
+    """
+    One loaded version of the model with its own inference path: pipeline,
+    optional worker pool and batcher. Requests pin the ServedModel they started
+    on (see use()), so a reload never moves a request to other weights halfway.
+    """
+    def __init__(self, config: PredictionConfig, version: int, name: str = "default"):
+        self.config = config
+        self.version = version
+        self.name = name
+        self.registry = ModelRegistry(config=config)
+        self.pipeline = None
+        self.pool = None
+        self.batcher = None
+        self.active_requests = 0
+        self._idle = None
+
+    @property
+    def weights_hash(self) -> str:
+        return self.registry.weights_hash
+
+    @property
+    def names(self) -> dict:
+        return self.pipeline.model.names
+
+    def headers(self) -> dict:
+        return {"X-Model": self.name, "X-Model-Hash": self.weights_hash or "", "X-Model-Version": str(self.version)}
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+        # Imports ultralytics/torch, reads the weights and warms up: keep it off the event loop
+        await loop.run_in_executor(None, self.registry.load)
+        model = self.registry.get()
+        preprocessor = None
+        if self.config.preallocate_inputs:
+            preprocessor = InputPreprocessor(
+                image_size=self.config.params_image_size[0],
+                device=str(getattr(model, "device", None) or "cpu"),
+                max_buffer_shapes=self.config.input_buffer_shapes
+            )
+        self.pipeline = PredictionPipeline(model=model, preprocessor=preprocessor)
+
+        # Worker-pool mode: N inference processes sharing the weights in shared memory
+        predict_batch = self.pipeline.predict_batch
+        concurrency = max(1, self.config.inference_concurrency)
+        if concurrency > 1:
+            predict_batch = _thread_local_predict(self.pipeline)
+        if self.config.num_workers > 0:
+            # torch.multiprocessing is only needed (and imported) in this mode
+            from Deep_learning_projects.components.inference_pool import InferencePool
+            self.pool = InferencePool(
+                pipeline=self.pipeline,
+                num_workers=self.config.num_workers,
+                threads_per_worker=self.config.threads_per_worker
+            )
+            await loop.run_in_executor(None, self.pool.start)
+            predict_batch = self.pool.predict_batch
+            concurrency = self.config.num_workers
+
+        # Concurrent requests are merged into micro-batches for a single forward pass.
+        # Inference runs on the batcher's own threads, never on the event loop, and
+        # the bounded queue turns overload into fast 503s.
+        self.batcher = InferenceBatcher(
+            predict_batch=predict_batch,
+            max_batch_size=self.config.max_batch_size,
+            max_wait_ms=self.config.max_wait_ms,
+            concurrency=concurrency,
+            max_queue_size=self.config.max_queue_size
+        )
+        await self.batcher.start()
+        await self._warmup_inference_path()
+
+    async def _warmup_inference_path(self):
+        # The registry warmed the model itself; this also reaches the per-thread
+        # clones and pool workers, which build their predictors on first use
+        height, width = self.config.params_image_size[:2]
+        dummy = np.zeros((height, width, 3), dtype=np.uint8)
+        await asyncio.gather(*(self.batcher.run_batch([dummy]) for _ in range(self.batcher.concurrency)))
+
+    def acquire(self):
+        """
+        Pins this version for one request; pair with release().
+        """
+        self.active_requests += 1
+        self._idle.clear()
+
+    def release(self):
+        self.active_requests -= 1
+        if self.active_requests == 0:
+            self._idle.set()
+
+    @asynccontextmanager
+    async def use(self):
+        """
+        `async with served.use():` around every request served by this version.
+        """
+        self.acquire()
+        try:
+            yield self
+        finally:
+            self.release()
+
+    async def drain_and_stop(self, timeout_s: float):
+        """
+        Waits for the requests pinned to this version, then frees it.
+        """
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout_s)
+        except asyncio.TimeoutError:
+            log.warning(f"Model v{self.version}: {self.active_requests} request(s) still running "
+                        f"after {timeout_s}s; stopping anyway")
+        await self.stop()
+
+    async def stop(self):
+        if self.batcher is not None:
+            await self.batcher.stop()
+        if self.pool is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.pool.stop)
+
+    def info(self) -> dict:
+        info = {**self.registry.info(), "model": self.name, "version": self.version,
+                "active_requests": self.active_requests}
+        preprocessor = self.pipeline.preprocessor if self.pipeline is not None else None
+        if preprocessor is not None:
+            # Buffers of the API-process pipeline (thread clones and pool workers keep their own)
+            info["input_buffers"] = preprocessor.stats()
+        return info
+
+
+class ModelReloader:
+    """
+    Holds the active ServedModel and replaces it without downtime.
+    A reload (admin call, or a change of `prediction.watch_path`) loads and
+    warms the new weights next to the old ones, swaps `active` in one
+    assignment, and only frees the old version once its requests are done.
+    """
+    def __init__(self, config: PredictionConfig, name: str = "default"):
+        self.config = config
+        self.name = name
+        self.active = None
+        self.status = "starting"
+        self.last_error = None
+        self.history = []
+
+        self._version = 0
+        self._lock = asyncio.Lock()
+        self._watch_task = None
+        self._retiring = {}  # drain task -> ServedModel being retired
+
+    def _next(self, config: PredictionConfig) -> ServedModel:
+        self._version += 1
+        return ServedModel(config=config, version=self._version, name=self.name)
+
+    async def start(self):
+        served = self._next(self.config)
+        await served.start()
+        self.active = served
+        self.status = "ready"
+        self._record(served, "initial")
+
+        if self.config.reload_poll_s > 0:
+            self._watch_task = asyncio.create_task(self._watch(Path(self.config.watch_path)))
+            log.info(f"Watching {self.config.watch_path} for new weights every {self.config.reload_poll_s}s")
+
+    async def stop(self):
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+        for task, served in list(self._retiring.items()):
+            task.cancel()
+            await served.stop()
+        if self.active is not None:
+            await self.active.stop()
+
+    async def drain_and_stop(self, timeout_s: float):
+        """
+        Stops the model once the requests pinned to any of its versions have
+        finished, or after `timeout_s` (those still waiting get InferenceStopped).
+        """
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+        try:
+            await asyncio.wait_for(self._drained(), timeout=timeout_s)
+        except asyncio.TimeoutError:
+            log.warning(f"Model '{self.name}': requests still running after {timeout_s}s; stopping anyway")
+        await self.stop()
+
+    async def _drained(self):
+        while self.busy():
+            await asyncio.sleep(0.05)
+
+    async def reload(self, path: str = None) -> dict:
+        """
+        Loads `path` (default: watch_path), warms it up and swaps it in.
+        Concurrent calls are serialised; identical weights are not swapped.
+        Only files inside the directory of watch_path are accepted: loading
+        weights unpickles them.
+        """
+        path = Path(path or self.config.watch_path)
+        allowed = Path(self.config.watch_path).resolve().parent
+        if allowed not in path.resolve().parents:
+            raise PermissionError(f"{path} is outside {allowed}; reloads only read weights from there")
+        if not path.exists():
+            raise FileNotFoundError(f"No model at {path}")
+
+        async with self._lock:
+            self.status = "loading"
+            # Serve exactly this file: export artifacts listed in the reports
+            # belong to the previous weights
+            config = dataclasses.replace(
+                self.config,
+                model_path=path,
+                backend="pytorch",
+                warmup_runs=max(self.config.warmup_runs, self.config.reload_warmup_runs)
+            )
+            candidate = self._next(config)
+            start = time.perf_counter()
+            try:
+                await candidate.start()
+            except Exception as e:
+                self.status = "ready"
+                self.last_error = f"{type(e).__name__}: {e}"
+                log.exception(f"Reload of {path} failed; still serving v{self.active.version}: {e}")
+                await candidate.stop()
+                raise
+
+            if candidate.weights_hash == self.active.weights_hash:
+                self.status = "ready"
+                await candidate.stop()
+                log.info(f"{path} has the weights already served (v{self.active.version}); not swapped")
+                return {"swapped": False, **self.active.info()}
+
+            old, self.active = self.active, candidate
+            self.status = "ready"
+            self.last_error = None
+            self._record(candidate, str(path))
+            log.info(f"Swapped in model v{candidate.version} ({candidate.weights_hash[:12]}) from {path} "
+                     f"after {time.perf_counter() - start:.2f}s; draining v{old.version}")
+
+            task = asyncio.create_task(old.drain_and_stop(self.config.drain_timeout_s))
+            self._retiring[task] = old
+            task.add_done_callback(lambda done: self._retiring.pop(done, None))
+            return {"swapped": True, **candidate.info()}
+
+    async def _watch(self, path: Path):
+        # A change only counts once the file has stopped changing between two
+        # polls, so a checkpoint that is still being written is not loaded
+        baseline = _file_signature(path)
+        previous = baseline
+        while True:
+            await asyncio.sleep(self.config.reload_poll_s)
+            current = _file_signature(path)
+            if current is not None and current != baseline and current == previous:
+                baseline = current
+                try:
+                    await self.reload(str(path))
+                except Exception:
+                    pass  # Logged by reload(); keep watching
+            previous = current
+
+    def busy(self) -> bool:
+        """
+        True while any version of this model still has requests to finish.
+        """
+        return self.active is not None and self.active.active_requests > 0 or bool(self._retiring)
+
+    def _record(self, served: ServedModel, source: str):
+        self.history.append({
+            "version": served.version,
+            "weights_hash": served.weights_hash,
+            "model_path": str(served.config.model_path),
+            "source": source,
+            "loaded_at": time.time(),
+        })
+        self.history = self.history[-20:]
+
+    def info(self) -> dict:
+        return {
+            "status": self.status,
+            "active": self.active.info() if self.active is not None else None,
+            "retiring": len(self._retiring),
+            "last_error": self.last_error,
+            "history": self.history,
+        }
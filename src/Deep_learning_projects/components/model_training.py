@@ -1,20 +1,29 @@
 import os
+import json
+import time
 import yaml
 import shutil
-import mlflow
+import hashlib
 from pathlib import Path
 from dotenv import load_dotenv, find_dotenv
 from Deep_learning_projects.utils import log
-from ultralytics import YOLO
-from Deep_learning_projects.entity.config_entity import TrainingConfig
-
-# 1. Force load .env
-load_dotenv(find_dotenv())
+from Deep_learning_projects.utils.startup import lazy_import
+from Deep_learning_projects.utils.common import get_file_hash
+from Deep_learning_projects.entity.config_entity import TrainingConfig, DatasetCacheConfig, LabelIndexConfig
+from Deep_learning_projects.components.dataset_cache import DatasetCache
+from Deep_learning_projects.components.label_index import LabelIndex
 
 class Training:
-    def __init__(self, config: TrainingConfig):
+    def __init__(self, config: TrainingConfig, cache_config: DatasetCacheConfig = None,
+                 label_config: LabelIndexConfig = None):
         self.config = config
+        self.cache_config = cache_config
+        self.label_config = label_config
         self.model = None
+        self.state_path = Path(self.config.root_dir) / "training_state.json"
+
+        # 1. Force load .env (here rather than at import, so importing is cheap)
+        load_dotenv(find_dotenv())
 
         # 2. CREDENTIAL CLEANING (The Fix)
         username = os.getenv("MLFLOW_TRACKING_USERNAME")
@@ -33,11 +42,12 @@ class Training:
             log.info(f"Cleaned Password Length:  {len(clean_password)}")
             
             # 3. Explicitly set MLflow configuration
-            mlflow.set_tracking_uri(uri)
+            lazy_import("mlflow").set_tracking_uri(uri)
         else:
             log.info("MLFLOW_TRACKING_PASSWORD is missing from .env")
 
     def get_base_model(self):
+        YOLO = lazy_import("ultralytics").YOLO
         self.model = YOLO(self.config.updated_base_model_path)
 
     def update_data_yaml_paths(self):
@@ -69,29 +79,143 @@ class Training:
             
         log.info(f"Updated data.yaml paths to absolute paths at: {dataset_root}")
 
+    def _fingerprint(self, train_args: dict, cache_dir) -> str:
+        # What makes a checkpoint worth resuming: the same arguments, base
+        # weights and dataset (the cache key covers every image and label file)
+        fingerprint = {
+            "args": {key: str(value) for key, value in sorted(train_args.items())},
+            "base_model": get_file_hash(Path(self.config.updated_base_model_path)),
+            "data_yaml": get_file_hash(Path(self.config.training_data)),
+            "dataset": Path(cache_dir).name if cache_dir else None,
+        }
+        return hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()[:16]
+
+    def _load_state(self) -> dict:
+        if self.state_path.exists():
+            with open(self.state_path, "r") as f:
+                return json.load(f)
+        return {}
+
+    def _save_state(self, state: dict):
+        temporary = self.state_path.with_name(self.state_path.name + ".tmp")
+        with open(temporary, "w") as f:
+            json.dump(state, f, indent=4)
+        os.replace(temporary, self.state_path)
+
+    @staticmethod
+    def _finished(last_path: Path) -> bool:
+        # ultralytics drops the optimizer and sets epoch to -1 once a run has ended
+        checkpoint = lazy_import("torch").load(last_path, map_location="cpu", weights_only=False)
+        return checkpoint.get("epoch", -1) == -1
+
+    def _budget_callback(self, state: dict):
+        # Counts training time across restarts; stopping after an epoch keeps its checkpoint
+        budget_s = self.config.max_train_hours * 3600
+        started, previous = time.perf_counter(), state["train_seconds"]
+
+        def on_fit_epoch_end(trainer):
+            state["train_seconds"] = round(previous + time.perf_counter() - started, 1)
+            state["epochs_done"] = trainer.epoch + 1
+            if budget_s and state["train_seconds"] >= budget_s and not trainer.stop:
+                log.warning(f"Training time budget of {self.config.max_train_hours} h used up after "
+                            f"{state['epochs_done']} epochs; stopping")
+                state["stop_reason"] = "time_budget"
+                trainer.stop = True
+            self._save_state(state)
+
+        return on_fit_epoch_end
+
+    def promote_best(self, weights_path: Path):
+        # Copied under a temporary name and renamed, so the reloader watching
+        # trained_model_path never loads a half-written file
+        target = Path(self.config.trained_model_path)
+        temporary = target.with_name(target.name + ".tmp")
+        shutil.copy(weights_path, temporary)
+        os.replace(temporary, target)
+        log.info(f"Final model copied to: {self.config.trained_model_path}")
+
     def train(self):
+        """
+        Trains, or resumes an interrupted run from weights/last.pt when its
+        fingerprint (arguments, base weights, dataset) still matches. Stops on
+        a plateau (`patience` epochs without improvement) or when the
+        wall-clock budget is used up, then promotes best.pt to trained_model_path.
+        """
         self.update_data_yaml_paths()
 
+        # Fail before any epoch runs if the labels do not match CLASSES
+        if self.label_config is not None:
+            LabelIndex(config=self.label_config).validate()
+
         project_dir = self.config.root_dir 
         run_name = "yolo_run"
+        run_dir = Path(project_dir) / run_name
+        last_path = run_dir / "weights" / "last.pt"
 
-        # YOLO will now use the CLEANED password from os.environ
-        self.model.train(
+        # Decode the dataset once into the memory-mapped cache (a no-op when it
+        # is current); every epoch then reads resized images from the map
+        trainer = None
+        cache_dir = None
+        if self.cache_config is not None and self.cache_config.enabled:
+            cache_dir = DatasetCache(config=self.cache_config).build()
+            trainer = lazy_import("Deep_learning_projects.components.cached_dataset").trainer_with_cache(cache_dir)
+
+        train_args = dict(
             data=str(self.config.training_data),
             epochs=self.config.params_epochs,
             batch=self.config.params_batch_size,
             imgsz=self.config.params_image_size[0], 
             lr0=self.config.params_learning_rate,
-            project=str(project_dir),
-            name=run_name,
-            exist_ok=True, 
-            augment=self.config.params_is_augmentation 
+            augment=self.config.params_is_augmentation
         )
+        fingerprint = self._fingerprint(train_args, cache_dir)
+        state = self._load_state()
+
+        resume = (self.config.resume and state.get("fingerprint") == fingerprint and last_path.exists())
+        if resume and state.get("status") != "completed" and self._finished(last_path):
+            # Died between the last epoch and recording it
+            state["status"] = "completed"
+            self._save_state(state)
+
+        if resume and state.get("status") == "completed":
+            log.info(f"Training with fingerprint {fingerprint} already completed; nothing to train")
+        else:
+            if resume:
+                log.info(f"Resuming training from {last_path} after {state.get('epochs_done', 0)} epochs")
+                self.model = lazy_import("ultralytics").YOLO(str(last_path))
+            else:
+                if run_dir.exists():
+                    # A different configuration: keep the old run once instead of training over it
+                    previous = Path(project_dir) / f"{run_name}.previous"
+                    shutil.rmtree(previous, ignore_errors=True)
+                    os.replace(run_dir, previous)
+                    log.info(f"Moved the run of another configuration to {previous}")
+                state = {"fingerprint": fingerprint, "train_seconds": 0, "epochs_done": 0}
+            state.update(status="running", stop_reason=None)
+            self._save_state(state)
+
+            self.model.add_callback("on_fit_epoch_end", self._budget_callback(state))
+            # YOLO will now use the CLEANED password from os.environ
+            self.model.train(
+                **train_args,
+                project=str(project_dir),
+                name=run_name,
+                exist_ok=True, 
+                patience=self.config.patience,
+                resume=resume,
+                trainer=trainer
+            )
+
+            if state["stop_reason"] is None and state["epochs_done"] < self.config.params_epochs:
+                state["stop_reason"] = "plateau"
+                log.info(f"Stopped after {state['epochs_done']} epochs: no improvement for "
+                         f"{self.config.patience} epochs")
+            state["status"] = "completed"
+            self._save_state(state)
 
         generated_weight_path = os.path.join(project_dir, run_name, "weights", "best.pt")
         
         if os.path.exists(generated_weight_path):
-            shutil.copy(generated_weight_path, self.config.trained_model_path)
-            log.info(f"Final model copied to: {self.config.trained_model_path}")
+            self.promote_best(Path(generated_weight_path))
         else:
-            log.error(f"Training completed but could not find 'best.pt' at {generated_weight_path}")
\ No newline at end of file
+            log.error(f"Training completed but could not find 'best.pt' at {generated_weight_path}")
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+from Deep_learning_projects.utils import log
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of predictions keyed by image content hash + weights hash.
+    Identical requests that arrive while the first one is still running wait
+    for that inference instead of starting their own.
+    Cached values are shared between callers and must not be mutated.
+    """
+    def __init__(self, max_mb: float, ttl_s: float = 0, size_of: Callable[[Any], int] = None):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.ttl_s = ttl_s
+        # By default an entry is costed by its JSON length
+        self.size_of = size_of or (lambda value: len(json.dumps(value)))
+
+        self._entries = OrderedDict()  # key -> (value, size_bytes, expires_at)
+        self._inflight = {}            # key -> asyncio.Future
+        self.current_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(content_hash: str, weights_hash: str) -> str:
+        # The weights hash keeps results of a previous model from being served
+        return f"{weights_hash}:{content_hash}"
+
+    def _get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, size, expires_at = entry
+        if expires_at and expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def _put(self, key: str, value: Any):
+        size = self.size_of(value) + len(key)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        expires_at = time.monotonic() + self.ttl_s if self.ttl_s else 0
+        self._entries[key] = (value, size, expires_at)
+        self.current_bytes += size
+
+        while self.current_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Returns the cached value for `key`, or awaits `compute()` once and caches it.
+        Failures are not cached; every waiter of a failed computation gets the error.
+        """
+        entry = self._get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry[0]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # Its own task: a caller that is cancelled (client gone) stops waiting,
+            # but the computation still finishes for everyone else on this key
+            task = asyncio.create_task(self._compute(key, compute))
+            # Retrieved here too, so a failure nobody waits for any more is not logged as unhandled
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await compute()
+        finally:
+            self._inflight.pop(key, None)
+        self._put(key, value)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+        log.info("Prediction cache cleared")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_s": self.ttl_s,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
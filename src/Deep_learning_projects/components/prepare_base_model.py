@@ -1,8 +1,8 @@
 import os
 import shutil
 from pathlib import Path
-from ultralytics import YOLO
 from Deep_learning_projects.utils import log
+from Deep_learning_projects.utils.startup import lazy_import
 from Deep_learning_projects.entity.config_entity import PrepareBaseModelConfig
 
 class PrepareBaseModel:
@@ -27,7 +27,7 @@ class PrepareBaseModel:
             destination_path.parent.mkdir(parents=True, exist_ok=True)
 
             # Trigger YOLO to download the model into working dir
-            _ = YOLO(self.config.model_name)  # e.g., 'yolov8n.pt'
+            _ = lazy_import("ultralytics").YOLO(self.config.model_name)  # e.g., 'yolov8n.pt'
 
             # Ultralytics saves model as '<model_name>.pt' in cwd
             if self.config.model_name.endswith(".pt"):
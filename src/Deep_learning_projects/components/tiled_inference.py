@@ -0,0 +1,128 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+from Deep_learning_projects.utils import log
+from Deep_learning_projects.utils.box_ops import batched_nms
+from Deep_learning_projects.utils.prediction_format import empty_detections
+
+# Letterbox grey used by YOLO, so padded tile edges look like normal padding
+PAD_VALUE = 114
+
+
+class TiledInference:
+    """
+    Sliced inference for images much larger than the model input (e.g. 4K frames):
+    the image is cut into overlapping tiles of the model size, the tiles run as
+    one batch, and detections are shifted back and merged with cross-tile NMS.
+    Tile batches are written into reusable buffers instead of allocated per tile.
+    """
+    def __init__(self, tile_size: int, overlap: float, merge_threshold: float, max_buffer_shapes: int = 8):
+        self.tile_size = int(tile_size)
+        self.stride = max(1, int(self.tile_size * (1 - overlap)))
+        self.merge_threshold = merge_threshold
+        self.max_buffer_shapes = max_buffer_shapes
+
+        # tile count -> free (n, tile, tile, 3) uint8 buffers
+        self._buffers = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.images = 0
+        self.tiles = 0
+        self.megapixels = 0.0
+        self.seconds = 0.0
+
+    def _positions(self, length: int) -> list:
+        if length <= self.tile_size:
+            return [0]
+        positions = list(range(0, length - self.tile_size + 1, self.stride))
+        # Make the last tile end exactly on the image border
+        if positions[-1] != length - self.tile_size:
+            positions.append(length - self.tile_size)
+        return positions
+
+    def grid(self, height: int, width: int) -> np.ndarray:
+        """
+        Top-left (x, y) of every tile, as an n x 2 array.
+        """
+        ys, xs = self._positions(height), self._positions(width)
+        return np.array([(x, y) for y in ys for x in xs], dtype=np.int32)
+
+    def _acquire(self, count: int) -> np.ndarray:
+        with self._lock:
+            free = self._buffers.get(count)
+            if free:
+                self._buffers.move_to_end(count)
+                return free.pop()
+        return np.empty((count, self.tile_size, self.tile_size, 3), dtype=np.uint8)
+
+    def _release(self, buffer: np.ndarray):
+        with self._lock:
+            free = self._buffers.setdefault(len(buffer), [])
+            self._buffers.move_to_end(len(buffer))
+            if len(free) < 2:
+                free.append(buffer)
+            # Forget the least recently used tile counts (other resolutions)
+            while len(self._buffers) > self.max_buffer_shapes:
+                self._buffers.popitem(last=False)
+
+    def cut(self, image: np.ndarray) -> tuple:
+        """
+        Copies the tiles of `image` into a pooled buffer.
+        Returns (buffer, offsets); give the buffer back with release().
+        """
+        height, width = image.shape[:2]
+        offsets = self.grid(height, width)
+        buffer = self._acquire(len(offsets))
+
+        for tile, (x, y) in zip(buffer, offsets):
+            h = min(self.tile_size, height - y)
+            w = min(self.tile_size, width - x)
+            tile[:h, :w] = image[y:y + h, x:x + w]
+            if h < self.tile_size or w < self.tile_size:
+                tile[h:, :] = PAD_VALUE
+                tile[:h, w:] = PAD_VALUE
+        return buffer, offsets
+
+    def release(self, buffer: np.ndarray):
+        self._release(buffer)
+
+    def merge(self, tile_detections: list, offsets: np.ndarray) -> dict:
+        """
+        Shifts per-tile boxes into image coordinates and removes the duplicates
+        that overlapping tiles produce, all on concatenated arrays.
+        """
+        counts = [len(d["conf"]) for d in tile_detections]
+        if not sum(counts):
+            return empty_detections()
+
+        boxes = np.concatenate([d["boxes"] for d in tile_detections])
+        conf = np.concatenate([d["conf"] for d in tile_detections])
+        cls = np.concatenate([d["cls"] for d in tile_detections])
+        boxes = boxes + np.repeat(np.tile(offsets, 2), counts, axis=0).astype(np.float32)
+
+        # Intersection-over-smaller also drops fragments of objects cut by a tile edge
+        keep = batched_nms(boxes, conf, cls, self.merge_threshold, metric="ios")
+        return {"boxes": boxes[keep], "conf": conf[keep], "cls": cls[keep]}
+
+    def record(self, image: np.ndarray, tiles: int, seconds: float) -> float:
+        """
+        Adds one image to the throughput figures; returns its megapixels/s.
+        """
+        megapixels = image.shape[0] * image.shape[1] / 1e6
+        self.images += 1
+        self.tiles += tiles
+        self.megapixels += megapixels
+        self.seconds += seconds
+        rate = megapixels / seconds if seconds else 0.0
+        log.debug(f"Tiled inference: {tiles} tiles, {megapixels:.1f} MP at {rate:.2f} MP/s")
+        return rate
+
+    def stats(self) -> dict:
+        return {
+            "tile_size": self.tile_size,
+            "stride": self.stride,
+            "images": self.images,
+            "tiles": self.tiles,
+            "megapixels": round(self.megapixels, 3),
+            "megapixels_per_second": round(self.megapixels / self.seconds, 3) if self.seconds else 0.0,
+        }
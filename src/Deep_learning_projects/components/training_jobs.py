@@ -0,0 +1,273 @@
+import asyncio
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from Deep_learning_projects.utils import log
+from Deep_learning_projects.utils.metrics import TRAINING_JOBS
+from Deep_learning_projects.entity.config_entity import TrainingJobsConfig
+
+STATUSES = ("queued", "running", "cancelling", "succeeded", "failed", "cancelled", "interrupted")
+FINISHED = ("succeeded", "failed", "cancelled", "interrupted")
+
+# Lines of the job log kept as the error of a failed job
+ERROR_TAIL_LINES = 40
+
+# Environment variables that size the thread pools of the job process
+THREAD_VARIABLES = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class UnknownJob(KeyError):
+    pass
+
+
+def log_tail(path: Path, lines: int) -> str:
+    if not path.exists():
+        return ""
+    with open(path, "rb") as f:
+        f.seek(max(0, os.path.getsize(path) - 64 * 1024))
+        return b"\n".join(f.read().splitlines()[-lines:]).decode(errors="replace")
+
+
+class TrainingJobManager:
+    """
+    Runs training jobs (data ingestion, base model, training) in their own
+    processes instead of inside the API: lower CPU priority (nice), pinned
+    away from the cores kept for serving, at most `max_concurrent_jobs` at a
+    time with the rest queued. Each job has an id, a status, a log file and,
+    when it fails, the tail of that log as its error. Job records are kept
+    as JSON under root_dir, so they outlive API restarts.
+    """
+    def __init__(self, config: TrainingJobsConfig):
+        self.config = config
+        self.root = Path(config.root_dir)
+        self.jobs = OrderedDict()
+        self._processes = {}
+        self._watch_task = None
+        self._stopping = False
+
+        cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+        # The first serving_cores stay with the API; jobs get the rest (all of them on a small box)
+        self.job_cores = cores[config.serving_cores:] or cores
+
+    def _job_dir(self, job_id: str) -> Path:
+        return self.root / job_id
+
+    def _save(self, job: dict):
+        path = self._job_dir(job["job_id"]) / "job.json"
+        temporary = path.with_name("job.json.tmp")
+        with open(temporary, "w") as f:
+            json.dump(job, f, indent=4)
+        os.replace(temporary, path)
+        self._update_metrics()
+
+    def _update_metrics(self):
+        counts = {status: 0 for status in STATUSES}
+        for job in self.jobs.values():
+            counts[job["status"]] += 1
+        for status, count in counts.items():
+            TRAINING_JOBS.set(count, status=status)
+
+    def _load(self):
+        # Processes of an earlier API process cannot be followed: their jobs are
+        # marked interrupted (training resumes from last.pt when resubmitted)
+        records = []
+        for path in self.root.glob("*/job.json"):
+            with open(path, "r") as f:
+                records.append(json.load(f))
+        for job in sorted(records, key=lambda job: job["created"]):
+            self.jobs[job["job_id"]] = job
+            if job["status"] in ("running", "cancelling"):
+                job.update(status="interrupted", finished=time.time(), pid=None,
+                           error="The API restarted while the job was running")
+                self._save(job)
+        self._update_metrics()
+
+    async def start(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._load()
+        self._start_queued()
+        self._watch_task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        self._stopping = True
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+        # Jobs are not left running unsupervised
+        for job_id in list(self._processes):
+            self.cancel(job_id, reason="The API shut down")
+        deadline = time.monotonic() + self.config.cancel_grace_s
+        while self._processes and time.monotonic() < deadline:
+            self.poll()
+            await asyncio.sleep(0.2)
+        for job_id in list(self._processes):
+            self._signal(job_id, signal.SIGKILL if hasattr(signal, "SIGKILL") else signal.SIGTERM)
+        self.poll()
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.config.poll_s)
+            try:
+                self.poll()
+            except Exception as e:
+                log.exception(f"Training job poll failed: {e}")
+
+    def submit(self) -> dict:
+        queued = sum(job["status"] == "queued" for job in self.jobs.values())
+        if queued >= self.config.max_queued_jobs:
+            raise JobQueueFull(f"{queued} training jobs are already queued")
+        job_id = time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "created": time.time(),
+            "started": None,
+            "finished": None,
+            "pid": None,
+            "returncode": None,
+            "error": None,
+            "log_path": str(self._job_dir(job_id) / "job.log"),
+        }
+        self._job_dir(job_id).mkdir(parents=True, exist_ok=True)
+        self.jobs[job_id] = job
+        self._save(job)
+        log.info(f"Training job {job_id} queued")
+        self._start_queued()
+        self._prune()
+        return job
+
+    def _start_queued(self):
+        if self._stopping:
+            return
+        for job in list(self.jobs.values()):
+            if len(self._processes) >= self.config.max_concurrent_jobs:
+                break
+            if job["status"] == "queued":
+                self._launch(job)
+
+    def _launch(self, job: dict):
+        env = dict(os.environ)
+        if self.job_cores:
+            for name in THREAD_VARIABLES:
+                env[name] = str(len(self.job_cores))
+        options = {}
+        if os.name == "posix":
+            # Own process group: cancel reaches the dataloader workers too
+            options = {"start_new_session": True}
+        elif self.config.niceness > 0:
+            options = {"creationflags": subprocess.BELOW_NORMAL_PRIORITY_CLASS}
+
+        log_file = open(job["log_path"], "ab")
+        try:
+            process = subprocess.Popen(
+                [sys.executable, "-m", "Deep_learning_projects.pipeline.training_job_pipeline"],
+                stdout=log_file, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL, env=env, **options
+            )
+        except OSError as e:
+            job.update(status="failed", finished=time.time(), error=f"Could not start the job: {e}")
+            self._save(job)
+            return
+        finally:
+            log_file.close()
+        self._limit(process.pid)
+        self._processes[job["job_id"]] = process
+        job.update(status="running", started=time.time(), pid=process.pid)
+        self._save(job)
+        log.info(f"Training job {job['job_id']} started as pid {process.pid} (nice {self.config.niceness}, "
+                 f"cores {self.job_cores or 'all'})")
+
+    def _limit(self, pid: int):
+        # Applied from here rather than in a preexec_fn, which is not safe in the
+        # threaded API process. The child is still starting its interpreter, so
+        # the threads it creates later inherit both settings.
+        try:
+            if self.config.niceness and hasattr(os, "setpriority"):
+                current = os.getpriority(os.PRIO_PROCESS, pid)
+                os.setpriority(os.PRIO_PROCESS, pid, current + self.config.niceness)
+            if self.job_cores:
+                os.sched_setaffinity(pid, self.job_cores)
+        except OSError as e:
+            log.warning(f"Could not lower the priority / pin the cores of pid {pid}: {e}")
+
+    def poll(self):
+        """
+        Records jobs that exited, escalates cancels past their grace period
+        and starts queued jobs in the freed slots.
+        """
+        for job_id, process in list(self._processes.items()):
+            job = self.jobs[job_id]
+            returncode = process.poll()
+            if returncode is None:
+                if (job["status"] == "cancelling"
+                        and time.time() - job["cancel_requested"] > self.config.cancel_grace_s):
+                    self._signal(job_id, signal.SIGKILL if hasattr(signal, "SIGKILL") else signal.SIGTERM)
+                continue
+
+            del self._processes[job_id]
+            job.update(returncode=returncode, finished=time.time(), pid=None)
+            if job["status"] == "cancelling":
+                job["status"] = "cancelled"
+            elif returncode == 0:
+                job["status"] = "succeeded"
+            else:
+                job["status"] = "failed"
+                job["error"] = log_tail(Path(job["log_path"]), ERROR_TAIL_LINES)
+            self._save(job)
+            log.info(f"Training job {job_id} {job['status']} (exit code {returncode}, "
+                     f"{job['finished'] - job['started']:.0f} s)")
+        self._start_queued()
+
+    def _signal(self, job_id: str, signum: int):
+        process = self._processes.get(job_id)
+        if process is None or process.poll() is not None:
+            return
+        try:
+            if os.name == "posix":
+                os.killpg(process.pid, signum)
+            else:
+                process.terminate()
+        except ProcessLookupError:
+            pass
+
+    def cancel(self, job_id: str, reason: str = "Cancelled") -> dict:
+        job = self.get(job_id)
+        if job["status"] == "queued":
+            job.update(status="cancelled", finished=time.time(), error=reason)
+            self._save(job)
+        elif job["status"] == "running":
+            # SIGTERM first; poll() sends SIGKILL once cancel_grace_s has passed
+            job.update(status="cancelling", cancel_requested=time.time(), error=reason)
+            self._save(job)
+            self._signal(job_id, signal.SIGTERM)
+            log.info(f"Cancelling training job {job_id}")
+        return job
+
+    def get(self, job_id: str) -> dict:
+        if job_id not in self.jobs:
+            raise UnknownJob(job_id)
+        return self.jobs[job_id]
+
+    def log_text(self, job_id: str, lines: int) -> str:
+        return log_tail(Path(self.get(job_id)["log_path"]), lines)
+
+    def info(self) -> list:
+        # Newest first
+        return list(reversed(self.jobs.values()))
+
+    def _prune(self):
+        # Oldest finished jobs (record and log) beyond keep_jobs are deleted
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in FINISHED]
+        for job_id in finished[:max(0, len(finished) - self.config.keep_jobs)]:
+            del self.jobs[job_id]
+            shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+        self._update_metrics()
@@ -0,0 +1,177 @@
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from Deep_learning_projects.utils import log
+
+# Uncompressed bytes per task: small enough to spread and report progress,
+# large enough that per-task overhead does not matter
+TASK_BYTES = 64 * 1024 * 1024
+TASK_MEMBERS = 512
+
+# Each worker process opens the archive once, not once per task
+_archive = None
+
+
+def member_target(destination: str, info: zipfile.ZipInfo) -> str:
+    """
+    Where ZipFile.extract() writes `info` under `destination`: the same
+    sanitising (no absolute paths, '..' or drive letters) as the standard library.
+    """
+    name = info.filename.replace("/", os.path.sep)
+    if os.path.altsep:
+        name = name.replace(os.path.altsep, os.path.sep)
+    name = os.path.splitdrive(name)[1]
+    name = os.path.sep.join(part for part in name.split(os.path.sep) if part not in ("", os.path.curdir, os.path.pardir))
+    if os.path.sep == "\\":
+        name = zipfile.ZipFile._sanitize_windows_name(name, os.path.sep)
+    return os.path.normpath(os.path.join(destination, name))
+
+
+def _open_archive(zip_path: str):
+    global _archive
+    _archive = zipfile.ZipFile(zip_path, "r")
+
+
+def _extract_members(destination: str, names: list) -> int:
+    # ZipFile.extract streams each member to disk through a small buffer
+    written = 0
+    for name in names:
+        info = _archive.getinfo(name)
+        _archive.extract(info, destination)
+        written += info.file_size
+    return written
+
+
+class ZipExtractor:
+    """
+    Extracts a zip archive with the members spread over worker processes
+    (decompression is CPU-bound), streaming each member to disk. An index of
+    each extracted member's CRC, size and file mtime lets re-runs skip members
+    whose file is still there unchanged. The resulting tree is the same as extractall().
+    """
+    def __init__(self, zip_path: Path, destination: Path, index_path: Path, workers: int = 0):
+        self.zip_path = Path(zip_path)
+        self.destination = Path(destination)
+        self.index_path = Path(index_path)
+        self.workers = workers or os.cpu_count()
+
+    def _load_index(self) -> dict:
+        if self.index_path.exists():
+            with open(self.index_path, "r") as f:
+                return json.load(f)
+        return {}
+
+    def _save_index(self, index: dict):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.index_path, "w") as f:
+            json.dump(index, f)
+
+    def _plan(self, archive: zipfile.ZipFile, index: dict) -> tuple:
+        destination = str(self.destination)
+        # Later duplicates overwrite earlier ones in extractall(): keep the last per target
+        last = {}
+        for info in archive.infolist():
+            last[member_target(destination, info)] = info
+
+        directories, pending, skipped = [], [], 0
+        for target, info in last.items():
+            if info.is_dir():
+                directories.append(target)
+                continue
+            # A file edited in place keeps its size but not its mtime
+            recorded = index.get(info.filename)
+            if recorded is not None and os.path.isfile(target):
+                stat = os.stat(target)
+                if recorded == [info.CRC, info.file_size, stat.st_mtime_ns] and stat.st_size == info.file_size:
+                    skipped += 1
+                    continue
+            pending.append(info)
+        return directories, pending, skipped
+
+    def _record(self, index: dict, task: list):
+        for info in task:
+            mtime = os.stat(member_target(str(self.destination), info)).st_mtime_ns
+            index[info.filename] = [info.CRC, info.file_size, mtime]
+
+    def _tasks(self, pending: list) -> list:
+        tasks, current, size = [], [], 0
+        # Largest first, so one big member does not finish last on its own
+        for info in sorted(pending, key=lambda info: -info.file_size):
+            current.append(info)
+            size += info.file_size
+            if size >= TASK_BYTES or len(current) >= TASK_MEMBERS:
+                tasks.append(current)
+                current, size = [], 0
+        if current:
+            tasks.append(current)
+        return tasks
+
+    def extract(self) -> dict:
+        start = time.perf_counter()
+        index = self._load_index()
+        with zipfile.ZipFile(self.zip_path, "r") as archive:
+            directories, pending, skipped = self._plan(archive, index)
+        # Created up front: workers creating the same parent at once would race
+        for directory in set(directories) | {os.path.dirname(member_target(str(self.destination), info))
+                                             for info in pending}:
+            os.makedirs(directory, exist_ok=True)
+
+        total_bytes = sum(info.file_size for info in pending)
+        log.info(f"Extracting {len(pending)} members ({total_bytes / 1024 ** 2:.1f} MB) of {self.zip_path}; "
+                 f"{skipped} unchanged members skipped")
+
+        tasks = self._tasks(pending)
+        done_members, done_bytes, logged = 0, 0, start
+        destination = str(self.destination)
+        try:
+            if len(tasks) <= 1 or self.workers <= 1:
+                # Not worth starting processes
+                _open_archive(str(self.zip_path))
+                try:
+                    for task in tasks:
+                        done_bytes += _extract_members(destination, [info.filename for info in task])
+                        done_members += len(task)
+                        self._record(index, task)
+                finally:
+                    _archive.close()
+            else:
+                with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks)), initializer=_open_archive,
+                                         initargs=(str(self.zip_path),)) as executor:
+                    futures = {
+                        executor.submit(_extract_members, destination, [info.filename for info in task]): task
+                        for task in tasks
+                    }
+                    for future in as_completed(futures):
+                        task = futures[future]
+                        done_bytes += future.result()
+                        done_members += len(task)
+                        self._record(index, task)
+                        now = time.perf_counter()
+                        if now - logged >= 5:
+                            logged = now
+                            rate = done_bytes / (now - start) / 1024 ** 2
+                            log.info(f"Extracted {done_members}/{len(pending)} members "
+                                     f"({done_bytes / max(total_bytes, 1):.0%}, {rate:.1f} MB/s)")
+        finally:
+            # Whatever finished is skipped next time, even if a member failed
+            self._save_index(index)
+
+        # Forget members no longer in the archive
+        with zipfile.ZipFile(self.zip_path, "r") as archive:
+            names = set(archive.namelist())
+        index = {name: entry for name, entry in index.items() if name in names}
+        self._save_index(index)
+
+        elapsed = time.perf_counter() - start
+        stats = {
+            "extracted_members": len(pending),
+            "skipped_members": skipped,
+            "bytes": total_bytes,
+            "seconds": round(elapsed, 3),
+            "mb_per_s": round(total_bytes / max(elapsed, 1e-9) / 1024 ** 2, 2),
+        }
+        log.info(f"Extracted {self.zip_path} to {self.destination}: {stats}")
+        return stats
@@ -1,7 +1,15 @@
 from Deep_learning_projects.entity.config_entity import (DataIngestionConfig,
                                                          PrepareBaseModelConfig,
                                                          TrainingConfig,
-                                                         EvaluationConfig)
+                                                         EvaluationConfig,
+                                                         PredictionConfig,
+                                                         ModelExportConfig,
+                                                         ModelQuantizationConfig,
+                                                         LoadTestConfig,
+                                                         DatasetCacheConfig,
+                                                         LabelIndexConfig,
+                                                         HyperparameterSearchConfig,
+                                                         TrainingJobsConfig)
 from pathlib import Path
 import os
 from Deep_learning_projects.utils.common import read_yaml, create_directories,save_json
@@ -31,7 +39,13 @@ class ConfigurationManager:
             root_dir=config.root_dir,
             source_URL=config.source_URL,
             local_data_file=config.local_data_file,
-            unzip_dir=config.unzip_dir 
+            unzip_dir=config.unzip_dir,
+            checksum_manifest=config.checksum_manifest,
+            sha256=config.sha256,
+            download_workers=config.download_workers,
+            chunk_mb=config.chunk_mb,
+            min_parallel_mb=config.min_parallel_mb,
+            extract_workers=config.extract_workers
         )
 
         return data_ingestion_config
@@ -72,6 +86,9 @@ class ConfigurationManager:
             trained_model_path=Path(training.trained_model_path),
             updated_base_model_path=Path(prepare_base_model.updated_base_model_path),
             training_data=Path(training_data),
+            resume=training.resume,
+            max_train_hours=training.max_train_hours,
+            patience=training.patience,
             params_epochs=params.EPOCHS,
             params_batch_size=params.BATCH_SIZE,
             params_is_augmentation=params.AUGMENTATION,
@@ -84,6 +101,81 @@ class ConfigurationManager:
         return training_config
 
 
+    def get_training_jobs_config(self) -> TrainingJobsConfig:
+        config = self.config.training_jobs
+
+        create_directories([config.root_dir])
+
+        training_jobs_config = TrainingJobsConfig(
+            root_dir=Path(config.root_dir),
+            max_concurrent_jobs=config.max_concurrent_jobs,
+            max_queued_jobs=config.max_queued_jobs,
+            niceness=config.niceness,
+            serving_cores=config.serving_cores,
+            cancel_grace_s=config.cancel_grace_s,
+            poll_s=config.poll_s,
+            keep_jobs=config.keep_jobs
+        )
+
+        return training_jobs_config
+
+    def get_dataset_cache_config(self) -> DatasetCacheConfig:
+        config = self.config.dataset_cache
+
+        create_directories([config.root_dir])
+
+        dataset_cache_config = DatasetCacheConfig(
+            root_dir=Path(config.root_dir),
+            training_data=Path(config.training_data),
+            enabled=config.enabled,
+            num_workers=config.num_workers,
+            keep_caches=config.keep_caches,
+            params_image_size=self.params.IMAGE_SIZE
+        )
+
+        return dataset_cache_config
+
+
+    def get_label_index_config(self) -> LabelIndexConfig:
+        config = self.config.label_index
+
+        label_index_config = LabelIndexConfig(
+            index_path=Path(config.index_path),
+            stats_path=Path(config.stats_path),
+            training_data=Path(config.training_data),
+            num_workers=config.num_workers,
+            params_classes=self.params.CLASSES,
+            params_image_size=self.params.IMAGE_SIZE
+        )
+
+        return label_index_config
+
+
+    def get_hyperparameter_search_config(self) -> HyperparameterSearchConfig:
+        config = self.config.hyperparameter_search
+        search_space = config.search_space.to_dict()
+
+        create_directories([config.root_dir])
+
+        # EPOCHS is the budget ASHA hands out: its range bounds the rungs
+        hyperparameter_search_config = HyperparameterSearchConfig(
+            root_dir=Path(config.root_dir),
+            db_path=Path(config.db_path),
+            training_data=Path(config.training_data),
+            base_model_path=Path(self.config.prepare_base_model.updated_base_model_path),
+            search_space=search_space,
+            min_epochs=int(search_space["EPOCHS"]["low"]),
+            max_epochs=int(search_space["EPOCHS"]["high"]),
+            num_trials=config.num_trials,
+            parallel_trials=config.parallel_trials,
+            cpu_cores=config.cpu_cores,
+            reduction_factor=config.reduction_factor,
+            seed=config.seed
+        )
+
+        return hyperparameter_search_config
+
+
     def get_evaluation_config(self) -> EvaluationConfig:
         # 1. Load the evaluation config section we just created in YAML
         eval_config = self.config.evaluation
@@ -105,4 +197,117 @@ class ConfigurationManager:
             params_batch_size=params.BATCH_SIZE
         )
         
-        return evaluation_config
\ No newline at end of file
+        return evaluation_config
+
+
+    def get_prediction_config(self) -> PredictionConfig:
+        config = self.config.prediction
+
+        prediction_config = PredictionConfig(
+            model_path=Path(config.model_path),
+            warmup_runs=config.warmup_runs,
+            max_batch_size=config.max_batch_size,
+            max_wait_ms=config.max_wait_ms,
+            max_upload_mb=config.max_upload_mb,
+            max_batch_upload_mb=config.max_batch_upload_mb,
+            decode_workers=config.decode_workers,
+            num_workers=config.num_workers,
+            threads_per_worker=config.threads_per_worker,
+            cache_max_mb=config.cache_max_mb,
+            cache_ttl_s=config.cache_ttl_s,
+            inference_concurrency=config.inference_concurrency,
+            max_queue_size=config.max_queue_size,
+            backend=config.backend,
+            export_report_path=Path(config.export_report_path),
+            quantization_scores_path=Path(config.quantization_scores_path),
+            tile_overlap=config.tile_overlap,
+            tile_merge_threshold=config.tile_merge_threshold,
+            watch_path=Path(config.watch_path),
+            reload_poll_s=config.reload_poll_s,
+            reload_warmup_runs=config.reload_warmup_runs,
+            drain_timeout_s=config.drain_timeout_s,
+            default_model=config.default_model,
+            models={name: dict(overrides) for name, overrides in (config.models or {}).items()},
+            max_memory_mb=config.max_memory_mb,
+            memory_budget_mb=config.memory_budget_mb,
+            model_idle_unload_s=config.model_idle_unload_s,
+            preallocate_inputs=config.preallocate_inputs,
+            input_buffer_shapes=config.input_buffer_shapes,
+            reduced_decode=config.reduced_decode,
+            params_image_size=self.params.IMAGE_SIZE
+        )
+
+        return prediction_config
+
+
+    def get_model_export_config(self) -> ModelExportConfig:
+        config = self.config.model_export
+
+        create_directories([config.root_dir])
+
+        model_export_config = ModelExportConfig(
+            root_dir=Path(config.root_dir),
+            path_of_model=Path(config.path_of_model),
+            training_data=Path(config.training_data),
+            report_path=Path(config.report_path),
+            formats=list(config.formats),
+            benchmark_images=config.benchmark_images,
+            benchmark_batch_size=config.benchmark_batch_size,
+            parity_iou_threshold=config.parity_iou_threshold,
+            parity_conf_tolerance=config.parity_conf_tolerance,
+            parity_min_match_rate=config.parity_min_match_rate,
+            params_image_size=self.params.IMAGE_SIZE
+        )
+
+        return model_export_config
+
+
+    def get_model_quantization_config(self) -> ModelQuantizationConfig:
+        config = self.config.model_quantization
+        params = self.params
+
+        create_directories([config.root_dir])
+
+        model_quantization_config = ModelQuantizationConfig(
+            root_dir=Path(config.root_dir),
+            path_of_model=Path(config.path_of_model),
+            training_data=Path(config.training_data),
+            scores_path=Path(config.scores_path),
+            format=config.format,
+            benchmark_images=config.benchmark_images,
+            params_image_size=params.IMAGE_SIZE,
+            params_batch_size=params.BATCH_SIZE,
+            params_calibration_fraction=params.QUANT_CALIBRATION_FRACTION,
+            params_max_map_drop=params.QUANT_MAX_MAP_DROP
+        )
+
+        return model_quantization_config
+
+
+    def get_load_test_config(self) -> LoadTestConfig:
+        config = self.config.load_test
+
+        create_directories([config.root_dir])
+
+        load_test_config = LoadTestConfig(
+            root_dir=Path(config.root_dir),
+            report_path=Path(config.report_path),
+            mode=config.mode,
+            app=config.app,
+            host=config.host,
+            port=config.port,
+            url=config.url,
+            concurrency=config.concurrency,
+            rate=config.rate,
+            duration_s=config.duration_s,
+            warmup_requests=config.warmup_requests,
+            num_images=config.num_images,
+            image_sizes=[list(size) for size in config.image_sizes],
+            unique_requests=config.unique_requests,
+            response_format=config.response_format,
+            max_latency_regression=config.max_latency_regression,
+            max_throughput_regression=config.max_throughput_regression,
+            max_error_rate=config.max_error_rate
+        )
+
+        return load_test_config
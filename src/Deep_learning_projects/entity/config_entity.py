@@ -9,6 +9,12 @@ class DataIngestionConfig:
     source_URL: str
     local_data_file: Path
     unzip_dir: Path
+    checksum_manifest: str    # URL/path of a JSON or sha256sum manifest ('' = just source_URL)
+    sha256: str               # Expected digest of source_URL when there is no manifest ('' = unchecked)
+    download_workers: int     # Parallel range requests per file
+    chunk_mb: float           # Read size per request chunk
+    min_parallel_mb: float    # Smaller files are fetched in one segment
+    extract_workers: int      # Processes extracting archive members (0 = cpu count)
 
 @dataclass(frozen=True)
 class PrepareBaseModelConfig:
@@ -26,14 +32,65 @@ class TrainingConfig:
     trained_model_path: Path
     updated_base_model_path: Path
     training_data: Path
+    resume: bool                # Continue from weights/last.pt when the run fingerprint matches
+    max_train_hours: float      # Wall-clock budget across restarts (0 = no limit)
+    patience: int               # Stop after this many epochs without improvement (0 = never)
     params_epochs: int
     params_batch_size: int
     params_is_augmentation: bool
     params_image_size: list
-    params_classes: int         # <--- ADDED: To validate dataset against params.yaml
+    params_classes: int         # <--- ADDED: To validate dataset against params.yaml (see LabelIndex)
     params_learning_rate: float
 
 
+@dataclass(frozen=True)
+class TrainingJobsConfig:
+    root_dir: Path            # One directory per job: job.json and job.log
+    max_concurrent_jobs: int  # Jobs running at once; later ones wait in the queue
+    max_queued_jobs: int      # /train/start answers 429 beyond this
+    niceness: int             # Added to the job process's nice value (lower CPU priority than the API)
+    serving_cores: int        # Cores kept for the API: jobs are pinned to the others
+    cancel_grace_s: float     # SIGTERM to SIGKILL on cancel
+    poll_s: float             # How often job processes are checked
+    keep_jobs: int            # Finished jobs kept (older records and logs are deleted)
+
+
+@dataclass(frozen=True)
+class DatasetCacheConfig:
+    root_dir: Path            # One subdirectory per cache key
+    training_data: Path       # data.yaml whose splits are cached
+    enabled: bool             # Train / evaluate from the cache instead of the image files
+    num_workers: int          # Decode and hash threads (0 = cpu count)
+    keep_caches: int          # Caches kept on disk, newest first (older keys are deleted)
+    params_image_size: list   # [640, 640, 3]
+
+
+@dataclass(frozen=True)
+class LabelIndexConfig:
+    index_path: Path          # .npz with every box of every split, updated incrementally
+    stats_path: Path          # Class counts / box sizes written before training
+    training_data: Path       # data.yaml whose splits are indexed
+    num_workers: int          # Label-parsing processes (0 = cpu count)
+    params_classes: int       # CLASSES; labels and data.yaml must agree with it
+    params_image_size: list   # Box sizes are reported in pixels at this size
+
+
+@dataclass(frozen=True)
+class HyperparameterSearchConfig:
+    root_dir: Path            # One directory per trial and rung, plus summary.json / best_params.yaml
+    db_path: Path             # SQLite results table; rerunning the sweep resumes from it
+    training_data: Path       # data.yaml the trials train on
+    base_model_path: Path     # Weights every trial starts from
+    search_space: dict        # params.yaml key -> list of choices, or {low, high, log}
+    min_epochs: int           # EPOCHS of the first rung
+    max_epochs: int           # EPOCHS of the last rung
+    num_trials: int           # Configurations sampled in total
+    parallel_trials: int      # Trial processes at once; the CPU cores are split between them
+    cpu_cores: int            # Cores the sweep may use (0 = all)
+    reduction_factor: int     # ASHA eta: the top 1/eta of a rung is promoted to the next
+    seed: int                 # Trial n always samples the same configuration
+
+
 @dataclass(frozen=True)
 class EvaluationConfig:
     path_of_model: Path       # Path to artifacts/training/best.pt
@@ -41,4 +98,90 @@ class EvaluationConfig:
     all_params: dict          # param.yaml content
     mlflow_uri: str           # MLflow tracking URI
     params_image_size: list   # [640, 640, 3]
-    params_batch_size: int 
+    params_batch_size: int
+
+
+@dataclass(frozen=True)
+class PredictionConfig:
+    model_path: Path          # Weights served by the API (e.g. model/best(1).pt)
+    warmup_runs: int          # Dummy inferences run right after loading
+    max_batch_size: int       # Most requests merged into one forward pass
+    max_wait_ms: float        # Longest a request waits for others to join its batch
+    max_upload_mb: float      # Uploads above this are rejected with 413 while streaming
+    max_batch_upload_mb: float  # Same limit for /predict/batch (many files or a zip)
+    decode_workers: int       # Threads decoding /predict/batch images (0 = cpu count)
+    num_workers: int          # Inference processes sharing the weights (0 = run in the API process)
+    threads_per_worker: int   # torch threads per inference process (0 = cores / num_workers)
+    cache_max_mb: float       # Memory budget of the prediction cache (0 = disabled)
+    cache_ttl_s: float        # Lifetime of a cached prediction (0 = until evicted)
+    inference_concurrency: int  # Batches run at once in the API process (ignored with num_workers)
+    max_queue_size: int       # Requests allowed to wait for inference before 503 (0 = unbounded)
+    backend: str              # pytorch | onnx | openvino | torchscript | int8 | auto (fastest validated)
+    export_report_path: Path  # Written by the model_export stage
+    quantization_scores_path: Path  # Written by the model_quantization stage
+    tile_overlap: float       # Overlap between neighbouring tiles in tiled mode (0-1)
+    tile_merge_threshold: float  # Intersection-over-smaller above which cross-tile duplicates merge
+    watch_path: Path          # New weights appearing here are hot-reloaded
+    reload_poll_s: float      # How often watch_path is checked (0 = admin reloads only)
+    reload_warmup_runs: int   # Dummy inferences on reloaded weights before they are swapped in
+    drain_timeout_s: float    # Longest wait for requests on the old model after a swap
+    default_model: str        # Name /predict uses without ?model=
+    models: dict              # Extra models: name -> overrides of these fields
+    max_memory_mb: float      # Memory budget of one model (reserved before it loads)
+    memory_budget_mb: float   # All loaded models together; LRU models are unloaded beyond it (0 = no limit)
+    model_idle_unload_s: float  # Unload non-default models unused for this long (0 = never)
+    preallocate_inputs: bool  # Letterbox decoded images into reused input tensors
+    input_buffer_shapes: int  # Batch sizes / resize shapes whose buffers are kept
+    reduced_decode: bool      # Decode large JPEGs at 1/2-1/8 scale, near the model input size
+    params_image_size: list   # [640, 640, 3]
+
+
+@dataclass(frozen=True)
+class ModelExportConfig:
+    root_dir: Path
+    path_of_model: Path           # Trained best.pt
+    training_data: Path           # data.yaml, for validation images
+    report_path: Path             # Parity + benchmark results per backend
+    formats: list                 # e.g. ['onnx', 'openvino', 'torchscript']
+    benchmark_images: int
+    benchmark_batch_size: int     # Batched (InputPreprocessor) run too when > 1
+    parity_iou_threshold: float   # A detection matches when IoU >= this ...
+    parity_conf_tolerance: float  # ... and |conf difference| <= this
+    parity_min_match_rate: float  # Share of matching detections a backend needs
+    params_image_size: list
+
+
+@dataclass(frozen=True)
+class ModelQuantizationConfig:
+    root_dir: Path
+    path_of_model: Path                 # FP32 best.pt
+    training_data: Path                 # data.yaml (calibration + validation)
+    scores_path: Path                   # quantization_scores.json
+    format: str                         # INT8 export format, e.g. 'openvino'
+    benchmark_images: int
+    params_image_size: list
+    params_batch_size: int
+    params_calibration_fraction: float  # Share of the val split used to calibrate
+    params_max_map_drop: float          # Largest mAP50-95 drop that still gets promoted
+
+
+@dataclass(frozen=True)
+class LoadTestConfig:
+    root_dir: Path
+    report_path: Path                 # JSON results of the run
+    mode: str                         # inprocess | localhost (spawn uvicorn) | url (already running)
+    app: str                          # "module:attribute" of the FastAPI app under test
+    host: str
+    port: int
+    url: str                          # Base URL for mode=url
+    concurrency: int                  # Requests in flight at once
+    rate: float                       # Target requests/s (0 = closed loop, as fast as responses allow)
+    duration_s: float
+    warmup_requests: int              # Sent first and left out of the results
+    num_images: int                   # Synthetic JPEGs generated up front
+    image_sizes: list                 # [[width, height], ...]
+    unique_requests: bool             # Make every upload distinct so the prediction cache cannot answer it
+    response_format: str              # /predict?format=
+    max_latency_regression: float     # Gate: allowed relative p95 increase against a baseline
+    max_throughput_regression: float  # Gate: allowed relative throughput drop
+    max_error_rate: float             # Gate: largest acceptable error rate
@@ -0,0 +1,65 @@
+import argparse
+import dataclasses
+import json
+from Deep_learning_projects.config.configuration import ConfigurationManager
+from Deep_learning_projects.components.hyperparameter_search import HyperparameterSearch, run_trial
+from Deep_learning_projects.components.label_index import LabelIndex
+from Deep_learning_projects.components.model_training import Training
+from Deep_learning_projects.utils import log
+
+STAGE_NAME = "Hyperparameter search"
+
+
+class HyperparameterSearchPipeline:
+    def __init__(self, overrides: dict = None):
+        self.overrides = overrides or {}
+
+    def main(self) -> dict:
+        config = ConfigurationManager()
+        search_config = dataclasses.replace(config.get_hyperparameter_search_config(), **self.overrides)
+
+        # 1. Same dataset checks as the training stage, once for all trials
+        Training(config=config.get_training_config()).update_data_yaml_paths()
+        LabelIndex(config=config.get_label_index_config()).validate()
+
+        # 2. Run (or resume) the sweep
+        search = HyperparameterSearch(config=search_config, cache_config=config.get_dataset_cache_config())
+        return search.run()
+
+
+def trial_main(spec_path: str):
+    # Entry point of the trial processes the sweep starts
+    with open(spec_path, "r") as f:
+        spec = json.load(f)
+    result = run_trial(spec)
+    with open(spec["result_path"], "w") as f:
+        json.dump(result, f, indent=4)
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="ASHA hyperparameter sweep (defaults from config.yaml "
+                                                 "hyperparameter_search). Rerun to resume an interrupted sweep.")
+    parser.add_argument("--trials", dest="num_trials", type=int)
+    parser.add_argument("--parallel", dest="parallel_trials", type=int, help="Trial processes at once")
+    parser.add_argument("--cores", dest="cpu_cores", type=int, help="CPU cores to split between trials (0 = all)")
+    parser.add_argument("--db", dest="db_path", help="Results table to write / resume from")
+    parser.add_argument("--run-trial", help=argparse.SUPPRESS)
+    args = vars(parser.parse_args(argv))
+
+    spec_path = args.pop("run_trial")
+    if spec_path:
+        trial_main(spec_path)
+        return
+    overrides = {key: value for key, value in args.items() if value is not None}
+    HyperparameterSearchPipeline(overrides=overrides).main()
+
+
+if __name__ == '__main__':
+    try:
+        log.info("*******************")
+        log.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+        main()
+        log.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+    except Exception as e:
+        log.exception(e)
+        raise e
@@ -0,0 +1,79 @@
+import argparse
+import dataclasses
+import json
+import sys
+from pathlib import Path
+from Deep_learning_projects.config.configuration import ConfigurationManager
+from Deep_learning_projects.components.load_generator import LoadTest, compare_reports
+from Deep_learning_projects.utils import log
+
+STAGE_NAME = "Load test"
+
+
+class LoadTestPipeline:
+    def __init__(self, overrides: dict = None, label: str = "", baseline: str = None):
+        self.overrides = overrides or {}
+        self.label = label
+        self.baseline = baseline
+
+    def main(self) -> list:
+        config = ConfigurationManager()
+        load_test_config = dataclasses.replace(config.get_load_test_config(), **self.overrides)
+        load_test = LoadTest(config=load_test_config, label=self.label)
+
+        # 1. Drive /predict and write the JSON report
+        report = load_test.run()
+
+        # 2. Optionally gate against an earlier report (e.g. the one committed for review)
+        if not self.baseline:
+            return []
+        with open(self.baseline) as f:
+            baseline = json.load(f)
+        failures = compare_reports(
+            baseline, report,
+            load_test_config.max_latency_regression,
+            load_test_config.max_throughput_regression,
+            load_test_config.max_error_rate
+        )
+        for failure in failures:
+            log.error(f"Load test regression: {failure}")
+        if not failures:
+            log.info(f"Load test within tolerance of {self.baseline}")
+        return failures
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Load-test the /predict endpoint (defaults from config.yaml load_test).")
+    parser.add_argument("--mode", choices=["inprocess", "localhost", "url"])
+    parser.add_argument("--url", help="Base URL of a running server (mode=url)")
+    parser.add_argument("--app", help="FastAPI app as module:attribute (default app:app)")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--concurrency", type=int)
+    parser.add_argument("--rate", type=float, help="Requests/s; 0 sends as fast as responses allow")
+    parser.add_argument("--duration", dest="duration_s", type=float, help="Seconds of measured load")
+    parser.add_argument("--warmup", dest="warmup_requests", type=int)
+    parser.add_argument("--format", dest="response_format", choices=["json", "columnar", "msgpack", "f32"])
+    parser.add_argument("--allow-cache-hits", dest="unique_requests", action="store_false", default=None,
+                        help="Send repeated images as-is so the prediction cache can answer them")
+    parser.add_argument("--output", dest="report_path", type=Path)
+    parser.add_argument("--label", default="", help="Free-text tag stored in the report, e.g. 'onnx, 2 workers'")
+    parser.add_argument("--compare", help="Baseline report; exit with status 1 on a regression")
+    args = vars(parser.parse_args(argv))
+
+    label, baseline = args.pop("label"), args.pop("compare")
+    overrides = {key: value for key, value in args.items() if value is not None}
+    failures = LoadTestPipeline(overrides=overrides, label=label, baseline=baseline).main()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    try:
+        log.info("*******************")
+        log.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+        main()
+    except SystemExit:
+        log.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+        raise
+    except Exception as e:
+        log.exception(e)
+        raise e
@@ -1,25 +1,40 @@
-import os
 import sys
-from ultralytics import YOLO
+import copy
+import time
 from Deep_learning_projects.utils import log
+from Deep_learning_projects.utils.metrics import observe_phases
+from Deep_learning_projects.utils.prediction_format import detections_from_result, to_rows
+from Deep_learning_projects.components.input_preprocessor import InputPreprocessor
 
 class PredictionPipeline:
-    def __init__(self):
-        # Hardcoding the model path as per user instruction "my best.pt is on the model folder"
-        # In a more robust setup, this could be in config.yaml
-        self.model_path = os.path.join("model", "best(1).pt")
-        
-        if not os.path.exists(self.model_path):
-             # Fallback or error if model doesn't exist. 
-             # For now, we log a warning but let YOLO handle the error or download if it was a standard model.
-             log.warning(f"Model not found at {self.model_path}. Please ensure 'best.pt' is in the 'model' folder.")
+    def __init__(self, model=None, preprocessor=None):
+        # Optional InputPreprocessor: decoded images are letterboxed into reused
+        # input tensors instead of ultralytics preprocessing each call from scratch
+        self.preprocessor = preprocessor
+        self.registry = None
+
+        # The API passes in the already-loaded model from ModelRegistry,
+        # so the weights are not re-read for every request.
+        if model is not None:
+            self.model = model
+            return
+
+        # On its own, the pipeline serves what `prediction` in config.yaml selects:
+        # model_path and backend (pytorch, a validated export, int8 or auto)
+        from Deep_learning_projects.config.configuration import ConfigurationManager
+        from Deep_learning_projects.components.model_registry import ModelRegistry
 
         try:
-            self.model = YOLO(self.model_path)
+            self.registry = ModelRegistry(config=ConfigurationManager().get_prediction_config())
+            self.model = self.registry.load()
         except Exception as e:
             log.exception(f"Error loading model: {e}")
             raise e
 
+    @property
+    def model_path(self) -> str:
+        return self.registry.stats.get("model_path") if self.registry is not None else None
+
     def predict(self, image_path):
         try:
             # Run inference
@@ -28,21 +43,81 @@ class PredictionPipeline:
             # Process results (example: returning list of dicts)
             predictions = []
             for result in results:
-                # result.boxes contains bounding boxes, confidence, class ids
-                for box in result.boxes:
-                    conf = float(box.conf[0])
-                    cls_id = int(box.cls[0])
-                    cls_name = self.model.names[cls_id]
-                    # xyxy coordinates
-                    coords = box.xyxy[0].tolist()
-                    
-                    predictions.append({
-                        "class_name": cls_name,
-                        "confidence": conf,
-                        "box": coords
-                    })
+                predictions.extend(to_rows(self._process_result(result), self.model.names))
             return predictions
 
         except Exception as e:
             log.exception(f"Prediction failed: {e}")
             return {"error": str(e)}
+
+    def clone(self):
+        """
+        Another pipeline sharing this one's weights but with its own predictor
+        state, since an ultralytics predictor must not be used by two threads at once.
+        """
+        model = copy.copy(self.model)
+        model.predictor = None
+        # Buffers are per pipeline: a batch tensor is in use until its results are read
+        preprocessor = self.preprocessor.fresh() if self.preprocessor is not None else None
+        return PredictionPipeline(model=model, preprocessor=preprocessor)
+
+    def predict_batch(self, sources: list) -> list:
+        """
+        Runs one batched forward pass over several images/paths and returns
+        one detections dict per source, in the same order.
+        Errors are raised (not returned) so the caller can fail the whole batch.
+        """
+        detections, timings = self.predict_batch_timed(sources)
+        observe_phases(timings)
+        return detections
+
+    def predict_batch_timed(self, sources: list) -> tuple:
+        """
+        predict_batch plus how long the batch spent in each model phase:
+        returns (detections, {"preprocess", "forward", "postprocess": seconds}).
+        """
+        if self.preprocessor is not None and InputPreprocessor.supports(sources):
+            return self._predict_preprocessed(sources)
+
+        results = self.model(sources, batch=len(sources), verbose=False)
+        start = time.perf_counter()
+        detections = [self._process_result(result) for result in results]
+        convert = time.perf_counter() - start
+        return detections, self._timings(results, convert)
+
+    def _predict_preprocessed(self, images: list) -> tuple:
+        start = time.perf_counter()
+        batch, transforms = self.preprocessor.prepare(images)
+        prepare = time.perf_counter() - start
+        try:
+            # A BCHW tensor in [0, 1] goes to the model as is
+            results = self.model(batch, verbose=False)
+            start = time.perf_counter()
+            detections = [
+                self.preprocessor.scale_back(self._process_result(result), transform, image.shape)
+                for result, transform, image in zip(results, transforms, images)
+            ]
+            convert = time.perf_counter() - start
+        finally:
+            self.preprocessor.release(batch)
+
+        timings = self._timings(results, convert)
+        timings["preprocess"] += prepare
+        return detections, timings
+
+    def _timings(self, results: list, convert: float) -> dict:
+        # ultralytics reports per-image milliseconds; scale back to the whole batch
+        speed = results[0].speed if results else {}
+        scale = len(results) / 1000
+        return {
+            "preprocess": (speed.get("preprocess") or 0.0) * scale,
+            "forward": (speed.get("inference") or 0.0) * scale,
+            "postprocess": (speed.get("postprocess") or 0.0) * scale + convert,
+        }
+
+    def _process_result(self, result) -> dict:
+        """
+        Converts a result's whole box tensors at once instead of looping per box.
+        See utils.prediction_format for turning it into a response.
+        """
+        return detections_from_result(result)
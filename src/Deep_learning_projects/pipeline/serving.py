@@ -0,0 +1,627 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, FastAPI, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from starlette.formparsers import MultiPartParser
+
+from Deep_learning_projects.utils import log
+from Deep_learning_projects.config.configuration import ConfigurationManager
+from Deep_learning_projects.components.inference_batcher import InferenceQueueFull, InferenceStopped
+from Deep_learning_projects.components.model_fleet import ModelCapacityError, ModelFleet, UnknownModel
+from Deep_learning_projects.components.prediction_cache import PredictionCache
+from Deep_learning_projects.components.tiled_inference import TiledInference
+from Deep_learning_projects.utils import startup
+from Deep_learning_projects.utils.common import get_rss_mb
+from Deep_learning_projects.utils.image_io import decode_image_for_model
+from Deep_learning_projects.utils.metrics import (IMAGE_DECODE_SECONDS, IMAGE_DECODED_BYTES, PREDICT_INFLIGHT,
+                                                 PREDICT_PHASE_SECONDS, PREDICT_REQUEST_SECONDS, REGISTRY, Gauge)
+from Deep_learning_projects.utils.prediction_format import (detections_nbytes, rescale_detections, to_columnar,
+                                                            to_float32, to_msgpack, to_rows)
+
+# Shared by app.py and app_train.py so both serve /predict the same way
+router = APIRouter()
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff")
+
+# Refreshed from the components' own stats on every /metrics scrape
+PROCESS_RSS = REGISTRY.register(Gauge("process_resident_memory_bytes", "Resident memory of the API process."))
+MODEL_LOAD_SECONDS = REGISTRY.register(Gauge(
+    "model_load_seconds", "Time taken to load each served model.", labelnames=("model",)
+))
+MODEL_WARMUP_SECONDS = REGISTRY.register(Gauge(
+    "model_warmup_seconds", "Time taken by each model's warm-up inferences.", labelnames=("model",)
+))
+MODEL_VERSION = REGISTRY.register(Gauge(
+    "model_version", "Version number of each active model (increments on reload).", labelnames=("model",)
+))
+MODEL_MEMORY = REGISTRY.register(Gauge(
+    "model_memory_bytes", "Memory attributed to each loaded model.", labelnames=("model",)
+))
+BATCHER_GAUGES = REGISTRY.register(Gauge(
+    "inference_batcher", "Inference batcher state (queue_depth, inflight_batches, batches_run, rejected).",
+    labelnames=("model", "field")
+))
+CACHE_GAUGES = REGISTRY.register(Gauge(
+    "prediction_cache", "Prediction cache counters (hits, misses, coalesced, evictions, bytes).",
+    labelnames=("field",)
+))
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Rejects oversized uploads to /predict* while the body is still streaming in,
+    instead of after the whole file has been buffered.
+    Limits come from `prediction.max_upload_mb` / `max_batch_upload_mb`
+    (set on app.state at startup); the longest matching path prefix wins.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        max_bytes = None
+        if scope["type"] == "http":
+            limits = getattr(scope["app"].state, "upload_limits", {})
+            for prefix in sorted(limits, key=len, reverse=True):
+                if scope["path"].startswith(prefix):
+                    max_bytes = limits[prefix]
+                    break
+        if max_bytes is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Cheap early reject when the client announces the size up front
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_bytes:
+            response = JSONResponse(content={"error": f"Upload exceeds {max_bytes} bytes"}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # FastAPI re-raises HTTPException from body parsing as-is
+                    raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def _load_serving_state(app: FastAPI, config):
+    """
+    Everything that needs the model: runs in the background after startup.
+    """
+    # Every served model (pipeline, worker pool, batcher) lives in a reloader,
+    # which can swap in new weights while the API keeps answering; the fleet
+    # loads and unloads the non-default ones on demand
+    fleet = ModelFleet(config=config)
+    await fleet.start()
+    app.state.models = fleet
+
+    # Repeated images (retries, re-polled stills) are answered from memory
+    app.state.prediction_cache = None
+    if config.cache_max_mb > 0:
+        app.state.prediction_cache = PredictionCache(
+            max_mb=config.cache_max_mb,
+            ttl_s=config.cache_ttl_s,
+            size_of=detections_nbytes
+        )
+
+    # Opt-in sliced inference for high-resolution frames, tiles of the model input size
+    app.state.tiler = TiledInference(
+        tile_size=config.params_image_size[0],
+        overlap=config.tile_overlap,
+        merge_threshold=config.tile_merge_threshold
+    )
+
+    # cv2.imdecode releases the GIL, so /predict/batch decodes on several threads
+    app.state.decode_executor = ThreadPoolExecutor(
+        max_workers=config.decode_workers or os.cpu_count(),
+        thread_name_prefix="decode"
+    )
+
+    def collect_metrics():
+        PROCESS_RSS.set(get_rss_mb() * 1024 * 1024)
+        for gauge in (MODEL_LOAD_SECONDS, MODEL_WARMUP_SECONDS, MODEL_VERSION, MODEL_MEMORY, BATCHER_GAUGES):
+            gauge.clear()
+        for name, reloader in list(fleet.reloaders.items()):
+            served = reloader.active
+            MODEL_LOAD_SECONDS.set(served.registry.stats.get("load_time_s", 0.0), model=name)
+            MODEL_WARMUP_SECONDS.set(served.registry.stats.get("warmup_time_s", 0.0), model=name)
+            MODEL_VERSION.set(served.version, model=name)
+            MODEL_MEMORY.set(fleet.memory_mb(name) * 1024 * 1024, model=name)
+            batching = served.batcher.stats()
+            for field in ("queue_depth", "inflight_batches", "batches_run", "rejected"):
+                BATCHER_GAUGES.set(batching[field], model=name, field=field)
+        cache = app.state.prediction_cache
+        if cache is not None:
+            cached = cache.stats()
+            for field in ("hits", "misses", "coalesced", "evictions", "bytes"):
+                CACHE_GAUGES.set(cached[field], field=field)
+
+    REGISTRY.set_collector("serving", collect_metrics)
+
+
+async def _load_in_background(app: FastAPI, config):
+    try:
+        await _load_serving_state(app, config)
+        app.state.ready = True
+        startup.mark("model_ready")
+        log.info(f"Model ready {startup.startup_report()['events']['model_ready']:.2f} s after process start")
+    except Exception as e:
+        app.state.startup_error = f"{type(e).__name__}: {e}"
+        log.exception(f"Model loading failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Starts accepting requests straight away and loads the model in the
+    background, so `/`, /health and /metrics answer during a cold start.
+    Model routes return 503 until /ready reports the model as loaded.
+    """
+    config = ConfigurationManager().get_prediction_config()
+
+    # Keep uploads up to the size limit in RAM: Starlette would otherwise
+    # spool anything over 1 MB to a temporary file on disk.
+    max_upload_bytes = int(config.max_upload_mb * 1024 * 1024)
+    MultiPartParser.spool_max_size = max_upload_bytes
+    app.state.upload_limits = {
+        "/predict": max_upload_bytes,
+        "/predict/batch": int(config.max_batch_upload_mb * 1024 * 1024),
+    }
+    # Large JPEGs are decoded at a reduced scale that still covers the model input
+    app.state.decode_target_size = config.params_image_size[0] if config.reduced_decode else 0
+
+    app.state.ready = False
+    app.state.startup_error = None
+    REGISTRY.set_collector("serving", lambda: PROCESS_RSS.set(get_rss_mb() * 1024 * 1024))
+    loader = asyncio.create_task(_load_in_background(app, config))
+    startup.mark("app_started")
+    yield
+
+    if not loader.done():
+        loader.cancel()
+    fleet = getattr(app.state, "models", None)
+    if fleet is not None:
+        await fleet.stop()
+    executor = getattr(app.state, "decode_executor", None)
+    if executor is not None:
+        executor.shutdown(wait=False)
+
+
+def require_model(request: Request):
+    """
+    Dependency of every route that needs the model: 503 + Retry-After while it loads.
+    """
+    if not getattr(request.app.state, "ready", False):
+        error = getattr(request.app.state, "startup_error", None)
+        raise HTTPException(
+            status_code=503,
+            detail=f"Model failed to load: {error}" if error else "Model is loading",
+            headers={"Retry-After": "5"}
+        )
+
+
+async def _served_model(request: Request, model: Optional[str]):
+    """
+    Active version of `model` (the default model when None), loaded on demand.
+    """
+    try:
+        reloader = await request.app.state.models.get(model)
+    except UnknownModel as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except ModelCapacityError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    return reloader.active
+
+
+def _loaded_reloader(request: Request, model: Optional[str]):
+    # For stats routes: never loads a model just to report on it
+    fleet = request.app.state.models
+    name = model or fleet.default
+    if name not in fleet.specs:
+        raise HTTPException(status_code=404, detail=f"Unknown model '{name}'")
+    return fleet.reloaders.get(name)
+
+
+def require_admin(request: Request):
+    """
+    Admin routes need the X-Admin-Token header matching ADMIN_TOKEN; without
+    ADMIN_TOKEN they are disabled, since a reload loads (unpickles) weights.
+    """
+    token = os.getenv("ADMIN_TOKEN")
+    if not token:
+        raise HTTPException(status_code=403, detail="Admin routes are disabled; set ADMIN_TOKEN to enable them")
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), token):
+        raise HTTPException(status_code=403, detail="Invalid or missing X-Admin-Token")
+
+
+def _render(detections: dict, filename: str, response_format: str, names: dict) -> Response:
+    """
+    json: one object per detection (default). columnar: parallel boxes/conf/cls
+    arrays plus the class-name table once. msgpack / f32: binary encodings for
+    high-volume clients (see utils.prediction_format for the layouts).
+    """
+    if response_format == "columnar":
+        return JSONResponse(content={"filename": filename, **to_columnar(detections, names)})
+    if response_format == "msgpack":
+        return Response(content=to_msgpack(detections, names, filename=filename), media_type="application/x-msgpack")
+    if response_format == "f32":
+        return Response(
+            content=to_float32(detections),
+            media_type="application/octet-stream",
+            headers={"X-Detections": str(len(detections["conf"])), "X-Columns": "x1,y1,x2,y2,conf,cls"}
+        )
+    return JSONResponse(content={"filename": filename, "predictions": to_rows(detections, names)})
+
+
+async def _predict_tiled(request: Request, served, image) -> tuple:
+    """
+    Cuts `image` into overlapping tiles, runs them as one batch and merges the
+    detections. Returns (detections, megapixels per second).
+    """
+    tiler = request.app.state.tiler
+    start = time.perf_counter()
+    buffer, offsets = tiler.cut(image)
+    try:
+        tile_detections = await served.batcher.run_batch(list(buffer))
+    finally:
+        tiler.release(buffer)
+    detections = tiler.merge(tile_detections, offsets)
+    rate = tiler.record(image, len(offsets), time.perf_counter() - start)
+    return detections, rate
+
+
+@router.post("/predict", dependencies=[Depends(require_model)])
+async def predict_route(
+    request: Request,
+    file: UploadFile = File(...),
+    response_format: Literal["json", "columnar", "msgpack", "f32"] = Query("json", alias="format"),
+    tiled: bool = Query(False, description="Sliced inference for high-resolution images"),
+    model: Optional[str] = Query(None, description="Model name from prediction.models (default model if omitted)")
+):
+    # Pinned for the whole request: a hot reload meanwhile does not change its model
+    served = await _served_model(request, model)
+    start = time.perf_counter()
+    status = "500"
+    PREDICT_INFLIGHT.inc()
+    try:
+        async with served.use():
+            # The upload is decoded straight from memory; nothing is written to disk,
+            # so concurrent uploads with the same filename cannot clash either.
+            # (Multipart parsing already happened; this times the read of the parsed file.)
+            with PREDICT_PHASE_SECONDS.time(phase="upload_read"):
+                data = await file.read()
+
+            def decode(data):
+                with PREDICT_PHASE_SECONDS.time(phase="decode"):
+                    # Tiles are cut from the full-resolution image
+                    return _decode(data, 0 if tiled else request.app.state.decode_target_size)
+
+            async def infer():
+                # preprocess / forward / postprocess are recorded by the model call itself
+                image, scale = await run_in_threadpool(decode, data)
+                if tiled:
+                    detections, _ = await _predict_tiled(request, served, image)
+                    return detections
+                return rescale_detections(await served.batcher.submit(image), scale)
+
+            try:
+                cache = request.app.state.prediction_cache
+                if cache is None:
+                    predictions = await infer()
+                else:
+                    content_hash = await run_in_threadpool(lambda: hashlib.sha256(data).hexdigest())
+                    key = cache.make_key(content_hash, served.weights_hash)
+                    if tiled:
+                        key += ":tiled"
+                    predictions = await cache.get_or_compute(key, infer)
+            except ValueError as e:
+                status = "400"
+                return JSONResponse(content={"error": str(e)}, status_code=400, headers=served.headers())
+            except InferenceQueueFull as e:
+                status = "503"
+                return JSONResponse(
+                    content={"error": str(e)},
+                    status_code=503,
+                    headers={"Retry-After": str(e.retry_after), **served.headers()}
+                )
+            except InferenceStopped as e:
+                # Its version was stopped mid-request; the retry goes to the current one
+                status = "503"
+                return JSONResponse(content={"error": str(e)}, status_code=503,
+                                    headers={"Retry-After": "1", **served.headers()})
+
+            with PREDICT_PHASE_SECONDS.time(phase="serialize"):
+                response = _render(predictions, file.filename, response_format, served.names)
+            # Which weights produced this answer (changes after a hot reload)
+            response.headers.update(served.headers())
+            status = "200"
+            return response
+
+    except Exception as e:
+        log.exception(e)
+        return JSONResponse(content={"error": str(e)}, status_code=500, headers=served.headers())
+    finally:
+        PREDICT_INFLIGHT.dec()
+        PREDICT_REQUEST_SECONDS.observe(time.perf_counter() - start, status=status)
+
+
+def _batch_items(files: List[UploadFile]) -> list:
+    """
+    Flattens the uploaded files (or a single zip) into (name, read_bytes) pairs.
+    Zip members are only read when their decode job runs.
+    """
+    if len(files) == 1 and zipfile.is_zipfile(files[0].file):
+        files[0].file.seek(0)
+        archive = zipfile.ZipFile(files[0].file)
+        names = [
+            info.filename for info in archive.infolist()
+            if not info.is_dir()
+            and not info.filename.startswith("__MACOSX/")
+            and info.filename.lower().endswith(IMAGE_EXTENSIONS)
+        ]
+        # ZipFile reads through a locked shared handle, so this is thread-safe
+        return [(name, lambda name=name: archive.read(name)) for name in names]
+
+    items = []
+    for upload in files:
+        upload.file.seek(0)
+        items.append((upload.filename, lambda upload=upload: upload.file.read()))
+    return items
+
+
+def _decode(data: bytes, target_size: int) -> tuple:
+    """
+    (image, scale) via decode_image_for_model, recording time and pixel bytes
+    per mode so reduced and full-size decodes can be compared.
+    """
+    start = time.perf_counter()
+    image, scale = decode_image_for_model(data, target_size)
+    mode = "full" if scale == 1.0 else "reduced"
+    IMAGE_DECODE_SECONDS.observe(time.perf_counter() - start, mode=mode)
+    IMAGE_DECODED_BYTES.inc(image.nbytes, mode=mode)
+    return image, scale
+
+
+def _read_and_decode(read_bytes, target_size: int):
+    try:
+        image, scale = _decode(read_bytes(), target_size)
+        return image, scale, None
+    except Exception as e:
+        return None, 1.0, str(e)
+
+
+@router.post("/predict/batch", dependencies=[Depends(require_model)])
+async def predict_batch_route(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    response_format: Literal["json", "columnar"] = Query("json", alias="format"),
+    model: Optional[str] = Query(None, description="Model name from prediction.models (default model if omitted)")
+):
+    """
+    Predicts many images (several files, or one zip archive) in one request.
+    Images are decoded in parallel and run through the model in batches of
+    `max_batch_size`; one NDJSON line per image is streamed back as soon as
+    its batch finishes.
+    """
+    try:
+        items = _batch_items(files)
+    except zipfile.BadZipFile as e:
+        return JSONResponse(content={"error": f"Invalid zip archive: {e}"}, status_code=400)
+
+    # The whole stream is served by the model that was active when it started
+    served = await _served_model(request, model)
+    batcher = served.batcher
+    executor = request.app.state.decode_executor
+    target_size = request.app.state.decode_target_size
+    batch_size = batcher.max_batch_size
+    names = served.names
+    encode = to_columnar if response_format == "columnar" else (
+        lambda detections, names: {"predictions": to_rows(detections, names)}
+    )
+    chunks = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+
+    # Pinned now rather than when streaming starts, so a reload in between cannot retire it.
+    # Released once, by whichever comes first: the end of the stream or the response's
+    # background task, which also runs when the client left before streaming started.
+    served.acquire()
+    released = False
+
+    async def release():
+        nonlocal released
+        if not released:
+            released = True
+            served.release()
+
+    async def stream():
+        try:
+            loop = asyncio.get_running_loop()
+
+            def schedule(chunk):
+                return [loop.run_in_executor(executor, _read_and_decode, read, target_size) for _, read in chunk]
+
+            # Decode the next batch while the current one is on the model
+            pending = schedule(chunks[0]) if chunks else []
+            for index, chunk in enumerate(chunks):
+                decoded = await asyncio.gather(*pending)
+                pending = schedule(chunks[index + 1]) if index + 1 < len(chunks) else []
+
+                lines = [None] * len(chunk)
+                images, scales, positions = [], [], []
+                for position, ((name, _), (image, scale, error)) in enumerate(zip(chunk, decoded)):
+                    if error is not None:
+                        lines[position] = {"filename": name, "error": error}
+                    else:
+                        images.append(image)
+                        scales.append(scale)
+                        positions.append(position)
+
+                if images:
+                    try:
+                        results = await batcher.run_batch(images)
+                        for position, scale, detections in zip(positions, scales, results):
+                            detections = rescale_detections(detections, scale)
+                            lines[position] = {"filename": chunk[position][0], **encode(detections, names)}
+                    except Exception as e:
+                        log.exception(f"Batch prediction failed: {e}")
+                        for position in positions:
+                            lines[position] = {"filename": chunk[position][0], "error": str(e)}
+
+                yield "".join(json.dumps(line) + "\n" for line in lines)
+        finally:
+            await release()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson", headers=served.headers(),
+                             background=BackgroundTask(release))
+
+
+@router.get("/health")
+async def health():
+    """
+    Liveness: answers as soon as the process is up, whether or not the model has loaded.
+    """
+    return JSONResponse(content={"status": "ok"})
+
+
+@router.get("/ready")
+async def ready(request: Request):
+    """
+    Readiness: 200 once the model is loaded and warmed up, 503 before that.
+    """
+    state = request.app.state
+    content = {"ready": getattr(state, "ready", False), "error": getattr(state, "startup_error", None)}
+    return JSONResponse(content=content, status_code=200 if content["ready"] else 503)
+
+
+@router.get("/stats/startup")
+async def startup_stats():
+    """
+    Time of each lazily imported heavy dependency and of the startup milestones.
+    """
+    return JSONResponse(content=startup.startup_report())
+
+
+@router.get("/metrics")
+async def metrics():
+    """
+    Per-phase latency histograms, in-flight requests, model load time and
+    process RSS in the Prometheus text format.
+    """
+    return PlainTextResponse(content=REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/models", dependencies=[Depends(require_model)])
+async def list_models(request: Request):
+    """
+    Declared models: loaded or not, memory use against their budget, idle time.
+    """
+    return JSONResponse(content=request.app.state.models.info())
+
+
+@router.get("/model/info", dependencies=[Depends(require_model)])
+async def model_info(request: Request, model: Optional[str] = Query(None)):
+    """
+    Load time and memory figures of a served model.
+    """
+    reloader = _loaded_reloader(request, model)
+    if reloader is None:
+        return JSONResponse(content={"model": model, "loaded": False})
+    return JSONResponse(content=reloader.active.info())
+
+
+@router.post("/admin/reload", dependencies=[Depends(require_model), Depends(require_admin)])
+async def reload_model(
+    request: Request,
+    path: Optional[str] = Query(None, description="Weights to load, inside the watch_path directory "
+                                                  "(default: watch_path)"),
+    model: Optional[str] = Query(None, description="Model to reload (default model if omitted)")
+):
+    """
+    Loads new weights in the background of live traffic, warms them up and
+    swaps them in; requests already running finish on the previous model.
+    """
+    try:
+        reloader = await request.app.state.models.get(model)
+        result = await reloader.reload(path)
+    except PermissionError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=403)
+    except (FileNotFoundError, UnknownModel) as e:
+        return JSONResponse(content={"error": str(e)}, status_code=404)
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+    return JSONResponse(content=result)
+
+
+@router.post("/admin/unload", dependencies=[Depends(require_model), Depends(require_admin)])
+async def unload_model(request: Request, model: str = Query(...)):
+    """
+    Frees a non-default model once its running requests finish (up to
+    drain_timeout_s); it is loaded again on its next request.
+    """
+    fleet = request.app.state.models
+    if model == fleet.default:
+        return JSONResponse(content={"error": "The default model cannot be unloaded"}, status_code=400)
+    _loaded_reloader(request, model)
+    await fleet.unload(model, reason="admin request")
+    return JSONResponse(content=fleet.info())
+
+
+@router.get("/admin/model", dependencies=[Depends(require_model), Depends(require_admin)])
+async def reload_status(request: Request, model: Optional[str] = Query(None)):
+    """
+    Active model version and hash, reload status and recent swaps.
+    """
+    reloader = _loaded_reloader(request, model)
+    return JSONResponse(content=reloader.info() if reloader is not None else {"loaded": False})
+
+
+@router.get("/stats/batching", dependencies=[Depends(require_model)])
+async def batching_stats(request: Request, model: Optional[str] = Query(None)):
+    """
+    Batch-size histogram and queue-wait times of a model's inference batcher.
+    """
+    reloader = _loaded_reloader(request, model)
+    return JSONResponse(content=reloader.active.batcher.stats() if reloader is not None else {"loaded": False})
+
+
+@router.get("/stats/workers", dependencies=[Depends(require_model)])
+async def worker_stats(request: Request, model: Optional[str] = Query(None)):
+    """
+    Per-worker load, liveness and restart counts of a model's inference pool.
+    """
+    reloader = _loaded_reloader(request, model)
+    pool = reloader.active.pool if reloader is not None else None
+    return JSONResponse(content=pool.stats() if pool is not None else {"num_workers": 0})
+
+
+@router.get("/stats/cache", dependencies=[Depends(require_model)])
+async def cache_stats(request: Request):
+    """
+    Hit/miss counters and memory use of the prediction cache.
+    """
+    cache = request.app.state.prediction_cache
+    return JSONResponse(content=cache.stats() if cache is not None else {"enabled": False})
+
+
+@router.get("/stats/tiled", dependencies=[Depends(require_model)])
+async def tiled_stats(request: Request):
+    """
+    Tile counts and megapixels/s of tiled (?tiled=true) predictions.
+    """
+    return JSONResponse(content=request.app.state.tiler.stats())
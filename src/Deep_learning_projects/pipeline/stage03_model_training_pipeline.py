@@ -4,7 +4,6 @@ from Deep_learning_projects.utils import log
 import os
 from dotenv import load_dotenv, find_dotenv
 
-load_dotenv(find_dotenv(), override=True)
 STAGE_NAME = "Training"
 
 
@@ -15,7 +14,9 @@ class ModelTrainingPipeline:
     def main(self):
         config = ConfigurationManager()
         training_config = config.get_training_config()
-        training = Training(config=training_config)
+        cache_config = config.get_dataset_cache_config()
+        label_config = config.get_label_index_config()
+        training = Training(config=training_config, cache_config=cache_config, label_config=label_config)
         training.get_base_model()
         training.train()
 
@@ -24,7 +25,8 @@ if __name__ == '__main__':
     try:
         log.info(f"*******************")
         log.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
-        
+        load_dotenv(find_dotenv(), override=True)
+
         # Debug Check for DVC
         if not os.getenv("MLFLOW_TRACKING_PASSWORD"):
             log.warning("DVC Warning: MLFLOW_TRACKING_PASSWORD not found in environment!")
@@ -12,7 +12,8 @@ class EvaluationPipeline:
     def main(self):
         config = ConfigurationManager()
         eval_config = config.get_evaluation_config()
-        evaluation = Evaluation(config=eval_config)
+        cache_config = config.get_dataset_cache_config()
+        evaluation = Evaluation(config=eval_config, cache_config=cache_config)
         
         # This function now does two things:
         # 1. Calculates the YOLO metrics (mAP, Precision, Recall)
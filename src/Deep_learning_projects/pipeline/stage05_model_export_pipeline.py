@@ -0,0 +1,33 @@
+from Deep_learning_projects.config.configuration import ConfigurationManager
+from Deep_learning_projects.components.model_export import ModelExport
+from Deep_learning_projects.utils import log
+
+STAGE_NAME = "Model export stage"
+
+
+class ModelExportPipeline:
+    def __init__(self):
+        pass
+
+    def main(self):
+        config = ConfigurationManager()
+        model_export_config = config.get_model_export_config()
+        model_export = ModelExport(config=model_export_config)
+
+        # 1. Export best.pt to the CPU formats listed in config.yaml
+        exported = model_export.export()
+
+        # 2. Check each backend against PyTorch, benchmark it and pick the fastest
+        model_export.validate_and_benchmark(exported)
+
+
+if __name__ == '__main__':
+    try:
+        log.info("*******************")
+        log.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+        obj = ModelExportPipeline()
+        obj.main()
+        log.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+    except Exception as e:
+        log.exception(e)
+        raise e
@@ -0,0 +1,34 @@
+from Deep_learning_projects.config.configuration import ConfigurationManager
+from Deep_learning_projects.components.model_quantization import ModelQuantization
+from Deep_learning_projects.utils import log
+
+STAGE_NAME = "Model quantization stage"
+
+
+class ModelQuantizationPipeline:
+    def __init__(self):
+        pass
+
+    def main(self):
+        config = ConfigurationManager()
+        model_quantization_config = config.get_model_quantization_config()
+        cache_config = config.get_dataset_cache_config()
+        model_quantization = ModelQuantization(config=model_quantization_config, cache_config=cache_config)
+
+        # 1. INT8 post-training quantisation, calibrated on the val split
+        model_quantization.quantize()
+
+        # 2. Score FP32 and INT8 the same way; promote only within the mAP budget
+        model_quantization.gate_and_save()
+
+
+if __name__ == '__main__':
+    try:
+        log.info("*******************")
+        log.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+        obj = ModelQuantizationPipeline()
+        obj.main()
+        log.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+    except Exception as e:
+        log.exception(e)
+        raise e
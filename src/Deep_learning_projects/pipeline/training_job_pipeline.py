@@ -0,0 +1,41 @@
+from Deep_learning_projects.utils import log
+from Deep_learning_projects.pipeline.stage01_data_ingestion_pipeline import DataIngestionTrainingPipeline
+from Deep_learning_projects.pipeline.stage02_prepare_base_model import PrepareBaseModelTrainingPipeline
+from Deep_learning_projects.pipeline.stage03_model_training_pipeline import ModelTrainingPipeline
+
+STAGE_NAME = "Training job"
+
+
+class TrainingJobPipeline:
+    """
+    The stages a /train/start job runs, in the job's own process
+    (see TrainingJobManager). A failing stage ends the process with a
+    non-zero exit code, which marks the job as failed.
+    """
+    def __init__(self):
+        pass
+
+    def main(self):
+        # 1. Data Ingestion (skips files that are already current)
+        log.info(">> Stage 1: Data Ingestion")
+        DataIngestionTrainingPipeline().main()
+
+        # 2. Prepare Base Model (Crucial if model_name changed)
+        log.info(">> Stage 2: Prepare Base Model")
+        PrepareBaseModelTrainingPipeline().main()
+
+        # 3. Training (resumes from last.pt after an interrupted job)
+        log.info(">> Stage 3: Training")
+        ModelTrainingPipeline().main()
+
+
+if __name__ == '__main__':
+    try:
+        log.info("*******************")
+        log.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+        obj = TrainingJobPipeline()
+        obj.main()
+        log.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+    except Exception as e:
+        log.exception(e)
+        raise e
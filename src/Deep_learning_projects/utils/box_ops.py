@@ -0,0 +1,80 @@
+import numpy as np
+
+
+def box_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """pairwise IoU of two sets of xyxy boxes
+
+    Args:
+        boxes_a (np.ndarray): N x 4 xyxy
+        boxes_b (np.ndarray): M x 4 xyxy
+
+    Returns:
+        np.ndarray: N x M IoU matrix
+    """
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.clip(bottom_right - top_left, 0, None).prod(axis=2)
+
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return intersection / np.maximum(union, 1e-9)
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, threshold: float, metric: str = "iou") -> np.ndarray:
+    """greedy non-maximum suppression on whole arrays
+
+    Args:
+        boxes (np.ndarray): N x 4 xyxy
+        scores (np.ndarray): N confidences
+        threshold (float): overlap above which the lower-scoring box is dropped
+        metric (str, optional): "iou", or "ios" (intersection over the smaller
+            box), which also removes fragments of an object cut by a tile edge.
+            Defaults to "iou".
+
+    Returns:
+        np.ndarray: indices of the kept boxes, highest score first
+    """
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    order = np.argsort(-np.asarray(scores))
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+
+    keep = []
+    while order.size:
+        best, rest = order[0], order[1:]
+        keep.append(best)
+        if not rest.size:
+            break
+        top_left = np.maximum(boxes[best, :2], boxes[rest, :2])
+        bottom_right = np.minimum(boxes[best, 2:], boxes[rest, 2:])
+        intersection = np.clip(bottom_right - top_left, 0, None).prod(axis=1)
+        if metric == "ios":
+            overlap = intersection / np.maximum(np.minimum(areas[best], areas[rest]), 1e-9)
+        else:
+            overlap = intersection / np.maximum(areas[best] + areas[rest] - intersection, 1e-9)
+        order = rest[overlap <= threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def batched_nms(boxes: np.ndarray, scores: np.ndarray, classes: np.ndarray,
+                threshold: float, metric: str = "iou") -> np.ndarray:
+    """class-aware NMS: boxes of different classes never suppress each other
+
+    Args:
+        boxes (np.ndarray): N x 4 xyxy
+        scores (np.ndarray): N confidences
+        classes (np.ndarray): N class ids
+        threshold (float): overlap threshold
+        metric (str, optional): "iou" or "ios". Defaults to "iou".
+
+    Returns:
+        np.ndarray: indices of the kept boxes
+    """
+    if len(boxes) == 0:
+        return np.zeros((0,), dtype=np.int64)
+    # Shift each class into its own coordinate range so one NMS pass handles all
+    shift = (np.asarray(classes, dtype=np.float32) * (float(boxes.max()) + 1))[:, None]
+    return nms(boxes + shift, scores, threshold, metric)
@@ -9,6 +9,7 @@ from box import ConfigBox
 from pathlib import Path
 from typing import Any
 import base64
+import hashlib
 
 
 
@@ -137,6 +138,54 @@ def get_size(path: Path) -> str:
     return f"~ {size_in_kb} KB"
 
 
+@ensure_annotations
+def get_file_hash(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """sha256 of a file, read in chunks
+
+    Args:
+        path (Path): path of the file
+        chunk_size (int, optional): bytes read per step. Defaults to 1 MB.
+
+    Returns:
+        str: hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_peak_rss_mb() -> float:
+    """get the peak resident memory of the current process in MB
+
+    Returns:
+        float: peak RSS in MB (0.0 where the platform does not report it)
+    """
+    import sys
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KB everywhere else
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def get_rss_mb() -> float:
+    """get resident memory of the current process in MB
+
+    Returns:
+        float: resident set size in MB (peak RSS where /proc is unavailable)
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return get_peak_rss_mb()
+
+
 def decodeImage(imgstring, fileName):
     imgdata = base64.b64decode(imgstring)
     with open(fileName, 'wb') as f:
@@ -0,0 +1,108 @@
+import cv2
+import numpy as np
+
+
+def decode_image_bytes(data: bytes) -> np.ndarray:
+    """decode an encoded image (jpg, png, ...) held in memory
+
+    Args:
+        data (bytes): raw file content, e.g. the body of an upload
+
+    Raises:
+        ValueError: if the bytes are not a decodable image
+
+    Returns:
+        np.ndarray: HxWx3 BGR uint8 array, the layout YOLO expects for arrays
+    """
+    if not data:
+        raise ValueError("Empty image payload")
+
+    # np.frombuffer wraps the bytes without copying them
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Could not decode image: unsupported or corrupt file")
+    return image
+
+
+JPEG_SIGNATURE = b"\xff\xd8\xff"
+
+# Largest reduction first: libjpeg scales these in the DCT, before pixels exist
+_REDUCED_DECODES = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+# Start-of-frame markers (baseline, progressive, ...); C4/C8/CC are other segments
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def jpeg_dimensions(data: bytes):
+    """read a JPEG's size from its frame header without decoding it
+
+    Args:
+        data (bytes): raw file content
+
+    Returns:
+        tuple: (height, width), or None if `data` is not a JPEG with a readable header
+    """
+    if data[:3] != JPEG_SIGNATURE:
+        return None
+    position, end = 2, len(data)
+    while position + 4 <= end:
+        if data[position] != 0xFF:
+            return None
+        marker = data[position + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            position += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            # Markers without a length field
+            position += 2
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            if position + 9 > end:
+                return None
+            height = int.from_bytes(data[position + 5:position + 7], "big")
+            width = int.from_bytes(data[position + 7:position + 9], "big")
+            return (height, width) if height and width else None
+        if marker == 0xDA:
+            # Image data started without a frame header
+            return None
+        position += 2 + int.from_bytes(data[position + 2:position + 4], "big")
+    return None
+
+
+def decode_image_for_model(data: bytes, target_size: int) -> tuple:
+    """decode an image at no more resolution than the model input needs
+
+    JPEGs whose long side is at least twice `target_size` are decoded by libjpeg
+    at 1/2, 1/4 or 1/8 scale, the strongest reduction that still leaves the long
+    side >= `target_size`, so the full-resolution pixels are never allocated.
+    Other formats and small JPEGs get a normal decode.
+
+    Args:
+        data (bytes): raw file content, e.g. the body of an upload
+        target_size (int): model input size (the letterbox long side), e.g. 640
+
+    Raises:
+        ValueError: if the bytes are not a decodable image
+
+    Returns:
+        tuple: (image, scale) where multiplying image coordinates by `scale`
+            gives original-image coordinates (1.0 for a full decode)
+    """
+    dimensions = jpeg_dimensions(data) if target_size > 0 else None
+    if dimensions is None:
+        return decode_image_bytes(data), 1.0
+
+    long_side = max(dimensions)
+    for factor, flag in _REDUCED_DECODES:
+        if long_side / factor >= target_size:
+            image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flag)
+            if image is None:
+                raise ValueError("Could not decode image: unsupported or corrupt file")
+            # From the long sides, which EXIF rotation swaps together with the image
+            return image, long_side / max(image.shape[:2])
+    return decode_image_bytes(data), 1.0
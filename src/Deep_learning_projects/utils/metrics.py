@@ -0,0 +1,180 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Seconds; spans sub-millisecond decode up to multi-second tiled inference
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labelnames: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def clear(self):
+        # Drops every labelled series, e.g. of models that were unloaded
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    """
+    Fixed-bucket histogram: an observation is one bisect and two additions.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [bucket counts..., +Inf count], sum
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> list:
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._series.items()]
+        lines = self.header()
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = {}
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def set_collector(self, name: str, collector):
+        """
+        `collector()` runs at scrape time, e.g. to refresh gauges from component stats.
+        Setting the same name again replaces it (an app restarted in one process).
+        """
+        self._collectors[name] = collector
+
+    def render(self) -> str:
+        """
+        All metrics in the Prometheus text exposition format (version 0.0.4).
+        """
+        for collector in list(self._collectors.values()):
+            collector()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+PREDICT_PHASE_SECONDS = REGISTRY.register(Histogram(
+    "predict_phase_seconds",
+    "Time spent per prediction phase (upload_read, decode, preprocess, forward, postprocess, serialize).",
+    labelnames=("phase",)
+))
+PREDICT_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "predict_request_seconds",
+    "End-to-end /predict handler time.",
+    labelnames=("status",)
+))
+PREDICT_INFLIGHT = REGISTRY.register(Gauge(
+    "predict_inflight_requests",
+    "Prediction requests currently being handled."
+))
+IMAGE_DECODE_SECONDS = REGISTRY.register(Histogram(
+    "image_decode_seconds",
+    "Image decode time by mode (reduced: JPEG decoded at 1/2-1/8 scale, full: full resolution).",
+    labelnames=("mode",)
+))
+IMAGE_DECODED_BYTES = REGISTRY.register(Counter(
+    "image_decoded_bytes_total",
+    "Bytes of decoded pixel arrays allocated, by decode mode.",
+    labelnames=("mode",)
+))
+
+TRAINING_JOBS = REGISTRY.register(Gauge(
+    "training_jobs",
+    "Training jobs known to the job manager, by status.",
+    labelnames=("status",)
+))
+
+
+def observe_phases(timings: dict):
+    """
+    Records {phase: seconds} into predict_phase_seconds.
+    """
+    for phase, seconds in timings.items():
+        PREDICT_PHASE_SECONDS.observe(seconds, phase=phase)
@@ -0,0 +1,138 @@
+import numpy as np
+
+# msgpack is optional: only high-volume clients asking for it need it installed
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+RESPONSE_FORMATS = ("json", "columnar", "msgpack", "f32")
+
+
+def empty_detections() -> dict:
+    return {
+        "boxes": np.zeros((0, 4), dtype=np.float32),
+        "conf": np.zeros((0,), dtype=np.float32),
+        "cls": np.zeros((0,), dtype=np.int32),
+    }
+
+
+def detections_from_result(result) -> dict:
+    """convert an ultralytics Results object's box tensors in one step
+
+    Args:
+        result: one item of the list a YOLO model call returns
+
+    Returns:
+        dict: {"boxes": N x 4 xyxy float32, "conf": N float32, "cls": N int32}
+    """
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return empty_detections()
+    return {
+        "boxes": boxes.xyxy.cpu().numpy().astype(np.float32, copy=False),
+        "conf": boxes.conf.cpu().numpy().astype(np.float32, copy=False),
+        "cls": boxes.cls.cpu().numpy().astype(np.int32),
+    }
+
+
+def to_rows(detections: dict, names: dict) -> list:
+    """one dict per detection (the original /predict response shape)
+
+    Args:
+        detections (dict): "boxes" (N x 4 xyxy), "conf" (N), "cls" (N) arrays
+        names (dict): class id -> class name
+
+    Returns:
+        list: [{"class_name", "confidence", "box"}, ...]
+    """
+    # tolist() converts each whole array in C instead of per element
+    return [
+        {"class_name": names[cls_id], "confidence": conf, "box": box}
+        for cls_id, conf, box in zip(
+            detections["cls"].tolist(),
+            detections["conf"].tolist(),
+            detections["boxes"].tolist()
+        )
+    ]
+
+
+def to_columnar(detections: dict, names: dict) -> dict:
+    """parallel arrays instead of one object per detection
+
+    Args:
+        detections (dict): "boxes" (N x 4 xyxy), "conf" (N), "cls" (N) arrays
+        names (dict): class id -> class name, sent once per response
+
+    Returns:
+        dict: {"boxes": N x 4, "conf": N, "cls": N, "names": {id: name}}
+    """
+    return {
+        "boxes": detections["boxes"].tolist(),
+        "conf": detections["conf"].tolist(),
+        "cls": detections["cls"].tolist(),
+        "names": {str(k): v for k, v in names.items()},
+    }
+
+
+def to_float32(detections: dict) -> bytes:
+    """raw little-endian float32 matrix, N rows of [x1, y1, x2, y2, conf, cls]
+
+    Args:
+        detections (dict): "boxes", "conf", "cls" arrays
+
+    Returns:
+        bytes: N * 6 * 4 bytes
+    """
+    matrix = np.empty((len(detections["conf"]), 6), dtype="<f4")
+    matrix[:, :4] = detections["boxes"]
+    matrix[:, 4] = detections["conf"]
+    matrix[:, 5] = detections["cls"]
+    return matrix.tobytes()
+
+
+def to_msgpack(detections: dict, names: dict, **extra) -> bytes:
+    """msgpack document with the arrays as raw little-endian bytes
+
+    Args:
+        detections (dict): "boxes", "conf", "cls" arrays
+        names (dict): class id -> class name
+        **extra: additional top-level fields (e.g. filename)
+
+    Raises:
+        RuntimeError: if msgpack is not installed
+
+    Returns:
+        bytes: {"n", "boxes" (<f4, N x 4), "conf" (<f4), "cls" (<i4), "names", ...}
+    """
+    if msgpack is None:
+        raise RuntimeError("msgpack is not installed; run `pip install msgpack` to use format=msgpack")
+    return msgpack.packb({
+        **extra,
+        "n": int(len(detections["conf"])),
+        "boxes": np.ascontiguousarray(detections["boxes"], dtype="<f4").tobytes(),
+        "conf": np.ascontiguousarray(detections["conf"], dtype="<f4").tobytes(),
+        "cls": np.ascontiguousarray(detections["cls"], dtype="<i4").tobytes(),
+        "names": {str(k): v for k, v in names.items()},
+    })
+
+
+def detections_nbytes(detections: dict) -> int:
+    """memory held by one detections dict, used for cache accounting"""
+    # ~112 bytes of ndarray object header on top of each array's data
+    return sum(array.nbytes + 112 for array in detections.values())
+
+
+def rescale_detections(detections: dict, scale: float) -> dict:
+    """map boxes found on a downscaled decode back to original-image pixels
+
+    Args:
+        detections (dict): "boxes", "conf", "cls" arrays
+        scale (float): original size / decoded size
+
+    Returns:
+        dict: the same detections with boxes multiplied by `scale`
+    """
+    if scale == 1.0 or not len(detections["boxes"]):
+        return detections
+    return {**detections, "boxes": detections["boxes"] * np.float32(scale)}
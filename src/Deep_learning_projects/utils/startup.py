@@ -0,0 +1,56 @@
+import importlib
+import sys
+import threading
+import time
+from Deep_learning_projects.utils import log
+
+# Close enough to interpreter start: the package logger is imported first thing
+PROCESS_START = time.perf_counter()
+
+_import_times = {}
+_events = {}
+_lock = threading.Lock()
+
+
+def lazy_import(name: str):
+    """import a heavy module on first use and record how long it took
+
+    Args:
+        name (str): module name, e.g. "ultralytics" or "mlflow.pytorch"
+
+    Returns:
+        module: the imported module (cached by Python after the first call)
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    seconds = time.perf_counter() - start
+    with _lock:
+        _import_times.setdefault(name, round(seconds, 4))
+    log.info(f"Imported {name} in {seconds:.2f} s")
+    return module
+
+
+def mark(event: str):
+    """record when a startup milestone was reached, in seconds since process start
+
+    Args:
+        event (str): e.g. "app_started", "model_ready"
+    """
+    with _lock:
+        _events[event] = round(time.perf_counter() - PROCESS_START, 4)
+
+
+def startup_report() -> dict:
+    """time of every lazy import and startup milestone so far
+
+    Returns:
+        dict: {"imports": {module: seconds}, "events": {event: seconds since start}}
+    """
+    with _lock:
+        return {
+            "imports": dict(sorted(_import_times.items(), key=lambda item: -item[1])),
+            "events": dict(_events),
+        }
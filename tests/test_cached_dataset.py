@@ -0,0 +1,51 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("ultralytics")
+yaml = pytest.importorskip("yaml")
+
+from ultralytics.cfg import get_cfg
+from ultralytics.data import build_yolo_dataset
+from ultralytics.utils import DEFAULT_CFG
+from Deep_learning_projects.components.cached_dataset import CachedYOLODataset, with_image_cache
+from Deep_learning_projects.components.dataset_cache import DatasetCache
+from Deep_learning_projects.entity.config_entity import DatasetCacheConfig
+
+IMAGE_SIZE = 64
+
+
+@pytest.fixture
+def dataset_yaml(tmp_path):
+    rng = np.random.default_rng(0)
+    for split in ("train", "val"):
+        (tmp_path / split / "images").mkdir(parents=True)
+        (tmp_path / split / "labels").mkdir(parents=True)
+        for i in range(6):
+            image = rng.integers(0, 255, size=(48 + 8 * i, 80, 3), dtype=np.uint8)
+            cv2.imwrite(str(tmp_path / split / "images" / f"{i}.jpg"), image)
+            (tmp_path / split / "labels" / f"{i}.txt").write_text(f"{i % 2} 0.5 0.5 0.3 0.4\n")
+    path = tmp_path / "data.yaml"
+    path.write_text(yaml.safe_dump({"path": str(tmp_path), "train": "train/images", "val": "val/images",
+                                    "nc": 2, "names": ["a", "b"]}))
+    return path
+
+
+def test_mosaic_draws_from_the_buffer_of_a_cached_dataset(tmp_path, dataset_yaml):
+    cache_dir = DatasetCache(DatasetCacheConfig(
+        root_dir=tmp_path / "cache", training_data=dataset_yaml, enabled=True, num_workers=1, keep_caches=1,
+        params_image_size=[IMAGE_SIZE, IMAGE_SIZE, 3]
+    )).build()
+
+    cfg = get_cfg(DEFAULT_CFG, {"imgsz": IMAGE_SIZE, "mosaic": 1.0, "cache": False, "workers": 0})
+    data = {"path": str(dataset_yaml.parent), "nc": 2, "names": {0: "a", 1: "b"}, "channels": 3}
+    dataset = build_yolo_dataset(cfg, str(dataset_yaml.parent / "train" / "images"), 2, data, mode="train")
+    dataset = with_image_cache(dataset, cache_dir)
+    assert isinstance(dataset, CachedYOLODataset)
+
+    # Every sample goes through Mosaic, which picks its other three images from dataset.buffer
+    for i in range(len(dataset)):
+        sample = dataset[i]
+        assert sample["img"].shape[-2:] == (IMAGE_SIZE, IMAGE_SIZE)
+    assert 0 < len(dataset.buffer) <= dataset.max_buffer_length
+    assert all(dataset.ims[j] is not None for j in dataset.buffer)
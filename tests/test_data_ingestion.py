@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import threading
+import pytest
+
+# utils.common needs python-box, ensure and joblib
+pytest.importorskip("box")
+pytest.importorskip("ensure")
+pytest.importorskip("joblib")
+
+from Deep_learning_projects.components import data_ingestion
+from Deep_learning_projects.components.data_ingestion import DataIngestion
+from Deep_learning_projects.components.data_sources import LocalSource
+from Deep_learning_projects.entity.config_entity import DataIngestionConfig
+
+SIZE = 1024 * 1024
+CHUNK = 64 * 1024
+
+
+class FlakyLocalSource(LocalSource):
+    """
+    LocalSource that counts the bytes it serves and, with `fail_after`, drops
+    every read after that many bytes, like a connection reset mid-download.
+    """
+    def __init__(self, fail_after: int = None):
+        self.fail_after = fail_after
+        self.served = 0
+        self._lock = threading.Lock()
+
+    def read_range(self, file, start, end=None, chunk_size=1024 * 1024):
+        sent = 0
+        for chunk in super().read_range(file, start, end, chunk_size):
+            if self.fail_after is not None and sent >= self.fail_after:
+                raise ConnectionError("connection reset")
+            sent += len(chunk)
+            with self._lock:
+                self.served += len(chunk)
+            yield chunk
+
+
+@pytest.fixture
+def remote(tmp_path):
+    data = os.urandom(SIZE)
+    path = tmp_path / "remote" / "data.bin"
+    path.parent.mkdir()
+    path.write_bytes(data)
+    return path, data
+
+
+def ingestion_config(tmp_path, remote_path, data) -> DataIngestionConfig:
+    root = tmp_path / "data_ingestion"
+    return DataIngestionConfig(
+        root_dir=root,
+        source_URL=str(remote_path),
+        local_data_file=root / "data.bin",
+        unzip_dir=root / "data",
+        checksum_manifest="",
+        sha256=hashlib.sha256(data).hexdigest(),
+        download_workers=2,
+        chunk_mb=CHUNK / 1024 ** 2,
+        min_parallel_mb=0,
+        extract_workers=1,
+    )
+
+
+def test_interrupted_download_resumes_where_it_stopped(tmp_path, remote, monkeypatch):
+    monkeypatch.setattr(data_ingestion, "SEGMENT_RETRIES", 1)
+    remote_path, data = remote
+    config = ingestion_config(tmp_path, remote_path, data)
+
+    with pytest.raises(ConnectionError):
+        DataIngestion(config, source=FlakyLocalSource(fail_after=4 * CHUNK)).download_file()
+    part = config.local_data_file.with_name("data.bin.part")
+    with open(str(part) + ".json", "r") as f:
+        done = sum(segment[2] for segment in json.load(f)["segments"])
+    assert 0 < done < SIZE
+    assert not config.local_data_file.exists()
+
+    source = FlakyLocalSource()
+    DataIngestion(config, source=source).download_file()
+    assert source.served == SIZE - done
+    assert config.local_data_file.read_bytes() == data
+    assert not part.exists()
+
+    # Unchanged source: nothing is fetched again
+    source = FlakyLocalSource()
+    DataIngestion(config, source=source).download_file()
+    assert source.served == 0
+
+
+def test_changed_source_restarts_the_partial_download(tmp_path, remote, monkeypatch):
+    monkeypatch.setattr(data_ingestion, "SEGMENT_RETRIES", 1)
+    remote_path, data = remote
+    config = ingestion_config(tmp_path, remote_path, data)
+
+    with pytest.raises(ConnectionError):
+        DataIngestion(config, source=FlakyLocalSource(fail_after=4 * CHUNK)).download_file()
+
+    # New content (and mtime): the saved segments no longer apply
+    data = os.urandom(SIZE)
+    remote_path.write_bytes(data)
+    stat = os.stat(remote_path)
+    os.utime(remote_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    config = ingestion_config(tmp_path, remote_path, data)
+    source = FlakyLocalSource()
+    DataIngestion(config, source=source).download_file()
+    assert source.served == SIZE
+    assert config.local_data_file.read_bytes() == data
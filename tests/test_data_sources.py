@@ -0,0 +1,26 @@
+import pytest
+from Deep_learning_projects.components.data_sources import LocalSource, manifest_name, parse_manifest
+
+DIGEST = "0" * 64
+
+
+def test_sha256sum_manifest_lists_files_next_to_it(tmp_path):
+    manifest = tmp_path / "SHA256SUMS"
+    files = parse_manifest(f"{DIGEST}  data.zip\n{DIGEST} *extra/labels.zip\n", str(manifest), LocalSource())
+    assert [file.name for file in files] == ["data.zip", "extra/labels.zip"]
+    assert files[1].url == str(tmp_path / "extra" / "labels.zip")
+
+
+@pytest.mark.parametrize("name", ["../../x.zip", "a/../../x.zip", "/etc/passwd", "\\\\server\\share\\x.zip",
+                                  "C:\\data\\x.zip", "c:x.zip", "..", "./"])
+def test_names_leaving_the_data_directory_are_rejected(name):
+    with pytest.raises(ValueError):
+        manifest_name(name)
+    with pytest.raises(ValueError):
+        parse_manifest(f'{{"files": [{{"name": "{name.replace(chr(92), chr(92) * 2)}", "sha256": "{DIGEST}"}}]}}',
+                       "https://example.com/manifest.json", LocalSource())
+
+
+def test_harmless_names_are_normalised():
+    assert manifest_name("./images//train.zip") == "images/train.zip"
+    assert manifest_name("a\\b.zip") == "a/b.zip"
@@ -0,0 +1,119 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+pytest.importorskip("yaml")
+pytest.importorskip("box")
+
+from Deep_learning_projects.components.hyperparameter_search import HyperparameterSearch, asha_rungs
+
+
+def search(tmp_path, **overrides) -> HyperparameterSearch:
+    config = dict(
+        root_dir=tmp_path / "sweep",
+        db_path=tmp_path / "sweep" / "trials.sqlite",
+        training_data=tmp_path / "data.yaml",
+        base_model_path=tmp_path / "yolov8n.pt",
+        search_space={"IMAGE_SIZE": [320], "LEARNING_RATE": {"low": 0.001, "high": 0.01, "log": True}},
+        min_epochs=1,
+        max_epochs=4,
+        num_trials=4,
+        parallel_trials=2,
+        cpu_cores=0,
+        reduction_factor=2,
+        seed=0,
+    )
+    config.update(overrides)
+    return HyperparameterSearch(SimpleNamespace(**config))
+
+
+def start(sweep: HyperparameterSearch, db):
+    # What _launch records, without starting a training process
+    job = sweep._next_job(db)
+    if job is not None:
+        db.execute("UPDATE trials SET status = 'running' WHERE trial_id = ?", (job["trial_id"],))
+    return job
+
+
+def finish(sweep: HyperparameterSearch, db, job: dict, metric: float):
+    run_dir = Path(job["run_dir"])
+    run_dir.mkdir(parents=True, exist_ok=True)
+    Path(job["result_path"]).write_text(json.dumps({
+        "metric": metric, "seconds": 1.0,
+        "weights": str(run_dir / "last.pt"), "best_weights": str(run_dir / "best.pt"),
+    }))
+    sweep._finish(db, {"job": job, "process": SimpleNamespace(returncode=0), "log_file": open(job["log_path"], "a")})
+
+
+def test_rungs_grow_by_the_reduction_factor_and_end_at_max_epochs():
+    assert asha_rungs(3, 27, 3) == [3, 9, 27]
+    assert asha_rungs(2, 10, 3) == [2, 6, 10]
+    assert asha_rungs(5, 5, 3) == [5]
+
+
+def test_top_trials_are_promoted_as_soon_as_they_rank_in_a_rung(tmp_path):
+    sweep = search(tmp_path)
+    db = sweep._open()
+    assert sweep.rungs == [1, 2, 4]
+
+    first = start(sweep, db)
+    assert (first["trial_id"], first["rung"], first["epochs"]) == (0, 0, 1)
+    assert first["weights"] == str(tmp_path / "yolov8n.pt")
+    finish(sweep, db, first, 0.1)
+
+    # One result cannot fill the top half of a rung, so a new trial starts
+    second = start(sweep, db)
+    assert (second["trial_id"], second["rung"]) == (1, 0)
+    finish(sweep, db, second, 0.5)
+
+    # Trial 1 is now the top half of rung 0: it continues from its own weights
+    promoted = start(sweep, db)
+    assert (promoted["trial_id"], promoted["rung"], promoted["epochs"]) == (1, 1, 1)
+    assert promoted["weights"] == str(Path(second["run_dir"]) / "last.pt")
+
+    third = start(sweep, db)
+    assert (third["trial_id"], third["rung"]) == (2, 0)
+    finish(sweep, db, third, 0.3)
+    fourth = start(sweep, db)
+    assert (fourth["trial_id"], fourth["rung"]) == (3, 0)
+    finish(sweep, db, fourth, 0.9)
+
+    # Rung 0 ranks 3, 1, 2, 0: trial 3 joins trial 1 in the top half; 0 and 2 stay paused
+    rising = start(sweep, db)
+    assert (rising["trial_id"], rising["rung"]) == (3, 1)
+    finish(sweep, db, promoted, 0.6)
+    assert start(sweep, db) is None
+
+    # Rung 1 ranks 3 over 1, so only trial 3 trains to max_epochs
+    finish(sweep, db, rising, 0.7)
+    final = start(sweep, db)
+    assert (final["trial_id"], final["rung"], final["epochs"]) == (3, 2, 2)
+    finish(sweep, db, final, 0.8)
+    assert start(sweep, db) is None
+
+    statuses = dict(db.execute("SELECT trial_id, status FROM trials").fetchall())
+    assert statuses == {0: "paused", 1: "paused", 2: "paused", 3: "completed"}
+    db.close()
+
+
+def test_interrupted_trials_resume_from_their_last_finished_rung(tmp_path):
+    sweep = search(tmp_path)
+    db = sweep._open()
+    finish(sweep, db, start(sweep, db), 0.1)
+    finish(sweep, db, start(sweep, db), 0.5)
+    start(sweep, db)                      # trial 1, rung 1
+    start(sweep, db)                      # trial 2, rung 0
+    db.close()
+
+    db = sweep._open()
+    rows = {row["trial_id"]: (row["status"], row["rung"]) for row in db.execute("SELECT * FROM trials")}
+    assert rows == {0: ("paused", 0), 1: ("paused", 0), 2: ("pending", -1)}
+    resumed = start(sweep, db)
+    assert (resumed["trial_id"], resumed["rung"]) == (1, 1)
+    db.close()
+
+    with pytest.raises(ValueError, match="different search space"):
+        search(tmp_path, reduction_factor=3)._open()
@@ -0,0 +1,48 @@
+import asyncio
+import threading
+import time
+import pytest
+from Deep_learning_projects.components.inference_batcher import InferenceBatcher, InferenceStopped
+
+
+def blocking_predict(release: threading.Event):
+    def predict_batch(sources: list) -> list:
+        release.wait(5)
+        return [[source] for source in sources]
+    return predict_batch
+
+
+def test_stop_fails_queued_requests_without_blocking_the_loop():
+    release = threading.Event()
+
+    async def scenario():
+        batcher = InferenceBatcher(blocking_predict(release), max_batch_size=1, max_wait_ms=0)
+        await batcher.start()
+        requests = [asyncio.create_task(batcher.submit(i)) for i in range(4)]
+        # The first request is on the model, the others wait in the queue
+        await asyncio.sleep(0.1)
+
+        start = time.perf_counter()
+        await batcher.stop()
+        stop_s = time.perf_counter() - start
+        release.set()
+        return stop_s, await asyncio.gather(*requests, return_exceptions=True)
+
+    stop_s, results = asyncio.run(scenario())
+    assert stop_s < 1
+    assert results[0] == [0]
+    assert all(isinstance(result, InferenceStopped) for result in results[1:])
+
+
+def test_requests_after_stop_are_refused():
+    async def scenario():
+        batcher = InferenceBatcher(lambda sources: [[] for _ in sources], max_batch_size=4, max_wait_ms=1)
+        await batcher.start()
+        assert await batcher.submit("image") == []
+        await batcher.stop()
+        with pytest.raises(InferenceStopped):
+            await batcher.submit("image")
+        with pytest.raises(InferenceStopped):
+            await batcher.run_batch(["image"])
+
+    asyncio.run(scenario())
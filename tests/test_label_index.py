@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+pytest.importorskip("yaml")
+pytest.importorskip("box")
+
+from Deep_learning_projects.components.label_index import LabelIndex
+
+
+LABELS = {
+    "train/a": "0 0.5 0.5 0.2 0.2\n1 0.3 0.3 0.1 0.1\n",
+    "train/b": "0 0.5 0.5 abc 0.2\n",
+    "train/c": "",
+    "val/d": "1 0.5 0.5 0.4 0.4\n",
+}
+
+
+def dataset(tmp_path):
+    # Three training images (one label file malformed, one empty) and one validation image
+    for name, labels in LABELS.items():
+        split, stem = name.split("/")
+        (tmp_path / "images" / split).mkdir(parents=True, exist_ok=True)
+        (tmp_path / "labels" / split).mkdir(parents=True, exist_ok=True)
+        (tmp_path / "images" / split / f"{stem}.jpg").write_bytes(b"jpg")
+        (tmp_path / "labels" / split / f"{stem}.txt").write_text(labels)
+    (tmp_path / "data.yaml").write_text("path: .\ntrain: images/train\nval: images/val\nnc: 2\nnames: [a, b]\n")
+
+
+def label_index(tmp_path) -> LabelIndex:
+    config = SimpleNamespace(
+        index_path=tmp_path / "index" / "labels.npz",
+        stats_path=tmp_path / "index" / "label_stats.json",
+        training_data=tmp_path / "data.yaml",
+        num_workers=1,
+        params_classes=2,
+        params_image_size=[640, 640],
+    )
+    return LabelIndex(config)
+
+
+def test_statistics_report_malformed_label_files_with_their_paths(tmp_path):
+    dataset(tmp_path)
+    stats = label_index(tmp_path).statistics()
+    malformed = str(tmp_path / "labels" / "train" / "b.txt")
+    assert list(stats["malformed_label_files"]) == [malformed]
+    assert stats["train"]["malformed_label_files"] == 1
+    assert stats["val"]["malformed_label_files"] == 0
+    # The malformed and the empty file both count as images without labels
+    assert stats["train"]["images_without_labels"] == 2
+    assert stats["all"]["class_counts"] == [1, 2]
+
+
+def test_validate_names_the_malformed_files(tmp_path):
+    dataset(tmp_path)
+    with pytest.raises(ValueError) as error:
+        label_index(tmp_path).validate()
+    assert "1 label files could not be parsed" in str(error.value)
+    assert str(tmp_path / "labels" / "train" / "b.txt") in str(error.value)
+    assert (tmp_path / "index" / "label_stats.json").exists()
+
+
+def test_unchanged_malformed_files_are_still_reported_from_the_stored_index(tmp_path):
+    dataset(tmp_path)
+    label_index(tmp_path).build()
+    rebuilt = label_index(tmp_path)
+    rebuilt.build()
+    assert list(rebuilt.statistics()["malformed_label_files"]) == [str(tmp_path / "labels" / "train" / "b.txt")]
+
+    (tmp_path / "labels" / "train" / "b.txt").write_text("0 0.5 0.5 0.25 0.2\n")
+    fixed = label_index(tmp_path)
+    assert fixed.statistics()["malformed_label_files"] == {}
+    fixed.validate()
@@ -0,0 +1,115 @@
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+import pytest
+
+# model_reloader pulls in the inference stack (numpy, cv2, python-box via utils.common)
+pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+pytest.importorskip("box")
+
+from Deep_learning_projects.components import model_reloader
+from Deep_learning_projects.components.model_fleet import ModelFleet
+from Deep_learning_projects.entity.config_entity import PredictionConfig
+
+
+class FakeServedModel:
+    """
+    ServedModel without weights: requests are pinned by hand and stop() is recorded.
+    """
+    def __init__(self, config: PredictionConfig, version: int, name: str = "default"):
+        self.config = config
+        self.version = version
+        self.name = name
+        self.registry = SimpleNamespace(memory_mb=lambda: 0.0)
+        self.weights_hash = f"fake-{version}"
+        self.active_requests = 0
+        self.stopped = False
+
+    async def start(self):
+        pass
+
+    def acquire(self):
+        self.active_requests += 1
+
+    def release(self):
+        self.active_requests -= 1
+
+    async def stop(self):
+        self.stopped = True
+
+
+def prediction_config(**overrides) -> PredictionConfig:
+    values = dict(
+        model_path=Path("model/best.pt"), warmup_runs=0, max_batch_size=4, max_wait_ms=1,
+        max_upload_mb=10, max_batch_upload_mb=100, decode_workers=1, num_workers=0, threads_per_worker=0,
+        cache_max_mb=0, cache_ttl_s=0, inference_concurrency=1, max_queue_size=0, backend="pytorch",
+        export_report_path=Path("export_report.json"), quantization_scores_path=Path("quantization_scores.json"),
+        tile_overlap=0.2, tile_merge_threshold=0.7, watch_path=Path("model/promoted.pt"), reload_poll_s=0,
+        reload_warmup_runs=0, drain_timeout_s=5, default_model="default",
+        models={"small": {"model_path": Path("model/small.pt")}}, max_memory_mb=0, memory_budget_mb=0,
+        model_idle_unload_s=0, preallocate_inputs=False, input_buffer_shapes=2, reduced_decode=False,
+        params_image_size=[64, 64, 3],
+    )
+    values.update(overrides)
+    return PredictionConfig(**values)
+
+
+@pytest.fixture(autouse=True)
+def fake_served_model(monkeypatch):
+    monkeypatch.setattr(model_reloader, "ServedModel", FakeServedModel)
+
+
+def test_unload_while_busy_waits_for_the_running_request():
+    async def scenario():
+        fleet = ModelFleet(prediction_config())
+        await fleet.start()
+        served = (await fleet.get("small")).active
+        served.acquire()
+
+        unload = asyncio.create_task(fleet.unload("small"))
+        await asyncio.sleep(0.2)
+        # No new requests reach it, but the running one is not cut off
+        assert "small" not in fleet.reloaders
+        assert not unload.done() and not served.stopped
+
+        served.release()
+        await asyncio.wait_for(unload, timeout=1)
+        assert served.stopped
+        assert fleet.unloads["small"] == 1
+        await fleet.stop()
+
+    asyncio.run(scenario())
+
+
+def test_unload_stops_the_model_after_drain_timeout():
+    async def scenario():
+        fleet = ModelFleet(prediction_config(drain_timeout_s=0.1))
+        await fleet.start()
+        served = (await fleet.get("small")).active
+        served.acquire()
+
+        await asyncio.wait_for(fleet.unload("small"), timeout=1)
+        assert served.stopped
+        await fleet.stop()
+
+    asyncio.run(scenario())
+
+
+def test_load_after_unload_gets_a_fresh_model():
+    async def scenario():
+        fleet = ModelFleet(prediction_config())
+        await fleet.start()
+        first = (await fleet.get("small")).active
+        await fleet.unload("small")
+        second = (await fleet.get("small")).active
+        assert second is not first and not second.stopped
+        assert fleet.loads["small"] == 2
+        await fleet.stop()
+
+    asyncio.run(scenario())
+
+
+def test_unknown_override_names_the_model_and_setting():
+    with pytest.raises(ValueError, match=r"prediction\.models\.small: .*max_batch"):
+        ModelFleet(prediction_config(models={"small": {"model_path": Path("small.pt"), "max_batch": 8}}))
@@ -0,0 +1,53 @@
+import json
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("box")
+
+from Deep_learning_projects.components.model_registry import ModelRegistry
+
+
+def registry(tmp_path, backend: str, report: dict = None) -> ModelRegistry:
+    report_path = tmp_path / "export_report.json"
+    if report is not None:
+        report_path.write_text(json.dumps(report))
+    config = SimpleNamespace(
+        backend=backend,
+        model_path=tmp_path / "best.pt",
+        export_report_path=report_path,
+        quantization_scores_path=tmp_path / "quantization_scores.json",
+    )
+    return ModelRegistry(config=config)
+
+
+def export_report(tmp_path, selected: str) -> dict:
+    onnx = tmp_path / "best.onnx"
+    onnx.write_bytes(b"onnx")
+    return {
+        "selected": selected,
+        "backends": {
+            "pytorch": {"path": str(tmp_path / "best.pt"), "latency_ms_p50": 10.0, "parity_ok": True},
+            "onnx": {"path": str(onnx), "latency_ms_p50": 12.0, "parity_ok": True},
+        },
+    }
+
+
+def test_auto_serves_pytorch_when_the_export_stage_selected_it(tmp_path):
+    assert registry(tmp_path, "auto", export_report(tmp_path, "pytorch")).resolve_backend() == \
+        ("pytorch", str(tmp_path / "best.pt"))
+
+
+def test_auto_serves_the_selected_export(tmp_path):
+    assert registry(tmp_path, "auto", export_report(tmp_path, "onnx")).resolve_backend() == \
+        ("onnx", str(tmp_path / "best.onnx"))
+
+
+def test_auto_falls_back_to_pytorch_when_the_selected_file_is_missing(tmp_path):
+    report = export_report(tmp_path, "onnx")
+    (tmp_path / "best.onnx").unlink()
+    assert registry(tmp_path, "auto", report).resolve_backend()[0] == "pytorch"
+
+
+def test_auto_without_report_serves_pytorch(tmp_path):
+    assert registry(tmp_path, "auto").resolve_backend() == ("pytorch", str(tmp_path / "best.pt"))
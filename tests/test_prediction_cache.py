@@ -0,0 +1,77 @@
+import asyncio
+from Deep_learning_projects.components.prediction_cache import PredictionCache
+
+
+def test_identical_requests_share_one_compute():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"predictions": []}
+
+    async def scenario():
+        cache = PredictionCache(max_mb=1)
+        results = await asyncio.gather(*(cache.get_or_compute("key", compute) for _ in range(3)))
+        return cache, results
+
+    cache, results = asyncio.run(scenario())
+    assert calls == [1]
+    assert results == [{"predictions": []}] * 3
+    assert (cache.misses, cache.coalesced) == (1, 2)
+
+
+def test_failed_compute_reaches_every_waiter_and_is_not_cached():
+    calls = []
+
+    async def failing():
+        calls.append("failing")
+        await asyncio.sleep(0.05)
+        raise ValueError("inference failed")
+
+    async def working():
+        calls.append("working")
+        return {"predictions": []}
+
+    async def scenario():
+        cache = PredictionCache(max_mb=1)
+        first = asyncio.create_task(cache.get_or_compute("key", failing))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.get_or_compute("key", failing))
+        failures = await asyncio.gather(first, second, return_exceptions=True)
+        # Nothing cached and nothing left in flight: the next request computes again
+        return cache, failures, await cache.get_or_compute("key", working)
+
+    cache, failures, value = asyncio.run(scenario())
+    assert [type(failure) for failure in failures] == [ValueError, ValueError]
+    assert calls == ["failing", "working"]
+    assert value == {"predictions": []}
+    assert cache.coalesced == 1
+    assert cache.stats()["entries"] == 1
+
+
+
+def test_cancelled_caller_does_not_abort_the_other_waiters():
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"predictions": []}
+
+    async def scenario():
+        cache = PredictionCache(max_mb=1)
+        first = asyncio.create_task(cache.get_or_compute("key", slow))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.get_or_compute("key", slow))
+        await asyncio.sleep(0)
+        # The client that started the computation disconnects
+        first.cancel()
+        value = await second
+        return cache, first, value
+
+    cache, first, value = asyncio.run(scenario())
+    assert first.cancelled()
+    assert value == {"predictions": []}
+    assert calls == [1]
+    assert cache.stats()["entries"] == 1
@@ -0,0 +1,63 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from Deep_learning_projects.components.tiled_inference import PAD_VALUE, TiledInference
+
+
+def detections(boxes: list, conf: list, cls: list) -> dict:
+    return {
+        "boxes": np.asarray(boxes, dtype=np.float32).reshape(-1, 4),
+        "conf": np.asarray(conf, dtype=np.float32),
+        "cls": np.asarray(cls, dtype=np.int32),
+    }
+
+
+def test_grid_covers_the_image_and_ends_on_the_border():
+    tiler = TiledInference(tile_size=640, overlap=0.25, merge_threshold=0.5)
+    offsets = tiler.grid(1000, 1500)
+    assert sorted(set(offsets[:, 0].tolist())) == [0, 480, 860]
+    assert sorted(set(offsets[:, 1].tolist())) == [0, 360]
+    assert len(offsets) == 6
+
+
+def test_cut_pads_tiles_that_overhang_the_image():
+    tiler = TiledInference(tile_size=4, overlap=0.0, merge_threshold=0.5)
+    image = np.arange(3 * 6 * 3, dtype=np.uint8).reshape(3, 6, 3)
+    buffer, offsets = tiler.cut(image)
+    assert offsets.tolist() == [[0, 0], [2, 0]]
+    assert (buffer[0, :3, :4] == image[:, :4]).all()
+    assert (buffer[0, 3:] == PAD_VALUE).all()
+    tiler.release(buffer)
+    # The released buffer is handed out again for the next image of that size
+    assert tiler.cut(image)[0] is buffer
+
+
+def test_merge_shifts_boxes_and_drops_duplicates_from_overlapping_tiles():
+    tiler = TiledInference(tile_size=100, overlap=0.5, merge_threshold=0.5)
+    offsets = np.array([[0, 0], [50, 0]], dtype=np.int32)
+    merged = tiler.merge([
+        # Object A whole in both tiles; object B cut by the first tile's right edge
+        detections([[60, 10, 90, 40], [85, 50, 100, 80]], [0.9, 0.4], [0, 0]),
+        detections([[10, 10, 40, 40], [35, 50, 65, 80]], [0.8, 0.7], [0, 0]),
+    ], offsets)
+    order = np.argsort(-merged["conf"])
+    assert merged["boxes"][order].tolist() == [[60, 10, 90, 40], [85, 50, 115, 80]]
+    assert merged["conf"][order].tolist() == pytest.approx([0.9, 0.7])
+
+
+def test_merge_keeps_overlapping_boxes_of_different_classes():
+    tiler = TiledInference(tile_size=100, overlap=0.5, merge_threshold=0.5)
+    offsets = np.array([[0, 0], [50, 0]], dtype=np.int32)
+    merged = tiler.merge([
+        detections([[60, 10, 90, 40]], [0.9], [0]),
+        detections([[10, 10, 40, 40]], [0.8], [2]),
+    ], offsets)
+    assert sorted(merged["cls"].tolist()) == [0, 2]
+
+
+def test_merge_without_detections_returns_empty_arrays():
+    tiler = TiledInference(tile_size=100, overlap=0.5, merge_threshold=0.5)
+    merged = tiler.merge([detections([], [], []), detections([], [], [])], np.zeros((2, 2), dtype=np.int32))
+    assert merged["boxes"].shape == (0, 4)
+    assert len(merged["conf"]) == len(merged["cls"]) == 0
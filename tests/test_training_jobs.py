@@ -0,0 +1,109 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+import pytest
+
+from Deep_learning_projects.components import training_jobs
+from Deep_learning_projects.components.training_jobs import FINISHED, JobQueueFull, TrainingJobManager, UnknownJob
+
+SLEEP = "import time; print('ready', flush=True); time.sleep(30)"
+FAIL = "import sys; print('training failed: boom'); sys.exit(3)"
+IGNORE_TERM = ("import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); "
+               "print('ready', flush=True); time.sleep(30)")
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    managers = []
+
+    def make(code: str, **overrides) -> TrainingJobManager:
+        # Jobs run `code` instead of the training pipeline
+        popen = subprocess.Popen
+        monkeypatch.setattr(training_jobs.subprocess, "Popen",
+                            lambda args, **kwargs: popen([sys.executable, "-c", code], **kwargs))
+        config = dict(root_dir=tmp_path / "jobs", max_concurrent_jobs=1, max_queued_jobs=1, niceness=1,
+                      serving_cores=0, cancel_grace_s=5, poll_s=0.05, keep_jobs=10)
+        config.update(overrides)
+        managers.append(TrainingJobManager(SimpleNamespace(**config)))
+        return managers[-1]
+
+    yield make
+    for jobs in managers:
+        for process in jobs._processes.values():
+            process.kill()
+            process.wait()
+
+
+def wait_for(jobs: TrainingJobManager, condition, timeout: float = 10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        jobs.poll()
+        time.sleep(0.05)
+
+
+def finished(jobs: TrainingJobManager, job_id: str) -> bool:
+    return jobs.get(job_id)["status"] in FINISHED
+
+
+def test_jobs_beyond_the_concurrency_limit_wait_in_a_bounded_queue(manager):
+    jobs = manager(FAIL)
+    first, second = jobs.submit(), jobs.submit()
+    assert (first["status"], second["status"]) == ("running", "queued")
+    with pytest.raises(JobQueueFull):
+        jobs.submit()
+
+    wait_for(jobs, lambda: finished(jobs, second["job_id"]))
+    # The queued job only started once the first one had exited
+    assert second["started"] >= first["finished"]
+    for job in (first, second):
+        assert (job["status"], job["returncode"]) == ("failed", 3)
+        assert "training failed: boom" in job["error"]
+
+
+def test_cancel_drops_a_queued_job_and_terminates_a_running_one(manager):
+    jobs = manager(SLEEP)
+    running, queued = jobs.submit(), jobs.submit()
+    assert jobs.cancel(queued["job_id"])["status"] == "cancelled"
+    assert queued["started"] is None
+
+    wait_for(jobs, lambda: "ready" in jobs.log_text(running["job_id"], 5))
+    assert jobs.cancel(running["job_id"])["status"] == "cancelling"
+    wait_for(jobs, lambda: finished(jobs, running["job_id"]))
+    assert running["status"] == "cancelled"
+    assert running["returncode"] != 0
+
+    with pytest.raises(UnknownJob):
+        jobs.cancel("missing")
+
+
+@pytest.mark.skipif(os.name != "posix", reason="needs process groups and SIGKILL")
+def test_cancel_kills_a_job_that_ignores_sigterm_after_the_grace_period(manager):
+    jobs = manager(IGNORE_TERM, cancel_grace_s=0.3)
+    job = jobs.submit()
+    wait_for(jobs, lambda: "ready" in jobs.log_text(job["job_id"], 5))
+    jobs.cancel(job["job_id"])
+    jobs.poll()
+    assert job["status"] == "cancelling"
+
+    wait_for(jobs, lambda: finished(jobs, job["job_id"]))
+    assert (job["status"], job["returncode"]) == ("cancelled", -9)
+
+
+def test_a_restarted_manager_marks_running_jobs_interrupted(manager):
+    jobs = manager(SLEEP)
+    job = jobs.submit()
+
+    async def restart() -> dict:
+        restarted = manager(SLEEP)
+        await restarted.start()
+        record = restarted.get(job["job_id"])
+        await restarted.stop()
+        return record
+
+    record = asyncio.run(restart())
+    assert record["status"] == "interrupted"
+    assert record["pid"] is None
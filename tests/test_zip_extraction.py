@@ -0,0 +1,79 @@
+import os
+import warnings
+import zipfile
+import pytest
+from Deep_learning_projects.components import zip_extraction
+from Deep_learning_projects.components.zip_extraction import ZipExtractor
+
+
+def tree(root) -> dict:
+    files = {}
+    for directory, dirnames, filenames in os.walk(root):
+        for name in dirnames:
+            files[os.path.relpath(os.path.join(directory, name), root)] = None
+        for name in filenames:
+            path = os.path.join(directory, name)
+            with open(path, "rb") as f:
+                files[os.path.relpath(path, root)] = f.read()
+    return files
+
+
+@pytest.fixture
+def archive(tmp_path):
+    path = tmp_path / "data.zip"
+    with warnings.catch_warnings():
+        # Duplicate member names are deliberate: the last one wins in extractall()
+        warnings.simplefilter("ignore", UserWarning)
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as f:
+            f.writestr("data/empty/", "")
+            f.writestr("data/data.yaml", "names: [a, b]\n")
+            for i in range(20):
+                f.writestr(f"data/train/images/{i}.jpg", os.urandom(1000 + i))
+            f.writestr("data/train/labels/0.txt", "0 0.5 0.5 0.1 0.1\n")
+            f.writestr("data/train/labels/0.txt", "1 0.5 0.5 0.2 0.2\n")
+            f.writestr("../outside.txt", "stays inside")
+    return path
+
+
+@pytest.fixture(params=[1, 2], ids=["serial", "processes"])
+def workers(request, monkeypatch):
+    # One member per task, so the process pool really gets several tasks
+    monkeypatch.setattr(zip_extraction, "TASK_MEMBERS", 1)
+    return request.param
+
+
+def test_extraction_matches_extractall(tmp_path, archive, workers):
+    with zipfile.ZipFile(archive) as f:
+        f.extractall(tmp_path / "reference")
+    stats = ZipExtractor(archive, tmp_path / "out", tmp_path / "index.json", workers=workers).extract()
+    assert tree(tmp_path / "out") == tree(tmp_path / "reference")
+    assert stats["skipped_members"] == 0
+
+
+def test_rerun_skips_unchanged_members_and_restores_edited_ones(tmp_path, archive, workers):
+    extractor = ZipExtractor(archive, tmp_path / "out", tmp_path / "index.json", workers=workers)
+    extractor.extract()
+    expected = tree(tmp_path / "out")
+
+    # Same size, different content, e.g. edited in place
+    label = tmp_path / "out" / "data" / "train" / "labels" / "0.txt"
+    label.write_text("1 0.9 0.9 0.2 0.2\n")
+    stat = os.stat(label)
+    os.utime(label, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    (tmp_path / "out" / "data" / "data.yaml").unlink()
+
+    stats = extractor.extract()
+    assert stats["extracted_members"] == 2
+    assert tree(tmp_path / "out") == expected
+
+
+def test_failed_extraction_keeps_the_finished_members(tmp_path, archive, workers):
+    # A directory where a file belongs makes that member fail
+    (tmp_path / "out" / "data" / "train" / "labels" / "0.txt").mkdir(parents=True)
+    extractor = ZipExtractor(archive, tmp_path / "out", tmp_path / "index.json", workers=workers)
+    with pytest.raises(OSError):
+        extractor.extract()
+    finished = extractor._load_index()
+    # Largest members go first, so the images were done before the label failed
+    assert "data/train/images/19.jpg" in finished
+    assert "data/train/labels/0.txt" not in finished